@@ -0,0 +1,24 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0001_initial'),
+        ('children', '0005_idempotencykey'),
+        ('kindergarten', '0010_section_kindergartenclass_section'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['class_id', 'updated_at'], name='activity_class_updated'),
+        ),
+    ]
@@ -10,6 +10,12 @@ class Activity(models.Model):
     children = models.ManyToManyField(Children, related_name="children_activities")
     class_id = models.ForeignKey(KindergartenClass, on_delete=models.CASCADE, related_name="class_activities")
     activity_image = models.TextField( null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["class_id", "updated_at"], name="activity_class_updated"),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.time.strftime('%Y-%m-%d %H:%M')}"
@@ -4,4 +4,4 @@ from .models import Activity
 class ActivitySerializer(serializers.ModelSerializer):
     class Meta:
         model = Activity
-        fields = "__all__"
\ No newline at end of file
+        exclude = ["updated_at"]
\ No newline at end of file
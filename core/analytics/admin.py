@@ -1,3 +1,29 @@
 from django.contrib import admin
+from .models import AnomalyFlag, KindergartenCounter, ReportJob
 
-# Register your models here.
+
+class KindergartenCounterAdmin(admin.ModelAdmin):
+    list_display = ("kindergarten", "entity", "count", "updated_at")
+    list_filter = ("entity",)
+    search_fields = ("kindergarten__name",)
+
+
+admin.site.register(KindergartenCounter, KindergartenCounterAdmin)
+
+
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "requested_by", "status", "created_at", "finished_at", "expires_at")
+    list_filter = ("kind", "status")
+    readonly_fields = ("result",)
+
+
+admin.site.register(ReportJob, ReportJobAdmin)
+
+
+class AnomalyFlagAdmin(admin.ModelAdmin):
+    list_display = ("child", "kindergarten", "rule", "detected_on", "value")
+    list_filter = ("rule", "detected_on")
+    search_fields = ("child__name", "kindergarten__name")
+
+
+admin.site.register(AnomalyFlag, AnomalyFlagAdmin)
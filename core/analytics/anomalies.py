@@ -0,0 +1,133 @@
+"""Rules behind ``manage.py detect_anomalies``.
+
+Each kindergarten's logs for the window are loaded once, with one query per
+table, into ``children × days`` arrays; every rule is then an array
+expression over those, so the cost per kindergarten is a handful of
+queries however many children it has.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+
+from children.models import Children
+from attendance.models import Attendance
+from meals.models import Meal, MealOverride
+from hygiene.models import Hygiene
+from naps.models import Nap
+from mood.models import ChildMood
+from .models import AnomalyFlag
+from .moods import NEGATIVE_MOODS
+
+WINDOW_DAYS = 7
+LOW_APPETITE_DAYS = 3
+MISSING_NAP_DAYS = 2
+NEGATIVE_MOOD_DAYS = 3
+# A hygiene gap is flagged when it exceeds this and twice the kindergarten's median gap.
+HYGIENE_GAP_MINUTES = 240
+
+Rule = AnomalyFlag.Rule
+
+
+def _day_matrix(rows, child_index, window_start, days):
+    """Boolean ``children × days`` matrix marking the ``(child_id, date)`` pairs in ``rows``."""
+    matrix = np.zeros((len(child_index), days), dtype=bool)
+    if rows:
+        children, dates = zip(*rows)
+        matrix[
+            np.searchsorted(child_index, np.fromiter(children, dtype=np.int64, count=len(rows))),
+            np.fromiter((day.toordinal() for day in dates), dtype=np.int64, count=len(rows)) - window_start.toordinal(),
+        ] = True
+    return matrix
+
+
+def load_logs(kindergarten_id, window_start, as_of):
+    """Load the window's logs for one kindergarten as arrays keyed by child position."""
+    child_ids = np.array(
+        Children.objects.filter(kindergarten_id=kindergarten_id).order_by("id").values_list("id", flat=True),
+        dtype=np.int64,
+    )
+    days = (as_of - window_start).days + 1
+    in_window = {"kindergarten_id": kindergarten_id, "date__range": (window_start, as_of)}
+
+    def pairs(queryset):
+        return list(queryset.filter(**in_window).order_by().values_list("child_id", "date").distinct())
+
+    hygiene = list(
+        Hygiene.objects.filter(**in_window, hygiene_activity_time__isnull=False)
+        .order_by("child_id", "date", "hygiene_activity_time")
+        .values_list("child_id", "date", "hygiene_activity_time")
+    )
+    return {
+        "child_ids": child_ids,
+        "attended": _day_matrix(pairs(Attendance.objects), child_ids, window_start, days),
+        "napped": _day_matrix(pairs(Nap.objects), child_ids, window_start, days),
+        "low_appetite": _day_matrix(
+            # Planned meals are only ever low through an override.
+            pairs(Meal.objects.filter(appetite_level=Meal.AppetiteLevel.LOW))
+            + pairs(MealOverride.objects.filter(appetite_level=Meal.AppetiteLevel.LOW, skipped=False)),
+            child_ids, window_start, days,
+        ),
+        "negative_mood": _day_matrix(pairs(ChildMood.objects.filter(mood__in=NEGATIVE_MOODS)), child_ids, window_start, days),
+        "hygiene_child": np.searchsorted(child_ids, np.array([row[0] for row in hygiene], dtype=np.int64)),
+        "hygiene_day": np.array([row[1].toordinal() for row in hygiene], dtype=np.int64),
+        "hygiene_minute": np.array([row[2].hour * 60 + row[2].minute for row in hygiene], dtype=np.int64),
+    }
+
+
+def longest_hygiene_gaps(logs):
+    """Longest gap in minutes between consecutive hygiene events on the same day, per child."""
+    longest = np.zeros(len(logs["child_ids"]), dtype=np.int64)
+    child, day, minute = logs["hygiene_child"], logs["hygiene_day"], logs["hygiene_minute"]
+    if len(child) < 2:
+        return longest, None
+
+    same_day = (child[1:] == child[:-1]) & (day[1:] == day[:-1])
+    gaps = (minute[1:] - minute[:-1])[same_day]
+    if not len(gaps):
+        return longest, None
+    np.maximum.at(longest, child[1:][same_day], gaps)
+    return longest, float(np.median(gaps))
+
+
+def evaluate(logs):
+    """Return ``{rule: values}``, one value per child, 0 where the rule does not fire."""
+    attended, napped = logs["attended"], logs["napped"]
+
+    low_appetite_days = logs["low_appetite"].sum(axis=1)
+    negative_mood_days = logs["negative_mood"].sum(axis=1)
+    # Kindergartens that do not log naps at all would flag every child.
+    missing_nap_days = (attended & ~napped).sum(axis=1) if napped.any() else np.zeros(len(attended), dtype=np.int64)
+
+    longest_gap, median_gap = longest_hygiene_gaps(logs)
+    gap_threshold = max(HYGIENE_GAP_MINUTES, 2 * (median_gap or 0))
+
+    return {
+        Rule.LOW_APPETITE: np.where(low_appetite_days >= LOW_APPETITE_DAYS, low_appetite_days, 0),
+        Rule.MISSING_NAP: np.where(missing_nap_days >= MISSING_NAP_DAYS, missing_nap_days, 0),
+        Rule.HYGIENE_GAP: np.where(longest_gap > gap_threshold, longest_gap, 0),
+        Rule.NEGATIVE_MOODS: np.where(negative_mood_days >= NEGATIVE_MOOD_DAYS, negative_mood_days, 0),
+    }
+
+
+def detect_for_kindergarten(kindergarten_id, as_of, window_days=WINDOW_DAYS):
+    """Evaluate every rule for one kindergarten and replace its flags for ``as_of``."""
+    window_start = as_of - timedelta(days=window_days - 1)
+    logs = load_logs(kindergarten_id, window_start, as_of)
+
+    flags = []
+    for rule, values in evaluate(logs).items():
+        for position in np.flatnonzero(values):
+            flags.append(AnomalyFlag(
+                kindergarten_id=kindergarten_id,
+                child_id=int(logs["child_ids"][position]),
+                rule=rule,
+                detected_on=as_of,
+                window_start=window_start,
+                value=int(values[position]),
+            ))
+
+    with transaction.atomic():
+        AnomalyFlag.objects.filter(kindergarten_id=kindergarten_id, detected_on=as_of).delete()
+        AnomalyFlag.objects.bulk_create(flags)
+    return len(flags)
@@ -0,0 +1,170 @@
+"""Attendance bitmaps: one bit per child and school day.
+
+School days are weekdays, as in ``leaderboard.school_days``; a year's
+bitmap is ``ceil(weekdays / 8)`` bytes (33), so a kindergarten's term is a
+few KB however many attendance rows it has. Bitmaps are loaded into a
+``children × school days`` boolean array and every question about a term
+(rates, streaks, absences per weekday, presence on given days) is an array
+expression over it.
+
+Attendance on a weekend is not a school day and has no bit.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+
+import numpy as np
+from django.db import transaction
+
+from attendance.models import Attendance
+from .models import AttendanceBitmap
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri")
+
+
+def year_days(year):
+    """Number of school days (bits) in ``year``."""
+    return int(np.busday_count(date(year, 1, 1), date(year + 1, 1, 1)))
+
+
+def day_index(day):
+    """Bit position of ``day`` in its year's bitmap, or None for weekends."""
+    if day.weekday() >= 5:
+        return None
+    return int(np.busday_count(date(day.year, 1, 1), day))
+
+
+def school_days(start_date, end_date):
+    """The school days from ``start_date`` to ``end_date`` inclusive, as ``datetime64[D]``."""
+    days = np.arange(np.datetime64(start_date), np.datetime64(end_date + timedelta(days=1)))
+    return days[np.is_busday(days)]
+
+
+def mark(rows, present=True):
+    """Set (or clear) the bits of ``(child_id, date)`` pairs, locking each child's year row."""
+    by_row = defaultdict(set)
+    for child_id, day in rows:
+        index = day_index(day)
+        if index is not None:
+            by_row[(child_id, day.year)].add(index)
+    if not by_row:
+        return
+
+    with transaction.atomic():
+        existing = {
+            (bitmap.child_id, bitmap.year): bitmap
+            for bitmap in AttendanceBitmap.objects.select_for_update().filter(
+                child_id__in={child_id for child_id, _ in by_row}, year__in={year for _, year in by_row},
+            )
+        }
+        created, changed = [], []
+        for (child_id, year), indexes in by_row.items():
+            bitmap = existing.get((child_id, year))
+            if bitmap is None:
+                if not present:
+                    continue
+                bitmap = AttendanceBitmap(child_id=child_id, year=year, bits=bytes((year_days(year) + 7) // 8))
+                created.append(bitmap)
+            else:
+                changed.append(bitmap)
+            bits = bytearray(bitmap.bits)
+            for index in indexes:
+                if present:
+                    bits[index // 8] |= 0x80 >> (index % 8)
+                else:
+                    bits[index // 8] &= ~(0x80 >> (index % 8)) & 0xFF
+            bitmap.bits = bytes(bits)
+
+        if created:
+            AttendanceBitmap.objects.bulk_create(created)
+        if changed:
+            AttendanceBitmap.objects.bulk_update(changed, ["bits"])
+
+
+def rebuild(year, kindergarten_id=None):
+    """Rewrite the ``year`` bitmaps of one kindergarten (or all) from ``Attendance``; returns the rows written."""
+    records = Attendance.objects.filter(date__year=year)
+    stale = AttendanceBitmap.objects.filter(year=year)
+    if kindergarten_id is not None:
+        records = records.filter(child__kindergarten_id=kindergarten_id)
+        stale = stale.filter(child__kindergarten_id=kindergarten_id)
+
+    rows = list(records.filter(date__week_day__in=range(2, 7)).order_by().values_list("child_id", "date"))
+    child_ids = np.unique(np.fromiter((child_id for child_id, _ in rows), dtype=np.int64, count=len(rows)))
+    present = np.zeros((len(child_ids), year_days(year)), dtype=bool)
+    if rows:
+        present[
+            np.searchsorted(child_ids, np.fromiter((child_id for child_id, _ in rows), dtype=np.int64, count=len(rows))),
+            np.busday_count(date(year, 1, 1), np.array([day for _, day in rows], dtype="datetime64[D]")),
+        ] = True
+    packed = np.packbits(present, axis=1)
+
+    with transaction.atomic():
+        stale.delete()
+        AttendanceBitmap.objects.bulk_create(
+            [AttendanceBitmap(child_id=int(child_id), year=year, bits=row.tobytes()) for child_id, row in zip(child_ids, packed)],
+            batch_size=1000,
+        )
+    return len(child_ids)
+
+
+def load_term(children, start_date, end_date):
+    """Return ``(child_ids, days, present)`` for ``children`` (a queryset) over the term.
+
+    ``present`` is a ``children × school days`` boolean array; one query
+    loads the children and one their bitmaps for the years the term spans.
+    """
+    child_ids = np.array(children.order_by("id").values_list("id", flat=True), dtype=np.int64)
+    days = school_days(start_date, end_date)
+    present = np.zeros((len(child_ids), len(days)), dtype=bool)
+
+    by_year = defaultdict(list)
+    for child_id, year, bits in (
+        AttendanceBitmap.objects.filter(child_id__in=children.values("id"), year__range=(start_date.year, end_date.year))
+        .values_list("child_id", "year", "bits")
+    ):
+        by_year[year].append((child_id, bytes(bits)))
+
+    column = 0
+    for year in range(start_date.year, end_date.year + 1):
+        first = max(start_date, date(year, 1, 1))
+        last = min(end_date, date(year, 12, 31))
+        lo, hi = int(np.busday_count(date(year, 1, 1), first)), int(np.busday_count(date(year, 1, 1), last + timedelta(days=1)))
+        rows = by_year[year]
+        if rows:
+            packed = np.frombuffer(b"".join(bits for _, bits in rows), dtype=np.uint8).reshape(len(rows), -1)
+            positions = np.searchsorted(child_ids, [child_id for child_id, _ in rows])
+            present[positions, column:column + hi - lo] = np.unpackbits(packed, axis=1)[:, lo:hi].astype(bool)
+        column += hi - lo
+    return child_ids, days, present
+
+
+def rates(present):
+    """Share of school days present, per child."""
+    if not present.shape[1]:
+        return np.zeros(len(present))
+    return present.sum(axis=1) / present.shape[1]
+
+
+def longest_runs(matrix):
+    """Length of the longest run of True per row."""
+    padded = np.zeros((matrix.shape[0], matrix.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = matrix
+    edges = np.diff(padded, axis=1)
+    start_rows, start_columns = np.nonzero(edges == 1)
+    _, end_columns = np.nonzero(edges == -1)
+    longest = np.zeros(matrix.shape[0], dtype=np.int64)
+    np.maximum.at(longest, start_rows, end_columns - start_columns)
+    return longest
+
+
+def absences_by_weekday(present, days):
+    """``children × 5`` count of absences on each weekday, Monday first."""
+    weekdays = np.eye(5, dtype=np.int64)[(days.astype(np.int64) + 3) % 7]  # Day 0, 1970-01-01, was a Thursday.
+    return (~present).astype(np.int64) @ weekdays
+
+
+def present_on_all(present, days, wanted):
+    """Whether each child was present on every school day in ``wanted`` (dates), as packed bit masks."""
+    mask = np.packbits(np.isin(days, np.array(list(wanted), dtype="datetime64[D]")))
+    packed = np.packbits(present, axis=1)
+    return np.all((packed & mask) == mask, axis=1)
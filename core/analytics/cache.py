@@ -0,0 +1,99 @@
+"""Versioned, kindergarten-scoped cache for the analytics endpoints.
+
+Every kindergarten has a version token in the shared cache. Writes to the
+models behind the analytics bump the token of the affected kindergarten and
+the global one (see ``analytics.signals``), so cached aggregates are never
+invalidated key by key: they simply stop being addressed and expire.
+Concurrent misses for the same key are collapsed with a lock taken through
+``cache.add`` so only one worker computes an expensive aggregate.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+GLOBAL_SCOPE = "all"
+VERSION_KEY = "analytics:version:{}"
+LOCK_POLL_INTERVAL = 0.05
+
+_MISSING = object()
+
+
+def scope_for(user):
+    """Return ``(kindergarten_ids, viewer)`` describing whose data ``user`` sees.
+
+    ``kindergarten_ids`` is None for a global view. ``viewer`` separates
+    callers that see different slices of the same kindergarten.
+    """
+    if user.role == "superadmin" or user.is_superuser:
+        return None, "superadmin"
+    if user.role == "admin" and hasattr(user, "kindergarten_admin"):
+        return [user.kindergarten_admin.kindergarten_id], "admin"
+    if user.role == "teacher" and hasattr(user, "teacher_profile"):
+        return [user.teacher_profile.kindergarten_id], f"user{user.pk}"
+    return list(user.children.values_list("kindergarten_id", flat=True).distinct()), f"user{user.pk}"
+
+
+def _scope_names(kindergarten_ids):
+    if kindergarten_ids is None:
+        return [GLOBAL_SCOPE]
+    return sorted({str(kg_id) for kg_id in kindergarten_ids if kg_id is not None})
+
+
+def scope_version(kindergarten_ids):
+    """Current version token for a set of kindergartens (None = global)."""
+    keys = [VERSION_KEY.format(name) for name in _scope_names(kindergarten_ids)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # A fresh token, never 0: an evicted version must not readdress old entries.
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key, 0)
+    return ".".join(str(versions[key]) for key in keys)
+
+
+def invalidate(kindergarten_ids):
+    """Bump the versions of ``kindergarten_ids`` and of the global scope."""
+    token = time.time_ns()
+    names = set(_scope_names(kindergarten_ids or [])) | {GLOBAL_SCOPE}
+    cache.set_many({VERSION_KEY.format(name): token for name in names}, timeout=None)
+
+
+def invalidate_on_commit(kindergarten_id):
+    """Invalidate once the surrounding transaction commits, so readers never cache uncommitted state."""
+    transaction.on_commit(lambda: invalidate([kindergarten_id]))
+
+
+def cached_aggregate(name, kindergarten_ids, params, compute, timeout=600, lock_timeout=30):
+    """Return ``compute()`` cached under the caller's scope version and ``params``.
+
+    Only one process computes a missing value; the others wait up to
+    ``lock_timeout`` seconds for it to appear before computing themselves.
+    """
+    digest = hashlib.sha1(repr(sorted(params.items())).encode()).hexdigest()
+    scope = "-".join(_scope_names(kindergarten_ids))
+    key = f"analytics:{name}:{scope}:{scope_version(kindergarten_ids)}:{digest}"
+
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, timeout=lock_timeout):
+        try:
+            value = compute()
+            cache.set(key, value, timeout=timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if lock_key not in cache:
+            break
+    return compute()
@@ -0,0 +1,130 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from kindergarten.models import KindergartenClass, Teacher
+from children.models import Children
+from posts.models import Post
+from comments.models import Comment
+from activities.models import Activity
+from attendance.models import Attendance
+from meals.models import Meal, MealOverride, MenuPlan
+from meals.plans import planned_meal_counts
+from hygiene.models import Hygiene
+from naps.models import Nap
+from mood.models import ChildMood
+from .models import KindergartenCounter
+
+Entity = KindergartenCounter.Entity
+
+# Model -> (counter entity, lookup from the model to its kindergarten id).
+COUNTED_MODELS = {
+    KindergartenClass: (Entity.CLASSES, "kindergarten_id"),
+    Teacher: (Entity.TEACHERS, "kindergarten_id"),
+    Children: (Entity.CHILDREN, "kindergarten_id"),
+    Post: (Entity.POSTS, "kindergarten_id"),
+    Comment: (Entity.COMMENTS, "post__kindergarten_id"),
+    Activity: (Entity.ACTIVITIES, "class_id__kindergarten_id"),
+    Attendance: (Entity.ATTENDANCE, "kindergarten_id"),
+    Meal: (Entity.MEALS, "kindergarten_id"),
+    Hygiene: (Entity.HYGIENE, "kindergarten_id"),
+    Nap: (Entity.NAPS, "kindergarten_id"),
+    ChildMood: (Entity.MOODS, "kindergarten_id"),
+}
+
+# Per-child log tables that follow a child when it changes kindergarten or class.
+CHILD_LOG_MODELS = [Attendance, Meal, MealOverride, Hygiene, Nap, ChildMood]
+
+
+def resolve_kindergarten_id(instance, lookup):
+    """Return the kindergarten id for ``instance`` by following ``lookup``.
+
+    Uses the cached related object when there is one, otherwise a single
+    ``values_list`` query on the related table.
+    """
+    if "__" not in lookup:
+        return getattr(instance, lookup)
+
+    relation, rest = lookup.split("__", 1)
+    field = instance._meta.get_field(relation)
+    if field.is_cached(instance):
+        return getattr(getattr(instance, relation), rest)
+
+    related_id = getattr(instance, field.attname)
+    if related_id is None:
+        return None
+    return field.related_model.objects.filter(pk=related_id).values_list(rest, flat=True).first()
+
+
+def bump(kindergarten_id, entity, delta):
+    """Add ``delta`` to a counter in the caller's transaction.
+
+    Decrements never create rows, so cascading deletes of a kindergarten
+    cannot resurrect its counters.
+    """
+    if not kindergarten_id or not delta:
+        return
+
+    counters = KindergartenCounter.objects.filter(kindergarten_id=kindergarten_id, entity=entity)
+    if counters.update(count=F("count") + delta) or delta < 0:
+        return
+
+    try:
+        with transaction.atomic():
+            KindergartenCounter.objects.create(kindergarten_id=kindergarten_id, entity=entity, count=delta)
+    except IntegrityError:
+        # Another writer created the row first.
+        counters.update(count=F("count") + delta)
+
+
+def parent_joined(parent_id, kindergarten_id, exclude_child_id):
+    """Count the parent once when their first child joins a kindergarten."""
+    siblings = Children.objects.filter(parent_id=parent_id, kindergarten_id=kindergarten_id).exclude(pk=exclude_child_id)
+    if not siblings.exists():
+        bump(kindergarten_id, Entity.PARENTS, 1)
+
+
+def parent_left(parent_id, kindergarten_id):
+    """Stop counting the parent once their last child leaves a kindergarten."""
+    if not Children.objects.filter(parent_id=parent_id, kindergarten_id=kindergarten_id).exists():
+        bump(kindergarten_id, Entity.PARENTS, -1)
+
+
+def compute_counters(kindergarten_id=None):
+    """Recount every entity from the source tables.
+
+    Returns ``{kindergarten_id: {entity: count}}`` using one grouped query
+    per entity.
+    """
+    totals = {}
+
+    def collect(queryset, lookup, entity, aggregate):
+        if kindergarten_id is not None:
+            queryset = queryset.filter(**{lookup: kindergarten_id})
+        rows = queryset.values(lookup).annotate(total=aggregate).values_list(lookup, "total")
+        for kg_id, total in rows:
+            if kg_id is not None:
+                totals.setdefault(kg_id, {})[entity] = total
+
+    for model, (entity, lookup) in COUNTED_MODELS.items():
+        collect(model.objects.order_by(), lookup, entity, Count("id"))
+
+    collect(Children.objects.order_by(), "kindergarten_id", Entity.PARENTS, Count("parent_id", distinct=True))
+
+    # Meals resolved from class menu plans count as meals too.
+    plans = MenuPlan.objects.all() if kindergarten_id is None else MenuPlan.objects.filter(kindergarten_id=kindergarten_id)
+    for kg_id, total in planned_meal_counts(plans, lambda plan, child_id: plan.kindergarten_id).items():
+        counts = totals.setdefault(kg_id, {})
+        counts[Entity.MEALS] = counts.get(Entity.MEALS, 0) + total
+    return totals
+
+
+def stored_counters(kindergarten_id=None):
+    """Return the persisted counters as ``{kindergarten_id: {entity: count}}``."""
+    queryset = KindergartenCounter.objects.all()
+    if kindergarten_id is not None:
+        queryset = queryset.filter(kindergarten_id=kindergarten_id)
+
+    stored = {}
+    for kg_id, entity, count in queryset.values_list("kindergarten_id", "entity", "count"):
+        stored.setdefault(kg_id, {})[entity] = count
+    return stored
@@ -0,0 +1,92 @@
+"""Attendance forecasts from day-of-week seasonal exponentially weighted averages.
+
+A kindergarten's history is loaded with one grouped query into a
+``series × weeks × 7`` NumPy array (one series per class plus one for
+children without a class). For each weekday the forecast is the
+exponentially weighted mean of that weekday's past headcounts, newer weeks
+weighing ``1 / (1 - alpha)`` times more than the week before. Days outside
+the history (the tail of the current week) are masked out of the weights.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count
+
+from attendance.models import Attendance
+from kindergarten.models import KindergartenClass
+from .models import AttendanceForecast
+
+HISTORY_DAYS = 182
+HORIZON_DAYS = 14
+ALPHA = 0.3
+
+
+def load_history(kindergarten_id, start_date, end_date):
+    """Return ``(series_keys, counts, valid)``; ``counts`` is ``series × weeks × 7``, weeks starting on Monday."""
+    class_ids = list(KindergartenClass.objects.filter(kindergarten_id=kindergarten_id).order_by("id").values_list("id", flat=True))
+    series_keys = [*class_ids, None]
+    position = {key: index for index, key in enumerate(series_keys)}
+
+    first_monday = start_date - timedelta(days=start_date.weekday())
+    weeks = (end_date - first_monday).days // 7 + 1
+    counts = np.zeros((len(series_keys), weeks * 7), dtype=np.float64)
+
+    rows = list(
+        Attendance.objects.filter(kindergarten_id=kindergarten_id, date__range=(start_date, end_date))
+        .order_by()
+        .values("class_id", "date")
+        .annotate(total=Count("id"))
+        .values_list("class_id", "date", "total")
+    )
+    if rows:
+        classes, dates, totals = zip(*rows)
+        # A class from another kindergarten (a child moved) counts as "no class" here.
+        series = np.fromiter((position.get(class_id, position[None]) for class_id in classes), dtype=np.int64, count=len(rows))
+        days = np.fromiter((day.toordinal() for day in dates), dtype=np.int64, count=len(rows)) - first_monday.toordinal()
+        np.add.at(counts, (series, days), np.fromiter(totals, dtype=np.float64, count=len(rows)))
+
+    valid = np.zeros(weeks * 7, dtype=bool)
+    valid[(start_date - first_monday).days:(end_date - first_monday).days + 1] = True
+    return series_keys, counts.reshape(len(series_keys), weeks, 7), valid.reshape(weeks, 7)
+
+
+def weekday_ewma(counts, valid, alpha=ALPHA):
+    """Exponentially weighted mean per series and weekday over the weeks axis; returns ``series × 7``."""
+    weeks = counts.shape[1]
+    weights = (1 - alpha) ** np.arange(weeks - 1, -1, -1, dtype=np.float64)
+    masked = weights[:, None] * valid
+    totals = masked.sum(axis=0)
+    return np.divide(
+        np.einsum("swd,wd->sd", counts, masked), totals,
+        out=np.zeros((counts.shape[0], 7)), where=totals > 0,
+    )
+
+
+def forecast_kindergarten(kindergarten_id, today, horizon=HORIZON_DAYS, history_days=HISTORY_DAYS, alpha=ALPHA):
+    """Replace the stored forecasts of one kindergarten from ``today`` on; returns the rows written."""
+    end_date = today - timedelta(days=1)
+    series_keys, counts, valid = load_history(kindergarten_id, today - timedelta(days=history_days), end_date)
+    by_weekday = weekday_ewma(counts, valid, alpha)
+    kindergarten_total = by_weekday.sum(axis=0)
+
+    rows = []
+    for offset in range(horizon):
+        day = today + timedelta(days=offset)
+        weekday = day.weekday()
+        rows.append(AttendanceForecast(
+            kindergarten_id=kindergarten_id, day=day, generated_on=today,
+            expected=round(float(kindergarten_total[weekday]), 2),
+        ))
+        rows.extend(
+            AttendanceForecast(
+                kindergarten_id=kindergarten_id, kindergarten_class_id=class_id, day=day, generated_on=today,
+                expected=round(float(by_weekday[index, weekday]), 2),
+            )
+            for index, class_id in enumerate(series_keys) if class_id is not None
+        )
+
+    with transaction.atomic():
+        AttendanceForecast.objects.filter(kindergarten_id=kindergarten_id).delete()
+        AttendanceForecast.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
@@ -0,0 +1,101 @@
+"""Engagement table comparing kindergartens or classes, built as a single SQL query.
+
+Each metric is a correlated subquery on the kindergarten/class row; ranks
+and percentiles are window functions over those, evaluated before
+LIMIT/OFFSET so a page still shows ranks across the whole table.
+"""
+from datetime import timedelta
+
+from django.db.models import Count, F, FloatField, IntegerField, OuterRef, Subquery, Value, Window
+from django.db.models.functions import Cast, Coalesce, CumeDist, NullIf, Rank
+
+from kindergarten.models import Kindergarten, KindergartenClass
+from children.models import Children
+from posts.models import Post
+from comments.models import Comment
+from activities.models import Activity
+from attendance.models import Attendance
+
+LEVELS = ("kindergarten", "class")
+METRICS = ("posts_per_week", "activities_per_class_week", "attendance_coverage", "comments_per_post")
+
+# Level -> lookup from each source model to the ranked row.
+_LOOKUPS = {
+    "kindergarten": {Post: "kindergarten", Comment: "post__kindergarten", Activity: "class_id__kindergarten",
+                     Attendance: "kindergarten", Children: "kindergarten", KindergartenClass: "kindergarten"},
+    "class": {Post: "class_id", Comment: "post__class_id", Activity: "class_id",
+              Attendance: "class_id", Children: "class_id", KindergartenClass: "pk"},
+}
+
+
+def school_days(start_date, end_date):
+    """Number of weekdays between the two dates, inclusive."""
+    days = (end_date - start_date).days + 1
+    full_weeks, remainder = divmod(days, 7)
+    extra = sum((start_date + timedelta(days=offset)).weekday() < 5 for offset in range(remainder))
+    return full_weeks * 5 + extra
+
+
+def _count(model, lookup, **filters):
+    rows = (
+        model.objects.filter(**{lookup: OuterRef("pk")}, **filters)
+        .order_by()
+        .values(lookup)
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+def _ratio(numerator, denominator):
+    return Cast(F(numerator), FloatField()) / NullIf(Cast(denominator, FloatField()), Value(0.0))
+
+
+def leaderboard(level, start_date, end_date):
+    """Queryset of ``values()`` rows with metrics, per-metric ranks and percentiles."""
+    lookups = _LOOKUPS[level]
+    created_in_range = {"created_at__date__range": (start_date, end_date)}
+    weeks = ((end_date - start_date).days + 1) / 7
+
+    if level == "kindergarten":
+        queryset = Kindergarten.objects.annotate(kindergarten_name=F("name"))
+    else:
+        queryset = KindergartenClass.objects.annotate(kindergarten_name=F("kindergarten__name"))
+
+    queryset = queryset.annotate(
+        posts=_count(Post, lookups[Post], **created_in_range),
+        comments=_count(Comment, lookups[Comment], post__created_at__date__range=(start_date, end_date)),
+        activities=_count(Activity, lookups[Activity], time__date__range=(start_date, end_date)),
+        attendance=_count(Attendance, lookups[Attendance], date__range=(start_date, end_date)),
+        children_count=_count(Children, lookups[Children]),
+        classes_count=_count(KindergartenClass, lookups[KindergartenClass]),
+    ).annotate(
+        posts_per_week=Cast(F("posts"), FloatField()) / Value(weeks),
+        activities_per_class_week=_ratio("activities", F("classes_count") * Value(weeks)),
+        attendance_coverage=_ratio("attendance", F("children_count") * Value(school_days(start_date, end_date))),
+        comments_per_post=_ratio("comments", F("posts")),
+    )
+
+    windows = {}
+    for metric in METRICS:
+        # NULL (nothing to divide by) ranks last. The percentile is the share
+        # of rows at or below this one, so ties share the higher value.
+        value = Coalesce(F(metric), Value(-1.0))
+        windows[f"{metric}_rank"] = Window(Rank(), order_by=value.desc())
+        windows[f"{metric}_percentile"] = Window(CumeDist(), order_by=value.asc())
+
+    return queryset.annotate(**windows).values(
+        "id", "name", "kindergarten_name", "posts", "comments", "activities", "attendance",
+        "children_count", "classes_count", *METRICS, *windows,
+    )
+
+
+def format_row(row, level):
+    row = dict(row)
+    if level == "kindergarten":
+        row.pop("kindergarten_name")
+    for metric in METRICS:
+        if row[metric] is not None:
+            row[metric] = round(row[metric], 3)
+        row[f"{metric}_percentile"] = round(row[f"{metric}_percentile"] * 100, 1)
+    return row
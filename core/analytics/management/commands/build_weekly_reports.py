@@ -0,0 +1,97 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import django
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from analytics.models import WeeklyReport
+from analytics.weekly_reports import load_week, render_reports, store_reports, week_bounds
+from kindergarten.models import Kindergarten
+
+
+def _init_worker():
+    # Needed when the pool spawns rather than forks; a no-op otherwise.
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = "Render weekly parent reports for every child (meals, naps, moods, hygiene, activities) and store them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--week", help="Any day of the week to report (YYYY-MM-DD). Defaults to last week.")
+        parser.add_argument("--kindergarten", type=int, action="append", help="Only build reports for this kindergarten id (repeatable).")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Rendering processes (default: CPU count; 1 renders in-process).")
+        parser.add_argument("--chunk-size", type=int, default=50, help="Reports rendered per task (default: 50).")
+        parser.add_argument("--email", action="store_true", help="Email reports that have not been sent yet to the parents.")
+
+    def handle(self, *args, **options):
+        if options["week"]:
+            try:
+                day = datetime.strptime(options["week"], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("Invalid --week. Use YYYY-MM-DD")
+        else:
+            day = timezone.localdate() - timedelta(days=7)
+        week_start, week_end = week_bounds(day)
+
+        kindergarten_ids = Kindergarten.objects.order_by("id").values_list("id", flat=True)
+        if options["kindergarten"]:
+            kindergarten_ids = kindergarten_ids.filter(id__in=options["kindergarten"])
+        kindergarten_ids = list(kindergarten_ids)
+
+        pool = None
+        if options["workers"] > 1:
+            # Workers only render; they never touch the database connection.
+            connections.close_all()
+            pool = ProcessPoolExecutor(max_workers=options["workers"], initializer=_init_worker)
+
+        try:
+            for kindergarten_id in kindergarten_ids:
+                started = time.monotonic()
+                payloads = load_week(kindergarten_id, week_start)
+                chunks = [payloads[i:i + options["chunk_size"]] for i in range(0, len(payloads), options["chunk_size"])]
+                rendered_chunks = pool.map(render_reports, chunks) if pool else map(render_reports, chunks)
+                rendered = [report for chunk in rendered_chunks for report in chunk]
+                stored = store_reports(kindergarten_id, week_start, rendered)
+                self.stdout.write(f"kindergarten {kindergarten_id}: {stored} report(s) in {time.monotonic() - started:.2f}s")
+        finally:
+            if pool:
+                pool.shutdown()
+
+        if options["email"]:
+            sent = self.email_reports(week_start, kindergarten_ids)
+            self.stdout.write(f"Emailed {sent} report(s).")
+
+        self.stdout.write(self.style.SUCCESS(f"Weekly reports for {week_start} – {week_end} are up to date."))
+
+    def email_reports(self, week_start, kindergarten_ids):
+        reports = (
+            WeeklyReport.objects.filter(week_start=week_start, kindergarten_id__in=kindergarten_ids, emailed_at__isnull=True)
+            .exclude(child__parent__email="")
+            .select_related("child__parent")
+        )
+        sent_ids = []
+        with get_connection() as connection:
+            for report in reports.iterator(chunk_size=500):
+                message = EmailMultiAlternatives(
+                    subject=f"{report.child.name}'s week of {week_start:%b %d}",
+                    body=report.text,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[report.child.parent.email],
+                    connection=connection,
+                )
+                message.attach_alternative(report.html, "text/html")
+                try:
+                    message.send()
+                except Exception as exc:
+                    self.stderr.write(f"Could not email report {report.id}: {exc}")
+                    continue
+                sent_ids.append(report.id)
+        WeeklyReport.objects.filter(id__in=sent_ids).update(emailed_at=timezone.now())
+        return len(sent_ids)
@@ -0,0 +1,66 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from analytics.anomalies import WINDOW_DAYS, detect_for_kindergarten
+from analytics.models import AnomalyFlag
+from kindergarten.models import Kindergarten
+
+
+def _init_worker():
+    # Needed when the pool spawns rather than forks; a no-op otherwise.
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = (
+        "Flag unusual patterns in children's daily logs (low appetite, missing naps, "
+        "long hygiene gaps, repeated negative moods). Meant to run nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Last day of the window to examine (YYYY-MM-DD). Defaults to yesterday.")
+        parser.add_argument("--window-days", type=int, default=WINDOW_DAYS, help=f"Days examined up to --date (default: {WINDOW_DAYS}).")
+        parser.add_argument("--kindergarten", type=int, action="append", help="Only examine this kindergarten id (repeatable).")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Kindergartens processed in parallel (default: CPU count; 1 runs in-process).")
+        parser.add_argument("--keep-days", type=int, default=90, help="Delete flags detected more than this many days ago (default: 90).")
+
+    def handle(self, *args, **options):
+        if options["date"]:
+            try:
+                as_of = datetime.strptime(options["date"], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("Invalid --date. Use YYYY-MM-DD")
+        else:
+            as_of = timezone.localdate() - timedelta(days=1)
+
+        kindergarten_ids = Kindergarten.objects.order_by("id").values_list("id", flat=True)
+        if options["kindergarten"]:
+            kindergarten_ids = kindergarten_ids.filter(id__in=options["kindergarten"])
+        kindergarten_ids = list(kindergarten_ids)
+        window_days = options["window_days"]
+
+        if options["workers"] <= 1 or len(kindergarten_ids) <= 1:
+            results = [detect_for_kindergarten(kg_id, as_of, window_days) for kg_id in kindergarten_ids]
+        else:
+            # Workers open their own connections; an inherited one must not be shared.
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options["workers"], initializer=_init_worker) as pool:
+                results = list(pool.map(
+                    detect_for_kindergarten, kindergarten_ids,
+                    [as_of] * len(kindergarten_ids), [window_days] * len(kindergarten_ids),
+                ))
+
+        for kg_id, flagged in zip(kindergarten_ids, results):
+            if flagged:
+                self.stdout.write(f"kindergarten {kg_id}: {flagged} flag(s)")
+
+        expired, _ = AnomalyFlag.objects.filter(detected_on__lt=as_of - timedelta(days=options["keep_days"])).delete()
+        self.stdout.write(self.style.SUCCESS(
+            f"Examined {len(kindergarten_ids)} kindergarten(s) through {as_of}: {sum(results)} flag(s), {expired} expired flag(s) removed."
+        ))
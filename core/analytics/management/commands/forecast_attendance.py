@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from analytics.forecast import ALPHA, HISTORY_DAYS, HORIZON_DAYS, forecast_kindergarten
+from kindergarten.models import Kindergarten
+
+
+class Command(BaseCommand):
+    help = "Precompute expected daily attendance per class and kindergarten for the coming days. Meant to run nightly."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=HORIZON_DAYS, help=f"Days to forecast from today (default: {HORIZON_DAYS}).")
+        parser.add_argument("--history-days", type=int, default=HISTORY_DAYS, help=f"Days of attendance history used (default: {HISTORY_DAYS}).")
+        parser.add_argument("--alpha", type=float, default=ALPHA, help=f"Smoothing factor; higher favours recent weeks (default: {ALPHA}).")
+        parser.add_argument("--kindergarten", type=int, action="append", help="Only forecast this kindergarten id (repeatable).")
+
+    def handle(self, *args, **options):
+        if not 0 < options["alpha"] <= 1:
+            raise CommandError("--alpha must be in (0, 1].")
+        if options["days"] < 1 or options["history_days"] < 7:
+            raise CommandError("--days must be at least 1 and --history-days at least 7.")
+
+        kindergartens = Kindergarten.objects.order_by("id").values_list("id", flat=True)
+        if options["kindergarten"]:
+            kindergartens = kindergartens.filter(id__in=options["kindergarten"])
+
+        today = timezone.localdate()
+        written = 0
+        for kindergarten_id in kindergartens:
+            written += forecast_kindergarten(kindergarten_id, today, options["days"], options["history_days"], options["alpha"])
+        self.stdout.write(self.style.SUCCESS(f"Stored {written} forecast row(s) from {today}."))
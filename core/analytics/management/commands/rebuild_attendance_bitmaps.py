@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db.models.functions import ExtractYear
+
+from analytics.bitmaps import rebuild
+from attendance.models import Attendance
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-child attendance bitmaps from the attendance records."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, action="append", help="Only rebuild this year (repeatable; default: every year with attendance).")
+        parser.add_argument("--kindergarten", type=int, help="Only rebuild bitmaps of this kindergarten's children.")
+
+    def handle(self, *args, **options):
+        years = options["year"] or (
+            Attendance.objects.annotate(year=ExtractYear("date")).order_by("year").values_list("year", flat=True).distinct()
+        )
+        written = 0
+        for year in years:
+            written += rebuild(year, options["kindergarten"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} attendance bitmap(s)."))
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from analytics.counters import compute_counters, stored_counters
+from analytics.models import KindergartenCounter
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-kindergarten dashboard counters from the source tables and report any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kindergarten", type=int, help="Only rebuild counters for this kindergarten id.")
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without writing anything.")
+
+    def handle(self, *args, **options):
+        kindergarten_id = options["kindergarten"]
+
+        with transaction.atomic():
+            # Lock the existing rows so concurrent signal updates wait for the rebuild.
+            locked = KindergartenCounter.objects.select_for_update()
+            if kindergarten_id is not None:
+                locked = locked.filter(kindergarten_id=kindergarten_id)
+            list(locked.values_list("id", flat=True))
+
+            actual = compute_counters(kindergarten_id)
+            stored = stored_counters(kindergarten_id)
+
+            drift = 0
+            rows = []
+            for kg_id in sorted(set(actual) | set(stored)):
+                for entity in KindergartenCounter.Entity.values:
+                    expected = actual.get(kg_id, {}).get(entity, 0)
+                    current = stored.get(kg_id, {}).get(entity)
+                    if current is not None and current != expected:
+                        drift += 1
+                        self.stdout.write(f"kindergarten {kg_id} {entity}: stored {current}, actual {expected}")
+                    if kg_id in actual:
+                        rows.append(KindergartenCounter(kindergarten_id=kg_id, entity=entity, count=expected))
+
+            if options["dry_run"]:
+                self.stdout.write(self.style.WARNING(f"Dry run: {drift} counter(s) out of sync."))
+                return
+
+            stale = KindergartenCounter.objects.exclude(kindergarten_id__in=list(actual))
+            if kindergarten_id is not None:
+                stale = stale.filter(kindergarten_id=kindergarten_id)
+            stale.delete()
+
+            KindergartenCounter.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["kindergarten", "entity"],
+                update_fields=["count", "updated_at"],
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(rows)} counter(s); fixed {drift} out of sync."))
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from analytics.models import RollupCheckpoint
+from analytics.rollups import METRICS, earliest_day, rollup_days
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll complete days up into DailyRollup for the chart statistics. "
+        "Without options only days after each metric's checkpoint are processed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--metric", action="append", choices=sorted(METRICS), help="Metric to roll up (repeatable). Defaults to all.")
+        parser.add_argument("--backfill", action="store_true", help="Rebuild each metric from its first row.")
+        parser.add_argument("--since", help="Rebuild from this day (YYYY-MM-DD).")
+        parser.add_argument("--lookback", type=int, default=2, help="Days before the checkpoint to re-roll for late or backdated writes (default: 2).")
+        parser.add_argument("--chunk-days", type=int, default=90, help="Days rolled up per transaction (default: 90).")
+
+    def handle(self, *args, **options):
+        metrics = options["metric"] or list(METRICS)
+        end = timezone.localdate() - timedelta(days=1)
+
+        since = None
+        if options["since"]:
+            try:
+                since = datetime.strptime(options["since"], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("Invalid --since date. Use YYYY-MM-DD")
+
+        checkpoints = dict(RollupCheckpoint.objects.filter(metric__in=metrics).values_list("metric", "rolled_through"))
+
+        for metric in metrics:
+            if since:
+                start = since
+            elif options["backfill"] or metric not in checkpoints:
+                start = earliest_day(metric)
+            else:
+                start = checkpoints[metric] + timedelta(days=1 - options["lookback"])
+
+            if start is None or start > end:
+                self.stdout.write(f"{metric}: up to date")
+                continue
+
+            rows = 0
+            chunk_start = start
+            while chunk_start <= end:
+                chunk_end = min(chunk_start + timedelta(days=options["chunk_days"] - 1), end)
+                rows += rollup_days(metric, chunk_start, chunk_end)
+                chunk_start = chunk_end + timedelta(days=1)
+
+            self.stdout.write(self.style.SUCCESS(f"{metric}: rolled up {start} to {end} ({rows} rows)"))
@@ -0,0 +1,40 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from analytics.reports import claim_next_job, delete_expired_jobs, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = "Compute queued report jobs (see /analytics/reports/). Runs until stopped unless --once is given."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Process the jobs currently queued, then exit.")
+        parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds to wait when the queue is empty (default: 2).")
+        parser.add_argument("--stale-after", type=int, default=30, help="Minutes after which a running job is assumed lost and re-queued (default: 30).")
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(minutes=options["stale_after"])
+        last_cleanup = 0
+
+        while True:
+            close_old_connections()
+            if time.monotonic() - last_cleanup > 60:
+                requeued = requeue_stale_jobs(stale_after)
+                expired = delete_expired_jobs()
+                if requeued or expired:
+                    self.stdout.write(f"Re-queued {requeued} stale job(s), deleted {expired} expired job(s).")
+                last_cleanup = time.monotonic()
+
+            job = claim_next_job()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+                continue
+
+            started = time.monotonic()
+            job = run_job(job)
+            self.stdout.write(f"{job.kind} {job.id}: {job.status} in {time.monotonic() - started:.1f}s")
@@ -0,0 +1,51 @@
+from attendance.models import Attendance
+
+ENCODINGS = ("bitstring", "rle", "hex")
+
+
+def presence_rows(children, start_date, end_date):
+    """Yield ``(child, presence)`` for each child, ``presence`` holding one b"1"/b"0" per calendar day.
+
+    ``children`` must be ordered by id. Attendance is read in a single query,
+    streamed in child order and merged with the children as it arrives.
+    """
+    days = (end_date - start_date).days + 1
+    records = (
+        Attendance.objects.filter(child_id__in=[child.id for child in children], date__range=(start_date, end_date))
+        .order_by("child_id", "date")
+        .values_list("child_id", "date")
+        .iterator(chunk_size=2000)
+    )
+    pending = next(records, None)
+
+    for child in children:
+        presence = bytearray(b"0" * days)
+        while pending is not None and pending[0] == child.id:
+            presence[(pending[1] - start_date).days] = ord("1")
+            pending = next(records, None)
+        yield child, presence
+
+
+def run_length_encode(presence):
+    """Encode a presence bitstring as runs, e.g. b"1110011" -> "P3A2P2"."""
+    if not presence:
+        return ""
+    runs = []
+    current, length = presence[0], 0
+    for bit in presence:
+        if bit == current:
+            length += 1
+        else:
+            runs.append(f"{'P' if current == ord('1') else 'A'}{length}")
+            current, length = bit, 1
+    runs.append(f"{'P' if current == ord('1') else 'A'}{length}")
+    return "".join(runs)
+
+
+def encode_presence(presence, encoding):
+    if encoding == "rle":
+        return run_length_encode(presence)
+    if encoding == "hex":
+        # The bitstring read as one big-endian binary number; 4 days per digit.
+        return format(int(presence, 2), f"0{(len(presence) + 3) // 4}x") if presence else ""
+    return presence.decode()
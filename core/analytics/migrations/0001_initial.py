@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('kindergarten', '0010_section_kindergartenclass_section'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KindergartenCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(choices=[('classes', 'Classes'), ('teachers', 'Teachers'), ('parents', 'Parents'), ('children', 'Children'), ('posts', 'Posts'), ('comments', 'Comments'), ('activities', 'Activities'), ('attendance', 'Attendance records'), ('meals', 'Meals'), ('hygiene', 'Hygiene records'), ('naps', 'Naps'), ('moods', 'Moods')], max_length=20)),
+                ('count', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('kindergarten', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='counters', to='kindergarten.kindergarten')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kindergarten', 'entity'), name='unique_kindergarten_counter')],
+            },
+        ),
+    ]
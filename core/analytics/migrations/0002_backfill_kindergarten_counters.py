@@ -0,0 +1,62 @@
+from django.db import migrations
+from django.db.models import Count
+
+COUNTED = [
+    ("kindergarten", "KindergartenClass", "classes", "kindergarten_id"),
+    ("kindergarten", "Teacher", "teachers", "kindergarten_id"),
+    ("children", "Children", "children", "kindergarten_id"),
+    ("posts", "Post", "posts", "kindergarten_id"),
+    ("comments", "Comment", "comments", "post__kindergarten_id"),
+    ("activities", "Activity", "activities", "class_id__kindergarten_id"),
+    ("attendance", "Attendance", "attendance", "child__kindergarten_id"),
+    ("meals", "Meal", "meals", "child__kindergarten_id"),
+    ("hygiene", "Hygiene", "hygiene", "child__kindergarten_id"),
+    ("naps", "Nap", "naps", "child__kindergarten_id"),
+    ("mood", "ChildMood", "moods", "child__kindergarten_id"),
+]
+
+
+def backfill(apps, schema_editor):
+    KindergartenCounter = apps.get_model("analytics", "KindergartenCounter")
+    totals = {}
+
+    for app_label, model_name, entity, lookup in COUNTED:
+        model = apps.get_model(app_label, model_name)
+        rows = model.objects.order_by().values(lookup).annotate(total=Count("id")).values_list(lookup, "total")
+        for kg_id, total in rows:
+            if kg_id is not None:
+                totals[(kg_id, entity)] = total
+
+    Children = apps.get_model("children", "Children")
+    parents = (
+        Children.objects.order_by().values("kindergarten_id")
+        .annotate(total=Count("parent_id", distinct=True))
+        .values_list("kindergarten_id", "total")
+    )
+    for kg_id, total in parents:
+        totals[(kg_id, "parents")] = total
+
+    KindergartenCounter.objects.bulk_create(
+        KindergartenCounter(kindergarten_id=kg_id, entity=entity, count=total)
+        for (kg_id, entity), total in totals.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('activities', '0001_initial'),
+        ('attendance', '0002_alter_attendance_date'),
+        ('children', '0003_children_bio_alter_children_name'),
+        ('comments', '0001_initial'),
+        ('hygiene', '0001_initial'),
+        ('meals', '0002_meal_appetite_level'),
+        ('mood', '0001_initial'),
+        ('naps', '0001_initial'),
+        ('posts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_backfill_kindergarten_counters'),
+        ('kindergarten', '0010_section_kindergartenclass_section'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=20, unique=True)),
+                ('rolled_through', models.DateField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=20)),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('kindergarten', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='kindergarten.kindergarten')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['metric', 'day'], name='daily_rollup_metric_day')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('kindergarten__isnull', False)), fields=('metric', 'kindergarten', 'day'), name='unique_daily_rollup'), models.UniqueConstraint(condition=models.Q(('kindergarten__isnull', True)), fields=('metric', 'day'), name='unique_global_daily_rollup')],
+            },
+        ),
+    ]
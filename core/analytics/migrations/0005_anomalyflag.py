@@ -0,0 +1,34 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_reportjob'),
+        ('children', '0004_children_created_at'),
+        ('kindergarten', '0010_section_kindergartenclass_section'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnomalyFlag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rule', models.CharField(choices=[('low_appetite', 'Low appetite on several days'), ('missing_nap', 'No nap logged on attended days'), ('hygiene_gap', 'Long gap between hygiene events'), ('negative_moods', 'Repeated negative moods')], max_length=20)),
+                ('detected_on', models.DateField()),
+                ('window_start', models.DateField()),
+                ('value', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('child', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anomaly_flags', to='children.children')),
+                ('kindergarten', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anomaly_flags', to='kindergarten.kindergarten')),
+            ],
+            options={
+                'ordering': ['-detected_on', 'child_id', 'rule'],
+                'indexes': [models.Index(fields=['kindergarten', 'detected_on'], name='anomaly_flag_kg_day')],
+                'constraints': [models.UniqueConstraint(fields=('child', 'rule', 'detected_on'), name='unique_anomaly_flag')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0005_anomalyflag'),
+        ('kindergarten', '0010_section_kindergartenclass_section'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('expected', models.FloatField()),
+                ('generated_on', models.DateField()),
+                ('kindergarten', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_forecasts', to='kindergarten.kindergarten')),
+                ('kindergarten_class', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_forecasts', to='kindergarten.kindergartenclass')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kindergarten', 'day'], name='attendance_forecast_kg_day')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('kindergarten_class__isnull', False)), fields=('kindergarten_class', 'day'), name='unique_class_attendance_forecast'), models.UniqueConstraint(condition=models.Q(('kindergarten_class__isnull', True)), fields=('kindergarten', 'day'), name='unique_kindergarten_attendance_forecast')],
+            },
+        ),
+    ]
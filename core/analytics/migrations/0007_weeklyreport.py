@@ -0,0 +1,34 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0006_attendanceforecast'),
+        ('children', '0004_children_created_at'),
+        ('kindergarten', '0010_section_kindergartenclass_section'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeeklyReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_start', models.DateField()),
+                ('html', models.TextField()),
+                ('text', models.TextField()),
+                ('rendered_at', models.DateTimeField(auto_now=True)),
+                ('emailed_at', models.DateTimeField(blank=True, null=True)),
+                ('child', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_reports', to='children.children')),
+                ('kindergarten', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_reports', to='kindergarten.kindergarten')),
+            ],
+            options={
+                'ordering': ['-week_start', 'child_id'],
+                'indexes': [models.Index(fields=['kindergarten', 'week_start'], name='weekly_report_kg_week')],
+                'constraints': [models.UniqueConstraint(fields=('child', 'week_start'), name='unique_weekly_report')],
+            },
+        ),
+    ]
@@ -1,3 +1,238 @@
+import uuid
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from kindergarten.models import Kindergarten, KindergartenClass
+from children.models import Children
+
+
+class KindergartenCounter(models.Model):
+    """Running total of one entity type inside a kindergarten.
+
+    Maintained by the signal handlers in ``analytics.signals`` and rebuilt by
+    ``manage.py rebuild_counters``.
+    """
+
+    class Entity(models.TextChoices):
+        CLASSES = "classes", "Classes"
+        TEACHERS = "teachers", "Teachers"
+        PARENTS = "parents", "Parents"
+        CHILDREN = "children", "Children"
+        POSTS = "posts", "Posts"
+        COMMENTS = "comments", "Comments"
+        ACTIVITIES = "activities", "Activities"
+        ATTENDANCE = "attendance", "Attendance records"
+        MEALS = "meals", "Meals"
+        HYGIENE = "hygiene", "Hygiene records"
+        NAPS = "naps", "Naps"
+        MOODS = "moods", "Moods"
+
+    kindergarten = models.ForeignKey(Kindergarten, on_delete=models.CASCADE, related_name="counters")
+    entity = models.CharField(max_length=20, choices=Entity.choices)
+    count = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kindergarten", "entity"], name="unique_kindergarten_counter"),
+        ]
+
+    def __str__(self):
+        return f"{self.kindergarten_id} - {self.entity}: {self.count}"
+
+
+class DailyRollup(models.Model):
+    """Number of rows of one metric created on one day in one kindergarten.
+
+    ``kindergarten`` is empty for metrics that are not scoped to a kindergarten
+    (users). Written by ``manage.py rollup_stats``.
+    """
+
+    metric = models.CharField(max_length=20)
+    kindergarten = models.ForeignKey(Kindergarten, on_delete=models.CASCADE, null=True, blank=True, related_name="daily_rollups")
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["metric", "kindergarten", "day"],
+                condition=models.Q(kindergarten__isnull=False),
+                name="unique_daily_rollup",
+            ),
+            models.UniqueConstraint(
+                fields=["metric", "day"],
+                condition=models.Q(kindergarten__isnull=True),
+                name="unique_global_daily_rollup",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["metric", "day"], name="daily_rollup_metric_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} {self.day} ({self.kindergarten_id}): {self.count}"
+
+
+class RollupCheckpoint(models.Model):
+    """Last complete day that ``rollup_stats`` has rolled up for a metric."""
+
+    metric = models.CharField(max_length=20, unique=True)
+    rolled_through = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.metric} through {self.rolled_through}"
+
+
+class ReportJob(models.Model):
+    """A report requested through ``/analytics/reports/`` and computed by ``manage.py run_report_worker``.
+
+    ``params`` holds the query parameters the matching endpoint would have
+    received. The result is kept until ``expires_at`` and deleted afterwards.
+    """
+
+    class Kind(models.TextChoices):
+        STATISTICS = "statistics", "Chart statistics"
+        TEACHER_ACTIVITY = "teacher_activity", "Teacher activity"
+        ATTENDANCE_REPORT = "attendance_report", "Attendance report"
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=30, choices=Kind.choices)
+    params = models.JSONField(default=dict, blank=True)
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="report_jobs")
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    result = models.JSONField(encoder=DjangoJSONEncoder, null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="report_job_status_created"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.id} ({self.status})"
+
+
+class AnomalyFlag(models.Model):
+    """A pattern in a child's daily logs found by ``manage.py detect_anomalies``.
+
+    ``detected_on`` is the last day of the window the job examined;
+    ``value`` is the rule's measurement (days, or minutes for hygiene gaps).
+    """
+
+    class Rule(models.TextChoices):
+        LOW_APPETITE = "low_appetite", "Low appetite on several days"
+        MISSING_NAP = "missing_nap", "No nap logged on attended days"
+        HYGIENE_GAP = "hygiene_gap", "Long gap between hygiene events"
+        NEGATIVE_MOODS = "negative_moods", "Repeated negative moods"
+
+    kindergarten = models.ForeignKey(Kindergarten, on_delete=models.CASCADE, related_name="anomaly_flags")
+    child = models.ForeignKey(Children, on_delete=models.CASCADE, related_name="anomaly_flags")
+    rule = models.CharField(max_length=20, choices=Rule.choices)
+    detected_on = models.DateField()
+    window_start = models.DateField()
+    value = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-detected_on", "child_id", "rule"]
+        constraints = [
+            models.UniqueConstraint(fields=["child", "rule", "detected_on"], name="unique_anomaly_flag"),
+        ]
+        indexes = [
+            models.Index(fields=["kindergarten", "detected_on"], name="anomaly_flag_kg_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.child_id} {self.rule} on {self.detected_on} ({self.value})"
+
+
+class AttendanceForecast(models.Model):
+    """Expected headcount for one future day, written by ``manage.py forecast_attendance``.
+
+    ``kindergarten_class`` is empty for the kindergarten-wide total.
+    """
+
+    kindergarten = models.ForeignKey(Kindergarten, on_delete=models.CASCADE, related_name="attendance_forecasts")
+    kindergarten_class = models.ForeignKey(KindergartenClass, on_delete=models.CASCADE, null=True, blank=True, related_name="attendance_forecasts")
+    day = models.DateField()
+    expected = models.FloatField()
+    generated_on = models.DateField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kindergarten_class", "day"],
+                condition=models.Q(kindergarten_class__isnull=False),
+                name="unique_class_attendance_forecast",
+            ),
+            models.UniqueConstraint(
+                fields=["kindergarten", "day"],
+                condition=models.Q(kindergarten_class__isnull=True),
+                name="unique_kindergarten_attendance_forecast",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["kindergarten", "day"], name="attendance_forecast_kg_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.kindergarten_id}/{self.kindergarten_class_id} {self.day}: {self.expected:.1f}"
+
+
+class WeeklyReport(models.Model):
+    """A parent-facing summary of one child's week, rendered by ``manage.py build_weekly_reports``."""
+
+    child = models.ForeignKey(Children, on_delete=models.CASCADE, related_name="weekly_reports")
+    kindergarten = models.ForeignKey(Kindergarten, on_delete=models.CASCADE, related_name="weekly_reports")
+    week_start = models.DateField()
+    html = models.TextField()
+    text = models.TextField()
+    rendered_at = models.DateTimeField(auto_now=True)
+    emailed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-week_start", "child_id"]
+        constraints = [
+            models.UniqueConstraint(fields=["child", "week_start"], name="unique_weekly_report"),
+        ]
+        indexes = [
+            models.Index(fields=["kindergarten", "week_start"], name="weekly_report_kg_week"),
+        ]
+
+    def __str__(self):
+        return f"{self.child_id} week of {self.week_start}"
+
+
+class AttendanceBitmap(models.Model):
+    """One child's attendance for a calendar year, one bit per school day (weekday).
+
+    Bit ``i`` (big-endian within each byte) is the year's ``i``-th weekday;
+    see ``analytics.bitmaps``. Kept in step with ``Attendance`` by signals
+    and rebuilt by ``manage.py rebuild_attendance_bitmaps``.
+    """
+
+    child = models.ForeignKey(Children, on_delete=models.CASCADE, related_name="attendance_bitmaps")
+    year = models.PositiveSmallIntegerField()
+    bits = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["child", "year"], name="unique_attendance_bitmap"),
+        ]
 
-# Create your models here.
+    def __str__(self):
+        return f"{self.child_id} {self.year}"
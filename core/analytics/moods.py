@@ -0,0 +1,174 @@
+"""Mood trends for a class, computed on NumPy arrays.
+
+Records are loaded once as ``(child_id, date, mood)`` and turned into a
+``children × days × moods`` count tensor; every statistic below is an
+array operation on that tensor, so the cost does not depend on how many
+Python objects a class has.
+"""
+from datetime import timedelta
+
+import numpy as np
+
+from mood.models import ChildMood
+
+MOODS = tuple(ChildMood.MoodChoices.values)
+NEGATIVE_MOODS = (
+    ChildMood.MoodChoices.SAD,
+    ChildMood.MoodChoices.ANGRY,
+    ChildMood.MoodChoices.ANNOYED,
+    ChildMood.MoodChoices.FRUSTRATED,
+)
+
+_MOOD_ORDER = np.argsort(MOODS)
+_SORTED_MOODS = np.array(MOODS)[_MOOD_ORDER]
+_NEGATIVE_MASK = np.isin(np.array(MOODS), NEGATIVE_MOODS)
+
+
+def load_mood_counts(child_ids, start_date, end_date):
+    """Return a ``len(child_ids) × days × len(MOODS)`` int32 array of mood records.
+
+    ``child_ids`` must be sorted. A single query is made.
+    """
+    days = (end_date - start_date).days + 1
+    counts = np.zeros((len(child_ids), days, len(MOODS)), dtype=np.int32)
+    rows = list(
+        ChildMood.objects.filter(child_id__in=child_ids, date__range=(start_date, end_date))
+        .order_by()
+        .values_list("child_id", "date", "mood")
+    )
+    if not rows:
+        return counts
+
+    record_children, record_dates, record_moods = zip(*rows)
+    origin = start_date.toordinal()
+    child_index = np.searchsorted(np.asarray(child_ids), np.fromiter(record_children, dtype=np.int64, count=len(rows)))
+    day_index = np.fromiter((day.toordinal() for day in record_dates), dtype=np.int64, count=len(rows)) - origin
+
+    moods = np.asarray(record_moods)
+    sorted_position = np.searchsorted(_SORTED_MOODS, moods).clip(max=len(MOODS) - 1)
+    known = _SORTED_MOODS[sorted_position] == moods
+    mood_index = _MOOD_ORDER[sorted_position]
+
+    np.add.at(counts, (child_index[known], day_index[known], mood_index[known]), 1)
+    return counts
+
+
+def rolling_sums(counts, window):
+    """Sum ``counts`` over a trailing ``window``-day window along the day axis."""
+    cumulative = np.cumsum(counts, axis=-2, dtype=np.int64)
+    shifted = np.zeros_like(cumulative)
+    shifted[..., window:, :] = cumulative[..., :-window, :]
+    return cumulative - shifted
+
+
+def distribution(counts):
+    """Normalise the last axis to shares, leaving all-zero rows at zero."""
+    totals = counts.sum(axis=-1, keepdims=True)
+    return np.divide(counts, totals, out=np.zeros(counts.shape, dtype=np.float64), where=totals > 0)
+
+
+def negative_streaks(counts):
+    """Longest and current run of consecutive logged days with only negative moods, per child.
+
+    Days without any mood record neither extend nor break a streak.
+    """
+    logged = counts.sum(axis=2) > 0
+    negative = (counts[:, :, _NEGATIVE_MASK].sum(axis=2) > 0) & (counts[:, :, ~_NEGATIVE_MASK].sum(axis=2) == 0)
+
+    child, day = np.nonzero(logged)
+    longest = np.zeros(counts.shape[0], dtype=np.int64)
+    current = np.zeros(counts.shape[0], dtype=np.int64)
+    if not len(child):
+        return longest, current
+
+    is_negative = negative[child, day]
+    run_start = np.ones(len(child), dtype=bool)
+    run_start[1:] = (child[1:] != child[:-1]) | (is_negative[1:] != is_negative[:-1])
+    run_id = np.cumsum(run_start) - 1
+    run_length = np.bincount(run_id)
+    run_child = child[run_start]
+    run_negative = is_negative[run_start]
+
+    np.maximum.at(longest, run_child[run_negative], run_length[run_negative])
+    last_run = np.ones(len(run_child), dtype=bool)
+    last_run[:-1] = run_child[1:] != run_child[:-1]
+    ending_negative = last_run & run_negative
+    current[run_child[ending_negative]] = run_length[ending_negative]
+    return longest, current
+
+
+def weekly_counts(counts, start_date):
+    """Sum the day axis into Monday-based weeks; returns ``(week_starts, counts)``."""
+    offset = start_date.weekday()
+    days = counts.shape[-2]
+    weeks = (days + offset + 6) // 7
+    padded = np.zeros(counts.shape[:-2] + (weeks * 7, counts.shape[-1]), dtype=counts.dtype)
+    padded[..., offset:offset + days, :] = counts
+    by_week = padded.reshape(counts.shape[:-2] + (weeks, 7, counts.shape[-1])).sum(axis=-2)
+    first_monday = start_date - timedelta(days=offset)
+    return [first_monday + timedelta(weeks=week) for week in range(weeks)], by_week
+
+
+def _shares(row):
+    return {mood: round(float(share), 4) for mood, share in zip(MOODS, row)}
+
+
+def class_mood_trend(children, start_date, end_date, window=7):
+    """Mood trend for ``children`` (ordered by id) between ``start_date`` and ``end_date``."""
+    counts = load_mood_counts([child.id for child in children], start_date, end_date)
+    class_counts = counts.sum(axis=0)
+
+    class_rolling = distribution(rolling_sums(class_counts, window))
+    child_totals = counts.sum(axis=1)
+    child_rolling = distribution(counts[:, -window:, :].sum(axis=1))
+    longest, current = negative_streaks(counts)
+
+    week_starts, class_weeks = weekly_counts(class_counts, start_date)
+    week_distribution = distribution(class_weeks)
+    week_negative = week_distribution[:, _NEGATIVE_MASK].sum(axis=1)
+    week_shift = np.diff(week_distribution, axis=0, prepend=np.nan)
+
+    # Per child: negative share of the last 7 days against the 7 days before.
+    last_week = distribution(counts[:, -7:, :].sum(axis=1))[:, _NEGATIVE_MASK].sum(axis=1)
+    previous_week = distribution(counts[:, -14:-7, :].sum(axis=1))[:, _NEGATIVE_MASK].sum(axis=1)
+    child_negative_change = last_week - previous_week
+
+    days = class_counts.shape[0]
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "window": window,
+        "moods": list(MOODS),
+        "negative_moods": [str(mood) for mood in NEGATIVE_MOODS],
+        "daily": [
+            {
+                "date": start_date + timedelta(days=offset),
+                "records": int(class_counts[offset].sum()),
+                "rolling_distribution": _shares(class_rolling[offset]),
+            }
+            for offset in range(days)
+        ],
+        "weekly": [
+            {
+                "week_start": week_start,
+                "records": int(class_weeks[week].sum()),
+                "distribution": _shares(week_distribution[week]),
+                "negative_share": round(float(week_negative[week]), 4),
+                "shift": None if week == 0 else _shares(week_shift[week]),
+            }
+            for week, week_start in enumerate(week_starts)
+        ],
+        "children": [
+            {
+                "child_id": child.id,
+                "child_name": child.name,
+                "records": int(child_totals[index].sum()),
+                "distribution": _shares(distribution(child_totals[index])),
+                "rolling_distribution": _shares(child_rolling[index]),
+                "longest_negative_streak": int(longest[index]),
+                "current_negative_streak": int(current[index]),
+                "negative_share_change": round(float(child_negative_change[index]), 4),
+            }
+            for index, child in enumerate(children)
+        ],
+    }
@@ -0,0 +1,84 @@
+"""Nap-duration statistics, aggregated in the database from ``Nap.duration_minutes``.
+
+Percentiles use the nearest-rank method: the p-th percentile of ``n``
+durations is the ``ceil(p * n / 100)``-th smallest, computed in integer
+arithmetic. Ranks come from window functions, so only the rows at those
+ranks leave the database.
+"""
+from django.db.models import Avg, Count, F, Max, Min, Q, Window
+from django.db.models.functions import RowNumber
+
+# Group -> (lookup from Nap to the group id, lookup to its display name).
+GROUPS = {
+    "child": ("child_id", "child__name"),
+    "class": ("class_id", "class_id__name"),
+    "kindergarten": ("kindergarten_id", "kindergarten__name"),
+}
+
+PERCENTILES = {"p10": 10, "median": 50, "p90": 90}
+
+
+def duration_stats(naps, group_by, bucket_minutes=15):
+    """Per-group count, mean, min/max, p10/median/p90 and histogram of ``naps``' durations.
+
+    Three queries whatever the number of groups: one aggregate, one for the
+    percentile rows and one for the histogram.
+    """
+    group_field, name_field = GROUPS[group_by]
+    naps = naps.filter(duration_minutes__isnull=False).order_by()
+
+    summary = (
+        naps.values(group_field, name_field)
+        .annotate(count=Count("id"), mean=Avg("duration_minutes"), min=Min("duration_minutes"), max=Max("duration_minutes"))
+        .order_by(group_field)
+    )
+    groups = {
+        row[group_field]: {
+            "id": row[group_field],
+            "name": row[name_field],
+            "count": row["count"],
+            "mean_minutes": round(row["mean"], 1),
+            "min_minutes": row["min"],
+            "max_minutes": row["max"],
+            **dict.fromkeys((f"{name}_minutes" for name in PERCENTILES), None),
+            "histogram": [],
+        }
+        for row in summary
+    }
+
+    ranked = naps.annotate(
+        rank=Window(RowNumber(), partition_by=[F(group_field)], order_by=[F("duration_minutes").asc(), F("id").asc()]),
+        total=Window(Count("id"), partition_by=[F(group_field)]),
+    )
+    at_percentile = Q()
+    for percent in PERCENTILES.values():
+        at_percentile |= Q(rank=(F("total") * percent + 99) / 100)
+    for group_id, rank, total, minutes in ranked.filter(at_percentile).values_list(group_field, "rank", "total", "duration_minutes"):
+        for name, percent in PERCENTILES.items():
+            if rank == (total * percent + 99) // 100:
+                groups[group_id][f"{name}_minutes"] = minutes
+
+    buckets = (
+        naps.annotate(bucket=F("duration_minutes") / bucket_minutes)
+        .values(group_field, "bucket")
+        .annotate(count=Count("id"))
+        .order_by(group_field, "bucket")
+        .values_list(group_field, "bucket", "count")
+    )
+    for group_id, bucket, count in buckets:
+        groups[group_id]["histogram"].append({
+            "from_minutes": int(bucket) * bucket_minutes,
+            "to_minutes": (int(bucket) + 1) * bucket_minutes,
+            "count": count,
+        })
+
+    return list(groups.values())
+
+
+def longest_naps(naps, limit=10):
+    """The ``limit`` longest naps, served by the index on ``duration_minutes``."""
+    return list(
+        naps.filter(duration_minutes__isnull=False)
+        .order_by("-duration_minutes", "-date")
+        .values("id", "child_id", "child__name", "date", "sleep_from", "sleep_to", "duration_minutes")[:limit]
+    )
@@ -0,0 +1,79 @@
+"""Background execution of ReportJob rows.
+
+A job runs the ``report()`` method of the endpoint it was requested for,
+with the requester as user and the stored parameters as query string, so a
+downloaded report is exactly what the synchronous endpoint would have
+returned (minus pagination for teacher activity).
+"""
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import ReportJob
+from .views import AttendanceReportView, StatisticsAPIView, TeacherActivityView
+
+logger = logging.getLogger(__name__)
+
+REPORT_VIEWS = {
+    ReportJob.Kind.STATISTICS: StatisticsAPIView,
+    ReportJob.Kind.TEACHER_ACTIVITY: TeacherActivityView,
+    ReportJob.Kind.ATTENDANCE_REPORT: AttendanceReportView,
+}
+
+
+def result_ttl():
+    return timedelta(seconds=getattr(settings, "REPORT_RESULT_TTL", 24 * 60 * 60))
+
+
+def claim_next_job():
+    """Mark the oldest pending job as running and return it, or None when the queue is empty.
+
+    The conditional UPDATE makes the claim atomic, so several workers can
+    poll the same table without running a job twice.
+    """
+    pending = ReportJob.objects.filter(status=ReportJob.Status.PENDING).order_by("created_at")
+    for job_id in pending.values_list("id", flat=True)[:10]:
+        claimed = ReportJob.objects.filter(id=job_id, status=ReportJob.Status.PENDING).update(
+            status=ReportJob.Status.RUNNING, started_at=timezone.now(),
+        )
+        if claimed:
+            return ReportJob.objects.select_related("requested_by").get(id=job_id)
+    return None
+
+
+def run_job(job):
+    """Compute ``job`` and store its result or error."""
+    view = REPORT_VIEWS[job.kind]()
+    try:
+        response = view.report(job.requested_by, {key: str(value) for key, value in job.params.items()})
+        data = json.loads(json.dumps(response.data, cls=DjangoJSONEncoder))
+    except Exception as exc:
+        logger.exception("Report job %s failed", job.id)
+        job.status, job.error, job.result = ReportJob.Status.FAILED, str(exc), None
+    else:
+        if response.status_code >= 400:
+            job.status, job.result = ReportJob.Status.FAILED, None
+            job.error = data.get("error", "") if isinstance(data, dict) else str(data)
+        else:
+            job.status, job.result, job.error = ReportJob.Status.DONE, data, ""
+
+    job.finished_at = timezone.now()
+    job.expires_at = job.finished_at + result_ttl()
+    job.save(update_fields=["status", "result", "error", "finished_at", "expires_at"])
+    return job
+
+
+def requeue_stale_jobs(older_than):
+    """Put back jobs whose worker died while running them."""
+    return ReportJob.objects.filter(
+        status=ReportJob.Status.RUNNING, started_at__lt=timezone.now() - older_than,
+    ).update(status=ReportJob.Status.PENDING, started_at=None)
+
+
+def delete_expired_jobs():
+    deleted, _ = ReportJob.objects.filter(expires_at__lt=timezone.now()).delete()
+    return deleted
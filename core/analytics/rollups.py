@@ -0,0 +1,145 @@
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, DateTimeField, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from auth_app.models import User
+from children.models import Children
+from posts.models import Post
+from comments.models import Comment
+from activities.models import Activity
+from attendance.models import Attendance
+from meals.models import Meal, MenuPlan
+from meals.plans import planned_meal_counts
+from hygiene.models import Hygiene
+from naps.models import Nap
+from mood.models import ChildMood
+from .models import DailyRollup, RollupCheckpoint
+
+# Metric -> (model, field that dates a row, lookup from the model to its kindergarten id).
+# A lookup of None means the metric is only rolled up globally.
+METRICS = {
+    "posts": (Post, "created_at", "kindergarten_id"),
+    "comments": (Comment, "created_at", "post__kindergarten_id"),
+    "activities": (Activity, "time", "class_id__kindergarten_id"),
+    "attendance": (Attendance, "date", "kindergarten_id"),
+    "meals": (Meal, "date", "kindergarten_id"),
+    "hygiene": (Hygiene, "date", "kindergarten_id"),
+    "naps": (Nap, "date", "kindergarten_id"),
+    "moods": (ChildMood, "date", "kindergarten_id"),
+    "users": (User, "date_joined", None),
+    "children": (Children, "created_at", "kindergarten_id"),
+}
+
+INTERVALS = ("day", "week", "month", "year")
+
+
+def daily_counts(metric, start, end, kindergarten_id=None):
+    """Count rows per (kindergarten id, day) straight from the source table; meals add the planned ones."""
+    model, time_field, kindergarten_lookup = METRICS[metric]
+    is_datetime = isinstance(model._meta.get_field(time_field), DateTimeField)
+
+    day_expression = TruncDate(time_field) if is_datetime else F(time_field)
+    day_filter = f"{time_field}__date__range" if is_datetime else f"{time_field}__range"
+
+    queryset = model.objects.order_by().filter(**{day_filter: (start, end)})
+    group_by = ["rollup_day"]
+    if kindergarten_lookup:
+        group_by.insert(0, kindergarten_lookup)
+        if kindergarten_id is not None:
+            queryset = queryset.filter(**{kindergarten_lookup: kindergarten_id})
+
+    rows = queryset.annotate(rollup_day=day_expression).values(*group_by).annotate(total=Count("id"))
+    counts = Counter({
+        (row[kindergarten_lookup] if kindergarten_lookup else None, row["rollup_day"]): row["total"]
+        for row in rows
+        if not kindergarten_lookup or row[kindergarten_lookup] is not None
+    })
+    if metric == "meals":
+        counts.update(planned_daily_counts(start, end, kindergarten_id))
+    return [(kg_id, day, total) for (kg_id, day), total in counts.items()]
+
+
+def planned_daily_counts(start, end, kindergarten_id=None):
+    """Meals resolved from class menu plans per (kindergarten id, day); they have no row of their own."""
+    plans = MenuPlan.objects.filter(date__range=(start, end))
+    if kindergarten_id is not None:
+        plans = plans.filter(kindergarten_id=kindergarten_id)
+    return planned_meal_counts(plans, lambda plan, child_id: (plan.kindergarten_id, plan.date))
+
+
+def rollup_days(metric, start, end):
+    """Replace the stored daily rows of ``metric`` between ``start`` and ``end`` inclusive."""
+    rows = [
+        DailyRollup(metric=metric, kindergarten_id=kg_id, day=day, count=total)
+        for kg_id, day, total in daily_counts(metric, start, end)
+    ]
+    with transaction.atomic():
+        DailyRollup.objects.filter(metric=metric, day__range=(start, end)).delete()
+        DailyRollup.objects.bulk_create(rows, batch_size=1000)
+        RollupCheckpoint.objects.update_or_create(metric=metric, defaults={"rolled_through": end})
+    return len(rows)
+
+
+def earliest_day(metric):
+    """First day with data for ``metric``, or None for an empty table."""
+    model, time_field, _ = METRICS[metric]
+    first = (
+        model.objects.filter(**{f"{time_field}__isnull": False})
+        .order_by(time_field)
+        .values_list(time_field, flat=True)
+        .first()
+    )
+    if isinstance(first, datetime):
+        first = timezone.localdate(first) if timezone.is_aware(first) else first.date()
+    if metric == "meals":
+        first_plan = MenuPlan.objects.order_by("date").values_list("date", flat=True).first()
+        first = min(day for day in (first, first_plan) if day) if first or first_plan else None
+    return first
+
+
+def bucket_start(day, interval):
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+    if interval == "year":
+        return day.replace(month=1, day=1)
+    return day
+
+
+def chart_series(metric, interval, start, end, kindergarten_id=None):
+    """Counts per ``interval`` bucket between ``start`` and ``end``.
+
+    Days up to the metric's checkpoint come from DailyRollup; later days
+    (today, which ``rollup_stats`` never stores, and any the job has not
+    reached yet) are counted live from the source table.
+    """
+    rolled_through = RollupCheckpoint.objects.filter(metric=metric).values_list("rolled_through", flat=True).first()
+    per_day = {}
+
+    if rolled_through is not None and start <= rolled_through:
+        rolled = DailyRollup.objects.filter(metric=metric, day__range=(start, min(end, rolled_through)))
+        if kindergarten_id is not None:
+            rolled = rolled.filter(kindergarten_id=kindergarten_id)
+        for day, total in rolled.values("day").annotate(total=Sum("count")).values_list("day", "total"):
+            per_day[day] = total
+
+    live_start = start if rolled_through is None else max(start, rolled_through + timedelta(days=1))
+    if live_start <= end:
+        for _, day, total in daily_counts(metric, live_start, end, kindergarten_id):
+            per_day[day] = per_day.get(day, 0) + total
+
+    buckets = {}
+    for day, total in per_day.items():
+        period = bucket_start(day, interval)
+        buckets[period] = buckets.get(period, 0) + total
+
+    tz = timezone.get_current_timezone()
+    return [
+        {"period": datetime.combine(period, time.min, tzinfo=tz), "count": buckets[period]}
+        for period in sorted(buckets)
+    ]
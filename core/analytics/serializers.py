@@ -0,0 +1,30 @@
+from rest_framework import serializers
+from .models import AnomalyFlag, ReportJob, WeeklyReport
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReportJob
+        fields = ["id", "kind", "params", "status", "error", "created_at", "started_at", "finished_at", "expires_at"]
+        read_only_fields = ["id", "status", "error", "created_at", "started_at", "finished_at", "expires_at"]
+
+    def validate_params(self, value):
+        if not isinstance(value, dict) or not all(isinstance(v, (str, int)) for v in value.values()):
+            raise serializers.ValidationError("params must be an object of query parameter values.")
+        return value
+
+
+class AnomalyFlagSerializer(serializers.ModelSerializer):
+    child_name = serializers.CharField(source="child.name", read_only=True)
+
+    class Meta:
+        model = AnomalyFlag
+        fields = ["id", "kindergarten", "child", "child_name", "rule", "detected_on", "window_start", "value"]
+
+
+class WeeklyReportSerializer(serializers.ModelSerializer):
+    child_name = serializers.CharField(source="child.name", read_only=True)
+
+    class Meta:
+        model = WeeklyReport
+        fields = ["id", "child", "child_name", "kindergarten", "week_start", "rendered_at", "emailed_at"]
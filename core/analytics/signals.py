@@ -0,0 +1,231 @@
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from auth_app.models import User
+from attendance.models import Attendance
+from kindergarten.models import TeacherClass
+from children.models import Children
+from meals.models import MealOverride, MenuPlan
+from children.signals import logs_bulk_created, logs_bulk_updated
+from posts.models import Post
+from comments.models import Comment
+from . import bitmaps
+from .cache import invalidate_on_commit
+from .counters import COUNTED_MODELS, CHILD_LOG_MODELS, Entity, bump, parent_joined, parent_left, resolve_kindergarten_id
+
+# Models whose writes change analytics results -> lookup to their kindergarten id.
+CACHED_MODELS = {
+    **{model: lookup for model, (entity, lookup) in COUNTED_MODELS.items()},
+    TeacherClass: "class_id__kindergarten_id",
+    MenuPlan: "kindergarten_id",
+    MealOverride: "plan__kindergarten_id",
+}
+
+
+def count_created(sender, instance, created, raw=False, **kwargs):
+    if not created or raw:
+        return
+    entity, lookup = COUNTED_MODELS[sender]
+    bump(resolve_kindergarten_id(instance, lookup), entity, 1)
+
+
+def count_deleted(sender, instance, **kwargs):
+    # Resolves to None when a cascading delete already removed the parent row.
+    entity, lookup = COUNTED_MODELS[sender]
+    bump(resolve_kindergarten_id(instance, lookup), entity, -1)
+
+
+for model in COUNTED_MODELS:
+    post_save.connect(count_created, sender=model, dispatch_uid=f"counter_created_{model._meta.label_lower}")
+    post_delete.connect(count_deleted, sender=model, dispatch_uid=f"counter_deleted_{model._meta.label_lower}")
+
+
+@receiver(logs_bulk_created)
+def count_bulk_created(sender, instances, **kwargs):
+    """Counters and cache invalidation for rows that skipped ``post_save``."""
+    entity = COUNTED_MODELS[sender][0]
+    for kindergarten_id, created in Counter(instance.kindergarten_id for instance in instances).items():
+        bump(kindergarten_id, entity, created)
+        invalidate_on_commit(kindergarten_id)
+
+
+@receiver(logs_bulk_updated)
+def invalidate_bulk_updated(sender, instances, **kwargs):
+    for kindergarten_id in {instance.kindergarten_id for instance in instances}:
+        invalidate_on_commit(kindergarten_id)
+
+
+@receiver(pre_save, sender=Children)
+@receiver(pre_save, sender=Post)
+def remember_previous_scope(sender, instance, raw=False, **kwargs):
+    """Snapshot the stored kindergarten (and a child's class and parent) so moves can be counted."""
+    instance._counter_previous = None
+    if raw or not instance.pk:
+        return
+    fields = ["kindergarten_id", "class_id", "parent_id"] if sender is Children else ["kindergarten_id"]
+    instance._counter_previous = sender.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+@receiver(post_save, sender=Children)
+def count_child_parent(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    if created:
+        parent_joined(instance.parent_id, instance.kindergarten_id, instance.pk)
+        return
+
+    previous = getattr(instance, "_counter_previous", None)
+    if not previous:
+        return
+
+    old_kindergarten_id = previous["kindergarten_id"]
+    if old_kindergarten_id != instance.kindergarten_id:
+        bump(old_kindergarten_id, Entity.CHILDREN, -1)
+        bump(instance.kindergarten_id, Entity.CHILDREN, 1)
+
+    if (old_kindergarten_id, previous["class_id"]) != (instance.kindergarten_id, instance.class_id_id):
+        # The logs' copies of the child's kindergarten and class follow it.
+        for model in CHILD_LOG_MODELS:
+            moved = model.objects.filter(child=instance).update(
+                kindergarten_id=instance.kindergarten_id, class_id=instance.class_id_id, updated_at=timezone.now(),
+            )
+            if old_kindergarten_id != instance.kindergarten_id and model in COUNTED_MODELS:
+                entity = COUNTED_MODELS[model][0]
+                bump(old_kindergarten_id, entity, -moved)
+                bump(instance.kindergarten_id, entity, moved)
+
+    if (old_kindergarten_id, previous["parent_id"]) != (instance.kindergarten_id, instance.parent_id):
+        parent_left(previous["parent_id"], old_kindergarten_id)
+        parent_joined(instance.parent_id, instance.kindergarten_id, instance.pk)
+
+
+@receiver(post_delete, sender=Children)
+def uncount_child_parent(sender, instance, **kwargs):
+    parent_left(instance.parent_id, instance.kindergarten_id)
+
+
+@receiver(post_save, sender=Post)
+def count_post_move(sender, instance, created, raw=False, **kwargs):
+    previous = getattr(instance, "_counter_previous", None)
+    if created or raw or not previous or previous["kindergarten_id"] == instance.kindergarten_id:
+        return
+
+    comments = Comment.objects.filter(post=instance).count()
+    bump(previous["kindergarten_id"], Entity.POSTS, -1)
+    bump(instance.kindergarten_id, Entity.POSTS, 1)
+    bump(previous["kindergarten_id"], Entity.COMMENTS, -comments)
+    bump(instance.kindergarten_id, Entity.COMMENTS, comments)
+
+
+@receiver(pre_save, sender=MenuPlan)
+def remember_plan_roster(sender, instance, raw=False, **kwargs):
+    """Snapshot the stored kindergarten and roster so a plan that moves or loses a child recounts its meals."""
+    instance._counter_previous = None
+    if not raw and instance.pk:
+        instance._counter_previous = sender.objects.filter(pk=instance.pk).values("kindergarten_id", "roster").first()
+
+
+@receiver(post_save, sender=MenuPlan)
+def count_planned_meals(sender, instance, created, raw=False, **kwargs):
+    """A plan counts a meal per child on its roster; skipped overrides take theirs off again."""
+    if raw:
+        return
+    previous = getattr(instance, "_counter_previous", None)
+    if created or not previous:
+        bump(instance.kindergarten_id, Entity.MEALS, len(instance.roster))
+    elif previous["kindergarten_id"] == instance.kindergarten_id:
+        bump(instance.kindergarten_id, Entity.MEALS, len(instance.roster) - len(previous["roster"]))
+    else:
+        skipped = instance.overrides.filter(skipped=True).count()
+        bump(previous["kindergarten_id"], Entity.MEALS, skipped - len(previous["roster"]))
+        bump(instance.kindergarten_id, Entity.MEALS, len(instance.roster) - skipped)
+
+
+@receiver(pre_delete, sender=MenuPlan)
+def remember_deleted_roster(sender, instance, **kwargs):
+    # The stored roster: the instance may predate a child's removal from it.
+    instance._counter_roster = sender.objects.filter(pk=instance.pk).values_list("roster", flat=True).first() or []
+
+
+@receiver(post_delete, sender=MenuPlan)
+def uncount_planned_meals(sender, instance, **kwargs):
+    # Its skipped overrides are deleted first and give their meals back.
+    bump(instance.kindergarten_id, Entity.MEALS, -len(getattr(instance, "_counter_roster", instance.roster)))
+
+
+@receiver(pre_save, sender=MealOverride)
+def remember_skipped(sender, instance, raw=False, **kwargs):
+    instance._counter_skipped = False
+    if not raw and instance.pk:
+        instance._counter_skipped = bool(sender.objects.filter(pk=instance.pk).values_list("skipped", flat=True).first())
+
+
+@receiver(post_save, sender=MealOverride)
+def count_skipped(sender, instance, created, raw=False, **kwargs):
+    delta = int(getattr(instance, "_counter_skipped", False)) - int(instance.skipped)
+    if not raw and delta:
+        bump(resolve_kindergarten_id(instance, "plan__kindergarten_id"), Entity.MEALS, delta)
+
+
+@receiver(post_delete, sender=MealOverride)
+def uncount_skipped(sender, instance, **kwargs):
+    if instance.skipped:
+        bump(resolve_kindergarten_id(instance, "plan__kindergarten_id"), Entity.MEALS, 1)
+
+
+def invalidate_analytics(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_on_commit(resolve_kindergarten_id(instance, CACHED_MODELS[sender]))
+
+    previous = getattr(instance, "_counter_previous", None)
+    if previous and previous["kindergarten_id"] != instance.kindergarten_id:
+        invalidate_on_commit(previous["kindergarten_id"])
+
+
+for model in CACHED_MODELS:
+    post_save.connect(invalidate_analytics, sender=model, dispatch_uid=f"analytics_cache_saved_{model._meta.label_lower}")
+    post_delete.connect(invalidate_analytics, sender=model, dispatch_uid=f"analytics_cache_deleted_{model._meta.label_lower}")
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_analytics(sender, instance, raw=False, created=True, **kwargs):
+    """Only sign-ups and deletions matter; profile saves (e.g. last_login) do not."""
+    if created and not raw:
+        invalidate_on_commit(None)
+
+
+@receiver(pre_save, sender=Attendance)
+def remember_attendance_day(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Snapshot the stored child and date so a moved record clears its old bit."""
+    instance._bitmap_previous = None
+    if raw or not instance.pk or (update_fields is not None and not {"child", "child_id", "date"} & set(update_fields)):
+        return
+    instance._bitmap_previous = sender.objects.filter(pk=instance.pk).values_list("child_id", "date").first()
+
+
+@receiver(post_save, sender=Attendance)
+def mark_attendance_bitmap(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_bitmap_previous", None)
+    current = (instance.child_id, instance.date)
+    if previous and previous != current:
+        bitmaps.mark([previous], present=False)
+    if created or (previous and previous != current):
+        bitmaps.mark([current])
+
+
+@receiver(post_delete, sender=Attendance)
+def clear_attendance_bitmap(sender, instance, **kwargs):
+    bitmaps.mark([(instance.child_id, instance.date)], present=False)
+
+
+@receiver(logs_bulk_created, sender=Attendance)
+def mark_bulk_attendance_bitmaps(sender, instances, **kwargs):
+    bitmaps.mark([(instance.child_id, instance.date) for instance in instances])
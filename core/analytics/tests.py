@@ -1,3 +1,904 @@
-from django.test import TestCase
+import csv
+import math
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from auth_app.models import User
+from kindergarten.models import Kindergarten
+from children.models import Children
+from posts.models import Post
+from comments.models import Comment
+from activities.models import Activity
+from attendance.models import Attendance
+from meals.models import Meal, MealOverride, MenuPlan
+from naps.models import Nap
+from hygiene.models import Hygiene
+from mood.models import ChildMood
+from core.testing import KindergartenTestCase, locmem_cache
+from .models import AnomalyFlag, AttendanceBitmap, AttendanceForecast, DailyRollup, KindergartenCounter, ReportJob, RollupCheckpoint, WeeklyReport
+from . import anomalies, bitmaps, counters, forecast, leaderboard, moods, nap_stats, reports, rollups, weekly_reports
+from . import cache as analytics_cache
+
+Entity = KindergartenCounter.Entity
+
+
+class TeacherActivityViewTests(KindergartenTestCase):
+    url = "/analytics/teacher-activity/"
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.add_admin())
+
+    def add_busy_teacher(self, index):
+        """A teacher of a class of their own with a post, an activity and two attendance records."""
+        kindergarten_class = self.add_class(f"Class {index}")
+        teacher = self.add_teacher(kindergarten_class, email=f"teacher{index}@example.com").teacher_profile
+
+        child = self.add_child(f"Child {index}", kindergarten_class)
+        Post.objects.create(kindergarten=self.kindergarten, class_id=kindergarten_class, title="Post", description="...")
+        Activity.objects.create(name="Painting", class_id=kindergarten_class)
+        Attendance.objects.create(child=child, date=date(2025, 3, 1), check_in_time=time(8, 0))
+        Attendance.objects.create(child=child, date=date(2025, 3, 2), check_in_time=time(8, 0))
+        return teacher
+
+    def test_totals_per_teacher(self):
+        teacher = self.add_busy_teacher(1)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 1)
+        row = response.data["results"][0]
+        self.assertEqual(row["teacher_id"], teacher.id)
+        self.assertEqual(row["total_posts"], 1)
+        self.assertEqual(row["total_activities"], 1)
+        self.assertEqual(row["total_attendance_records"], 2)
+
+    def test_date_filters_apply(self):
+        self.add_busy_teacher(1)
+
+        response = self.client.get(self.url, {"start_date": "2025-03-02", "end_date": "2025-03-02"})
+
+        self.assertEqual(response.data["results"][0]["total_attendance_records"], 1)
+
+    def test_invalid_date_is_rejected(self):
+        response = self.client.get(self.url, {"start_date": "March"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_query_count_does_not_grow_with_teachers(self):
+        # Page count, teachers page, class assignments, and one grouped
+        # query each for posts, activities and attendance.
+        self.add_busy_teacher(1)
+        with self.assertNumQueries(6):
+            self.client.get(self.url)
+
+        for index in range(2, 41):
+            self.add_busy_teacher(index)
+        with self.assertNumQueries(6):
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(response.data["results"]), 40)
+
+    def test_results_are_paginated(self):
+        for index in range(3):
+            self.add_busy_teacher(index)
+
+        response = self.client.get(self.url, {"page_size": 2})
+
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNotNone(response.data["next"])
+
+
+class DailyLogIndexTests(TestCase):
+    """The daily-log queries used by the API and analytics are answered from indexes."""
+
+    models = (Attendance, Meal, Nap, Hygiene, ChildMood)
+    week = (date(2025, 3, 3), date(2025, 3, 9))
+
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            # Test tables are tiny; make the planner show which index it would use.
+            with connection.cursor() as cursor:
+                cursor.execute("SET enable_seqscan = off")
+
+    def assertUsesIndex(self, queryset):
+        plan = queryset.explain()
+        self.assertRegex(plan, r"USING (COVERING )?INDEX|Index (Only )?Scan")
+        self.assertNotRegex(plan, rf"\bSCAN {queryset.model._meta.db_table}\b|Seq Scan on {queryset.model._meta.db_table}\b")
+
+    def test_child_and_date_range(self):
+        for model in self.models:
+            with self.subTest(model=model.__name__):
+                self.assertUsesIndex(model.objects.filter(child_id=1, date__range=self.week))
+
+    def test_kindergarten_and_date_range(self):
+        for model in self.models:
+            with self.subTest(model=model.__name__):
+                self.assertUsesIndex(model.objects.filter(kindergarten_id=1, date__range=self.week))
+
+    def test_classes_and_date_range(self):
+        for model in self.models:
+            with self.subTest(model=model.__name__):
+                self.assertUsesIndex(model.objects.filter(class_id__in=[1, 2], date__range=self.week))
+
+    def test_date_range_counts(self):
+        for model in self.models:
+            with self.subTest(model=model.__name__):
+                self.assertUsesIndex(
+                    model.objects.filter(date__range=self.week).values("date").annotate(children=Count("child_id", distinct=True))
+                )
+
+
+class AttendanceBitmapTests(KindergartenTestCase):
+    url = "/analytics/attendance-term/"
+
+    def setUp(self):
+        super().setUp()
+        self.regular, self.patchy = self.add_child("Regular"), self.add_child("Patchy")
+        # Mon 2024-12-30 .. Fri 2025-01-10 crosses a year: ten school days.
+        school_days = [date(2024, 12, 30), date(2024, 12, 31), *(date(2025, 1, day) for day in (1, 2, 3, 6, 7, 8, 9, 10))]
+        for day in school_days:
+            Attendance.objects.create(child=self.regular, date=day, check_in_time=time(8, 0))
+        for day in school_days[:2] + school_days[5:7]:
+            Attendance.objects.create(child=self.patchy, date=day, check_in_time=time(8, 0))
+        Attendance.objects.create(child=self.patchy, date=date(2025, 1, 4), check_in_time=time(8, 0))  # A Saturday.
+        self.client.force_authenticate(self.add_admin())
+
+    def test_incremental_bitmaps_match_a_rebuild(self):
+        Attendance.objects.get(child=self.patchy, date=date(2025, 1, 7)).delete()
+        Attendance.objects.get(child=self.regular, date=date(2025, 1, 9)).save()
+        record = Attendance.objects.get(child=self.patchy, date=date(2025, 1, 6))
+        record.date = date(2025, 1, 9)
+        record.save()
+        incremental = dict(((bitmap.child_id, bitmap.year), bytes(bitmap.bits)) for bitmap in AttendanceBitmap.objects.all())
+
+        for year in (2024, 2025):
+            bitmaps.rebuild(year)
+
+        rebuilt = dict(((bitmap.child_id, bitmap.year), bytes(bitmap.bits)) for bitmap in AttendanceBitmap.objects.all())
+        self.assertEqual(incremental, rebuilt)
+        self.assertEqual(len(rebuilt[(self.regular.id, 2025)]), 33)
+
+    def test_term_report_from_bitmaps(self):
+        params = {"kindergarten_id": self.kindergarten.id, "start_date": "2024-12-30", "end_date": "2025-01-10"}
+
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {**params, "below": "0.8", "days": "2024-12-30,2025-01-06"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["school_days"], 10)
+        [patchy] = response.data["children"]
+        self.assertEqual(patchy["child_id"], self.patchy.id)
+        self.assertEqual((patchy["present_days"], patchy["rate"]), (4, 0.4))
+        self.assertEqual((patchy["longest_streak"], patchy["longest_absence"]), (2, 3))
+        self.assertEqual(patchy["absences_by_weekday"], {"Mon": 0, "Tue": 0, "Wed": 2, "Thu": 2, "Fri": 2})
+        self.assertTrue(patchy["present_on_all_days"])
+
+        regular = self.client.get(self.url, params).data["children"][0]
+        self.assertEqual((regular["rate"], regular["longest_streak"]), (1.0, 10))
+
+    def test_term_counts_only_days_up_to_today(self):
+        params = {"kindergarten_id": self.kindergarten.id, "start_date": "2024-12-30", "end_date": "2025-03-10"}
+
+        with mock.patch("analytics.views.timezone.localdate", return_value=date(2025, 1, 10)):
+            data = self.client.get(self.url, {**params, "below": "0.8"}).data
+
+        self.assertEqual((data["counted_until"], data["school_days"]), (date(2025, 1, 10), 10))
+        self.assertEqual([row["child_id"] for row in data["children"]], [self.patchy.id])
+
+
+class KindergartenCounterTests(KindergartenTestCase):
+    def setUp(self):
+        super().setUp()
+        self.bees = self.add_class("Bees")
+        self.child = self.add_child("Amy", self.bees)
+
+    def counters(self, kindergarten=None):
+        return counters.stored_counters().get((kindergarten or self.kindergarten).id, {})
+
+    def assertCountersMatchSources(self):
+        stored = {
+            kg_id: {entity: count for entity, count in counts.items() if count}
+            for kg_id, counts in counters.stored_counters().items()
+        }
+        self.assertEqual({kg_id: counts for kg_id, counts in stored.items() if counts}, counters.compute_counters())
+
+    def test_writes_and_deletes_are_counted(self):
+        meal = Meal.objects.create(child=self.child, meal_title="Soup")
+        Nap.objects.create(child=self.child, date=date(2025, 3, 3), sleep_from=time(13, 0), sleep_to=time(14, 0))
+        post = Post.objects.create(kindergarten=self.kindergarten, title="Trip", description="...")
+        Comment.objects.create(post=post, user=self.parent, content="Great")
+        Activity.objects.create(name="Painting", class_id=self.bees)
+        self.add_child("Ben", self.bees)
+
+        self.assertEqual(
+            {entity: self.counters()[entity] for entity in (Entity.MEALS, Entity.NAPS, Entity.COMMENTS, Entity.CHILDREN, Entity.PARENTS)},
+            {Entity.MEALS: 1, Entity.NAPS: 1, Entity.COMMENTS: 1, Entity.CHILDREN: 2, Entity.PARENTS: 1},
+        )
+        meal.delete()
+        post.delete()
+        self.assertEqual((self.counters()[Entity.MEALS], self.counters()[Entity.POSTS], self.counters()[Entity.COMMENTS]), (0, 0, 0))
+        self.assertCountersMatchSources()
+
+    def test_a_child_who_changes_kindergarten_takes_its_logs_along(self):
+        other = Kindergarten.objects.create(name="Moonlight", location="Side St")
+        Meal.objects.create(child=self.child, meal_title="Soup")
+        Attendance.objects.create(child=self.child, date=date(2025, 3, 3), check_in_time=time(8, 0))
+
+        self.child.kindergarten = other
+        self.child.class_id = self.add_class("Owls", other)
+        self.child.save()
+
+        self.assertEqual(self.counters()[Entity.MEALS], 0)
+        self.assertEqual(self.counters()[Entity.PARENTS], 0)
+        self.assertEqual((self.counters(other)[Entity.ATTENDANCE], self.counters(other)[Entity.PARENTS]), (1, 1))
+        self.assertCountersMatchSources()
+
+        self.child.delete()
+        self.assertEqual((self.counters(other)[Entity.MEALS], self.counters(other)[Entity.CHILDREN]), (0, 0))
+        self.assertCountersMatchSources()
+
+    def test_rebuild_counters_repairs_drift(self):
+        Meal.objects.create(child=self.child, meal_title="Soup")
+        KindergartenCounter.objects.filter(kindergarten=self.kindergarten, entity=Entity.MEALS).update(count=7)
+        KindergartenCounter.objects.filter(kindergarten=self.kindergarten, entity=Entity.CHILDREN).delete()
+
+        output = StringIO()
+        call_command("rebuild_counters", "--dry-run", stdout=output)
+        self.assertIn(f"kindergarten {self.kindergarten.id} meals: stored 7, actual 1", output.getvalue())
+        self.assertEqual(self.counters()[Entity.MEALS], 7)
+
+        call_command("rebuild_counters", kindergarten=self.kindergarten.id, stdout=StringIO())
+        self.assertEqual((self.counters()[Entity.MEALS], self.counters()[Entity.CHILDREN]), (1, 1))
+        self.assertCountersMatchSources()
+
+
+@mock.patch("django.utils.timezone.localdate", return_value=date(2025, 3, 10))
+class RollupTests(KindergartenTestCase):
+    def setUp(self):
+        super().setUp()
+        self.bees = self.add_class("Bees")
+        self.first, self.second = self.add_child("Amy", self.bees), self.add_child("Ben", self.bees)
+        for child, day in ((self.first, 3), (self.second, 3), (self.first, 4), (self.first, 10)):
+            Meal.objects.create(child=child, date=date(2025, 3, day), meal_title="Soup")
+        MenuPlan.objects.create(class_id=self.bees, date=date(2025, 3, 5), meal_title="Stew")
+        other = Kindergarten.objects.create(name="Moonlight", location="Side St")
+        Meal.objects.create(child=self.add_child("Cat", kindergarten=other), date=date(2025, 3, 3), meal_title="Soup")
+
+    def series(self, start=date(2025, 3, 1), end=date(2025, 3, 10), interval="day"):
+        return {row["period"].date(): row["count"] for row in rollups.chart_series("meals", interval, start, end, self.kindergarten.id)}
+
+    def test_rollup_days_replaces_stored_rows_and_moves_the_checkpoint(self, localdate):
+        DailyRollup.objects.create(metric="meals", kindergarten=self.kindergarten, day=date(2025, 3, 4), count=99)
+
+        rollups.rollup_days("meals", date(2025, 3, 1), date(2025, 3, 9))
+
+        stored = DailyRollup.objects.filter(metric="meals", kindergarten=self.kindergarten)
+        self.assertEqual(
+            dict(stored.values_list("day", "count")),
+            {date(2025, 3, 3): 2, date(2025, 3, 4): 1, date(2025, 3, 5): 2},
+        )
+        self.assertEqual(RollupCheckpoint.objects.get(metric="meals").rolled_through, date(2025, 3, 9))
+
+    def test_chart_counts_days_past_the_checkpoint_live(self, localdate):
+        expected = {date(2025, 3, 3): 2, date(2025, 3, 4): 1, date(2025, 3, 5): 2, date(2025, 3, 10): 1}
+        self.assertEqual(self.series(), expected)
+
+        rollups.rollup_days("meals", date(2025, 3, 1), date(2025, 3, 4))
+        DailyRollup.objects.filter(metric="meals", kindergarten=self.kindergarten, day=date(2025, 3, 3)).update(count=5)
+
+        # Rolled-up days are read from DailyRollup; 5 March onwards is still counted live.
+        self.assertEqual(self.series(), {**expected, date(2025, 3, 3): 5})
+        self.assertEqual(self.series(interval="week"), {date(2025, 3, 3): 8, date(2025, 3, 10): 1})
+
+    def test_rollup_stats_command(self, localdate):
+        output = StringIO()
+        call_command("rollup_stats", metric=["meals"], stdout=output)
+        self.assertIn("meals: rolled up 2025-03-03 to 2025-03-09", output.getvalue())
+        self.assertEqual(RollupCheckpoint.objects.get(metric="meals").rolled_through, date(2025, 3, 9))
+
+        # A backdated write inside the lookback window is picked up by the next run.
+        Meal.objects.create(child=self.second, date=date(2025, 3, 8), meal_title="Soup")
+        localdate.return_value = date(2025, 3, 11)
+        call_command("rollup_stats", metric=["meals"], stdout=StringIO())
+
+        self.assertEqual(self.series(end=date(2025, 3, 11)), {
+            date(2025, 3, 3): 2, date(2025, 3, 4): 1, date(2025, 3, 5): 2, date(2025, 3, 8): 1, date(2025, 3, 10): 1,
+        })
+        self.assertFalse(DailyRollup.objects.filter(day=date(2025, 3, 11)).exists())
+
+        output = StringIO()
+        call_command("rollup_stats", metric=["users"], since="2025-03-12", stdout=output)
+        self.assertIn("users: up to date", output.getvalue())
+
+
+class StudentProgressTests(KindergartenTestCase):
+    url = "/analytics/student-progress/"
+
+    def setUp(self):
+        super().setUp()
+        self.bees = self.add_class("Bees")
+        self.amy, self.ben = self.add_child("Amy", self.bees), self.add_child("Ben", self.bees)
+        for day in (3, 4):
+            Attendance.objects.create(child=self.amy, date=date(2025, 3, day), check_in_time=time(8, 0))
+            ChildMood.objects.create(child=self.amy, date=date(2025, 3, day), mood="happy")
+        Meal.objects.create(child=self.amy, date=date(2025, 3, 3), meal_title="Soup")
+        MenuPlan.objects.create(class_id=self.bees, date=date(2025, 3, 4), meal_title="Stew")
+        Nap.objects.create(child=self.ben, date=date(2025, 3, 3), sleep_from=time(13, 0), sleep_to=time(14, 0))
+        self.client.force_authenticate(self.add_admin())
+
+    def test_class_progress_matches_the_per_child_endpoint(self):
+        response = self.client.get(self.url, {"class_id": self.bees.id})
+
+        self.assertEqual(response.status_code, 200)
+        amy, ben = response.data
+        self.assertEqual(amy, self.client.get(f"{self.url}{self.amy.id}/").data)
+        self.assertEqual(
+            (amy["attendance_days"], amy["total_meals_logged"], amy["mood_distribution"]),
+            (2, 2, {"happy": 2}),
+        )
+        self.assertEqual((ben["child_name"], ben["total_meals_logged"], ben["total_naps"]), ("Ben", 1, 1))
+
+    def test_dates_and_visibility_narrow_the_batch(self):
+        response = self.client.get(self.url, {"child_ids": f"{self.amy.id},{self.ben.id}", "start_date": "2025-03-04"})
+        self.assertEqual([row["attendance_days"] for row in response.data], [1, 0])
+
+        stranger = self.add_child("Cat", parent=User.objects.create_user("other@example.com", "pass"))
+        self.client.force_authenticate(self.parent)
+        response = self.client.get(self.url, {"child_ids": f"{self.amy.id},{stranger.id}"})
+        self.assertEqual([row["child_id"] for row in response.data], [self.amy.id])
+
+    def test_query_count_does_not_grow_with_the_class(self):
+        self.client.get(self.url, {"kindergarten_id": self.kindergarten.id})
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.url, {"kindergarten_id": self.kindergarten.id, "end_date": "2025-03-31"})
+
+        self.add_children(30, self.bees)
+        with self.assertNumQueries(len(small)):
+            response = self.client.get(self.url, {"kindergarten_id": self.kindergarten.id, "end_date": "2025-03-30"})
+
+        self.assertEqual(len(response.data), 32)
+
+    def test_exactly_one_selection_is_required(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"class_id": self.bees.id, "kindergarten_id": self.kindergarten.id}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"child_ids": "1,x"}).status_code, 400)
+
+
+class AttendanceMatrixTests(KindergartenTestCase):
+    url = "/analytics/attendance-matrix/"
+
+    def setUp(self):
+        super().setUp()
+        self.bees = self.add_class("Bees")
+        self.amy, self.ben = self.add_child("Amy", self.bees), self.add_child("Ben", self.bees)
+        for day in (3, 4, 6):
+            Attendance.objects.create(child=self.amy, date=date(2025, 3, day), check_in_time=time(8, 0))
+        self.params = {"class_id": self.bees.id, "start_date": "2025-03-01", "end_date": "2025-03-07"}
+        self.client.force_authenticate(self.add_admin())
+
+    def test_presence_in_each_encoding(self):
+        presence = {}
+        for encoding in ("bitstring", "rle", "hex"):
+            response = self.client.get(self.url, {**self.params, "encoding": encoding})
+            self.assertEqual(response.status_code, 200)
+            presence[encoding] = [(row["present_days"], row["presence"]) for row in response.data["children"]]
+
+        self.assertEqual(presence, {
+            "bitstring": [(3, "0011010"), (0, "0000000")],
+            "rle": [(3, "A2P2A1P1A1"), (0, "A7")],
+            "hex": [(3, "1a"), (0, "00")],
+        })
+
+    def test_csv_is_streamed_row_by_row(self):
+        response = self.client.get(self.url, {**self.params, "output": "csv"})
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.reader(b"".join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0], ["child_id", "child_name", *(f"2025-03-0{day}" for day in range(1, 8))])
+        self.assertEqual(rows[1:], [
+            [str(self.amy.id), "Amy", *"0011010"],
+            [str(self.ben.id), "Ben", *"0000000"],
+        ])
+
+    def test_rejects_bad_ranges_and_other_classes(self):
+        self.assertEqual(self.client.get(self.url, {**self.params, "end_date": "2025-02-28"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {**self.params, "end_date": "2026-03-02"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {**self.params, "encoding": "base64"}).status_code, 400)
+
+        self.client.force_authenticate(self.add_teacher(self.add_class("Ants")))
+        self.assertEqual(self.client.get(self.url, self.params).status_code, 404)
+
+
+@override_settings(CACHES=locmem_cache("analytics-cache-tests"))
+class AnalyticsCacheTests(KindergartenTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = Kindergarten.objects.create(name="Moonlight", location="Side St")
+        self.computed = []
+
+    def aggregate(self, kindergarten_ids, value="value"):
+        def compute():
+            self.computed.append(value)
+            return value
+        return analytics_cache.cached_aggregate("test", kindergarten_ids, {"param": 1}, compute)
+
+    def test_invalidation_readdresses_only_the_written_kindergarten(self):
+        for kindergarten_ids in ([self.kindergarten.id], [self.other.id], None):
+            self.aggregate(kindergarten_ids)
+            self.aggregate(kindergarten_ids)
+        self.assertEqual(len(self.computed), 3)
+
+        analytics_cache.invalidate([self.kindergarten.id])
+
+        self.assertEqual(self.aggregate([self.kindergarten.id], "fresh"), "fresh")
+        self.assertEqual(self.aggregate(None, "fresh"), "fresh")
+        self.assertEqual(self.aggregate([self.other.id], "fresh"), "value")
+
+    def test_writes_invalidate_once_committed(self):
+        self.aggregate([self.kindergarten.id])
+        child = self.add_child()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Meal.objects.create(child=child, meal_title="Soup")
+            self.assertEqual(self.aggregate([self.kindergarten.id], "fresh"), "value")
+
+        self.assertEqual(self.aggregate([self.kindergarten.id], "fresh"), "fresh")
+
+    def test_concurrent_misses_wait_for_the_lock_holder(self):
+        add = cache.add
+        locks = []
+
+        def held_elsewhere(key, *args, **kwargs):
+            if key.endswith(":lock"):
+                locks.append(key)
+                return False
+            return add(key, *args, **kwargs)
+
+        def lock_holder_finishes(interval):
+            cache.set(locks[0].removesuffix(":lock"), "from the lock holder")
+
+        with mock.patch.object(cache, "add", side_effect=held_elsewhere), \
+                mock.patch("analytics.cache.time.sleep", side_effect=lock_holder_finishes):
+            self.assertEqual(self.aggregate([self.kindergarten.id]), "from the lock holder")
+
+        self.assertEqual(self.computed, [])
+
+
+class ReportJobTests(KindergartenTestCase):
+    url = "/analytics/reports/"
+
+    def setUp(self):
+        super().setUp()
+        bees = self.add_class("Bees")
+        Attendance.objects.create(child=self.add_child("Amy", bees), date=date(2025, 3, 3), check_in_time=time(8, 0))
+        self.admin = self.add_admin()
+        self.client.force_authenticate(self.admin)
+
+    def queue(self, kind="attendance_report", params=None):
+        response = self.client.post(self.url, {"kind": kind, "params": params or {"start_date": "2025-03-01"}}, format="json")
+        self.assertEqual(response.status_code, 202)
+        return ReportJob.objects.get(id=response.data["id"])
+
+    def download(self, job):
+        return self.client.get(f"{self.url}{job.id}/download/")
+
+    def test_worker_computes_what_the_endpoint_returns(self):
+        job = self.queue()
+        self.assertEqual(self.download(job).status_code, 409)
+
+        call_command("run_report_worker", "--once", stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportJob.Status.DONE)
+        self.assertEqual(self.client.get(f"{self.url}{job.id}/").data["status"], "done")
+        expected = self.client.get("/analytics/attendance-report/", {"start_date": "2025-03-01"}).json()
+        self.assertEqual(self.download(job).json(), expected)
+        self.assertEqual(expected["total_attendance_records"], 1)
+
+    def test_jobs_are_claimed_once_oldest_first(self):
+        first, second = self.queue(), self.queue("teacher_activity", {})
+
+        self.assertEqual(reports.claim_next_job().id, first.id)
+        self.assertEqual(reports.claim_next_job().id, second.id)
+        self.assertIsNone(reports.claim_next_job())
+        self.assertEqual(ReportJob.objects.filter(status=ReportJob.Status.RUNNING).count(), 2)
+
+    def test_stale_running_jobs_are_requeued(self):
+        stale, fresh = self.queue(), self.queue()
+        reports.claim_next_job(), reports.claim_next_job()
+        ReportJob.objects.filter(id=stale.id).update(started_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(reports.requeue_stale_jobs(timedelta(minutes=30)), 1)
+
+        self.assertEqual(reports.claim_next_job().id, stale.id)
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.status, ReportJob.Status.RUNNING)
+
+    def test_failures_and_expired_results(self):
+        failed = self.queue("statistics", {"model": "unknown"})
+        expired = self.queue()
+        call_command("run_report_worker", "--once", stdout=StringIO())
+
+        self.assertEqual(self.download(failed).status_code, 400)
+        self.assertEqual(self.download(failed).data["error"], "Invalid model name.")
+        ReportJob.objects.filter(id=expired.id).update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.download(expired).status_code, 410)
+        self.assertEqual(reports.delete_expired_jobs(), 1)
+
+    def test_jobs_are_private_to_their_requester(self):
+        job = self.queue()
+
+        self.client.force_authenticate(self.parent)
+
+        self.assertEqual(self.client.get(self.url).data, [])
+        self.assertEqual(self.client.get(f"{self.url}{job.id}/").status_code, 404)
+        self.assertEqual(self.download(job).status_code, 404)
+
+
+class MoodTrendTests(KindergartenTestCase):
+    url = "/analytics/mood-trend/"
+
+    def setUp(self):
+        super().setUp()
+        self.bees = self.add_class("Bees")
+        self.amy, self.ben = self.add_child("Amy", self.bees), self.add_child("Ben", self.bees)
+        for day, mood in ((3, "happy"), (4, "sad"), (6, "angry"), (10, "sad"), (11, "happy"), (12, "sad"), (13, "sad"), (13, "annoyed")):
+            ChildMood.objects.create(child=self.amy, date=date(2025, 3, day), mood=mood)
+        ChildMood.objects.create(child=self.ben, date=date(2025, 3, 3), mood="calm")
+        self.client.force_authenticate(self.add_admin())
+
+    def trend(self, **params):
+        response = self.client.get(self.url, {"class_id": self.bees.id, "start_date": "2025-03-03", "end_date": "2025-03-16", **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_streaks_and_child_summaries(self):
+        amy, ben = self.trend()["children"]
+
+        self.assertEqual((amy["records"], amy["longest_negative_streak"], amy["current_negative_streak"]), (8, 3, 2))
+        self.assertEqual((amy["distribution"]["sad"], amy["distribution"]["happy"]), (0.5, 0.25))
+        self.assertEqual(amy["negative_share_change"], round(4 / 5 - 2 / 3, 4))
+        self.assertEqual((ben["records"], ben["longest_negative_streak"], ben["distribution"]["calm"]), (1, 0, 1.0))
+
+    def test_weekly_shares_and_rolling_window(self):
+        data = self.trend(window=3)
+
+        first, second = data["weekly"]
+        self.assertEqual((first["week_start"], first["records"], first["negative_share"], first["shift"]), (date(2025, 3, 3), 4, 0.5, None))
+        self.assertEqual((second["records"], second["negative_share"], second["shift"]["sad"]), (5, 0.8, 0.35))
+        by_day = {row["date"]: row for row in data["daily"]}
+        self.assertEqual(by_day[date(2025, 3, 5)]["rolling_distribution"]["sad"], 0.3333)
+        self.assertEqual(sum(by_day[date(2025, 3, 9)]["rolling_distribution"].values()), 0)
+
+    def test_matches_counting_records_one_by_one(self):
+        children = [self.amy.id, self.ben.id]
+        expected = Counter(
+            (children.index(child_id), (day - date(2025, 3, 1)).days, moods.MOODS.index(mood))
+            for child_id, day, mood in ChildMood.objects.values_list("child_id", "date", "mood")
+        )
+
+        counts = moods.load_mood_counts(children, date(2025, 3, 1), date(2025, 3, 31))
+
+        self.assertEqual({index: int(counts[index]) for index in zip(*counts.nonzero())}, expected)
+
+    def test_rejects_bad_windows_and_unknown_classes(self):
+        self.assertEqual(self.client.get(self.url, {"class_id": self.bees.id, "window": 0}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"class_id": self.bees.id, "start_date": "2025-03-10", "end_date": "2025-03-01"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"class_id": self.add_class("Owls", Kindergarten.objects.create(name="Moonlight", location="Side St")).id}).status_code, 404)
+
+
+class NapDurationStatsTests(KindergartenTestCase):
+    url = "/analytics/nap-durations/"
+
+    def setUp(self):
+        super().setUp()
+        self.bees = self.add_class("Bees")
+        self.amy, self.ben = self.add_child("Amy", self.bees), self.add_child("Ben", self.bees)
+        # 30, 45, 60 (across midnight), 90 and 120 minutes for Amy; 20 for Ben.
+        for day, sleep_from, sleep_to in ((3, time(13, 0), time(13, 30)), (4, time(13, 0), time(13, 45)), (5, time(23, 30), time(0, 30)),
+                                          (6, time(12, 30), time(14, 0)), (7, time(12, 0), time(14, 0))):
+            Nap.objects.create(child=self.amy, date=date(2025, 3, day), sleep_from=sleep_from, sleep_to=sleep_to)
+        Nap.objects.create(child=self.ben, date=date(2025, 3, 3), sleep_from=time(13, 0), sleep_to=time(13, 20))
+        self.client.force_authenticate(self.add_admin())
+
+    def test_class_statistics_and_histogram(self):
+        response = self.client.get(self.url, {"bucket_minutes": 30})
+
+        self.assertEqual(response.status_code, 200)
+        [bees] = response.data["groups"]
+        self.assertEqual(
+            {key: bees[key] for key in ("name", "count", "mean_minutes", "min_minutes", "max_minutes", "p10_minutes", "median_minutes", "p90_minutes")},
+            {"name": "Bees", "count": 6, "mean_minutes": 60.8, "min_minutes": 20, "max_minutes": 120,
+             "p10_minutes": 20, "median_minutes": 45, "p90_minutes": 120},
+        )
+        self.assertEqual([(bucket["from_minutes"], bucket["count"]) for bucket in bees["histogram"]], [(0, 1), (30, 2), (60, 1), (90, 1), (120, 1)])
+        self.assertEqual([nap["duration_minutes"] for nap in response.data["longest_naps"]], [120, 90, 60, 45, 30, 20])
+
+    def test_percentiles_match_nearest_rank(self):
+        durations = [7, 95, 12, 60, 60, 33, 41, 150, 88, 19, 64, 72, 5, 101, 58, 46, 90]
+        for offset, minutes in enumerate(durations):
+            sleep_to = time(10 + minutes // 60, minutes % 60)
+            Nap.objects.create(child=self.ben, date=date(2025, 4, 1) + timedelta(days=offset), sleep_from=time(10, 0), sleep_to=sleep_to)
+        ranked = sorted(durations + [20])
+
+        with self.assertNumQueries(3):
+            groups = nap_stats.duration_stats(Nap.objects.all(), "child")
+
+        ben = next(group for group in groups if group["id"] == self.ben.id)
+        for name, percent in nap_stats.PERCENTILES.items():
+            self.assertEqual(ben[f"{name}_minutes"], ranked[math.ceil(percent * len(ranked) / 100) - 1], name)
+        amy = next(group for group in groups if group["id"] == self.amy.id)
+        self.assertEqual((amy["p10_minutes"], amy["median_minutes"], amy["p90_minutes"]), (30, 60, 120))
+
+    def test_parents_see_only_their_childrens_naps(self):
+        self.ben.parent = User.objects.create_user("other@example.com", "pass")
+        self.ben.save()
+        self.client.force_authenticate(self.parent)
+
+        response = self.client.get(self.url, {"group_by": "child", "start_date": "2025-03-04"})
+
+        self.assertEqual([(group["name"], group["count"]) for group in response.data["groups"]], [("Amy", 4)])
+        self.assertEqual(self.client.get(self.url, {"group_by": "week"}).status_code, 400)
+
+
+class AnomalyDetectionTests(KindergartenTestCase):
+    url = "/analytics/anomalies/"
+    as_of = date(2025, 3, 9)
+
+    def setUp(self):
+        super().setUp()
+        bees = self.add_class("Bees")
+        self.amy, self.ben, self.cat = (self.add_child(name, bees) for name in ("Amy", "Ben", "Cat"))
+        for day in (3, 4):
+            Meal.objects.create(child=self.amy, date=date(2025, 3, day), meal_title="Soup", appetite_level="low")
+        plan = MenuPlan.objects.create(class_id=bees, date=date(2025, 3, 5), meal_title="Stew")
+        MealOverride.objects.create(plan=plan, child=self.amy, appetite_level="low")
+        for day, mood in ((2, "sad"), (6, "sad"), (7, "angry"), (8, "frustrated")):
+            ChildMood.objects.create(child=self.amy, date=date(2025, 3, day), mood=mood)
+        for day in (3, 4, 5):
+            Attendance.objects.create(child=self.ben, date=date(2025, 3, day), check_in_time=time(8, 0))
+        Nap.objects.create(child=self.ben, date=date(2025, 3, 3), sleep_from=time(13, 0), sleep_to=time(14, 0))
+        for child, times in ((self.amy, (time(9, 0), time(10, 0))), (self.ben, (time(9, 0), time(9, 30))), (self.cat, (time(8, 0), time(13, 0)))):
+            for at in times:
+                Hygiene.objects.create(child=child, date=date(2025, 3, 4), activity="Hand washing", hygiene_activity_time=at)
+
+    def flags(self):
+        return set(AnomalyFlag.objects.filter(detected_on=self.as_of).values_list("child__name", "rule", "value"))
+
+    def test_each_rule_flags_its_child(self):
+        self.assertEqual(anomalies.detect_for_kindergarten(self.kindergarten.id, self.as_of), 4)
+
+        self.assertEqual(self.flags(), {
+            ("Amy", "low_appetite", 3),
+            ("Amy", "negative_moods", 3),
+            ("Ben", "missing_nap", 2),
+            ("Cat", "hygiene_gap", 300),
+        })
+
+        # Re-running replaces the day's flags instead of adding to them.
+        Meal.objects.filter(child=self.amy).update(appetite_level="normal")
+        self.assertEqual(anomalies.detect_for_kindergarten(self.kindergarten.id, self.as_of), 3)
+
+    def test_command_replaces_the_days_flags_and_expires_old_ones(self):
+        AnomalyFlag.objects.create(
+            kindergarten=self.kindergarten, child=self.cat, rule="missing_nap", detected_on=date(2024, 1, 1), window_start=date(2023, 12, 26), value=2,
+        )
+        output = StringIO()
+
+        call_command("detect_anomalies", date="2025-03-09", workers=1, stdout=output)
+        call_command("detect_anomalies", date="2025-03-09", workers=1, stdout=output)
+
+        self.assertIn(f"kindergarten {self.kindergarten.id}: 4 flag(s)", output.getvalue())
+        self.assertEqual(len(self.flags()), 4)
+        self.assertEqual(AnomalyFlag.objects.count(), 4)
+
+    def test_listing_defaults_to_the_latest_day_and_is_scoped(self):
+        anomalies.detect_for_kindergarten(self.kindergarten.id, date(2025, 3, 8))
+        anomalies.detect_for_kindergarten(self.kindergarten.id, self.as_of)
+        self.client.force_authenticate(self.add_admin())
+
+        response = self.client.get(self.url, {"rule": "low_appetite"})
+        self.assertEqual([(flag["child_name"], flag["detected_on"]) for flag in response.data], [("Amy", "2025-03-09")])
+        self.assertEqual(len(self.client.get(self.url, {"date": "2025-03-08"}).data), 4)
+        self.assertEqual(self.client.get(self.url, {"rule": "sneezing"}).status_code, 400)
+
+        self.client.force_authenticate(self.parent)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class LeaderboardTests(KindergartenTestCase):
+    url = "/analytics/leaderboard/"
+    week = {"start_date": "2025-03-03", "end_date": "2025-03-09"}
+
+    def setUp(self):
+        super().setUp()
+        self.moonlight = Kindergarten.objects.create(name="Moonlight", location="Side St")
+        Kindergarten.objects.create(name="Empty", location="Back St")
+        bees, owls = self.add_class("Bees"), self.add_class("Owls", self.moonlight)
+        children = {bees: self.add_children(2, bees), owls: [self.add_child("Owl", owls)]}
+        monday = timezone.make_aware(datetime(2025, 3, 3, 10, 0))
+
+        posts = [Post.objects.create(kindergarten=kindergarten_class.kindergarten, class_id=kindergarten_class, title="Post", description="...")
+                 for kindergarten_class in (bees, bees, bees, bees, owls)]
+        Post.objects.update(created_at=monday)
+        for _ in range(2):
+            Comment.objects.create(post=posts[0], user=self.parent, content="Great")
+        for _ in range(2):
+            Activity.objects.create(name="Painting", class_id=bees, time=monday)
+        for day in range(3, 8):
+            Attendance.objects.create(child=children[bees][day % 2], date=date(2025, 3, day), check_in_time=time(8, 0))
+            Attendance.objects.create(child=children[owls][0], date=date(2025, 3, day), check_in_time=time(8, 0))
+        self.client.force_authenticate(User.objects.create_user("root@example.com", "pass", role="superadmin"))
+
+    def test_metrics_ranks_and_percentiles_per_kindergarten(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, self.week)
+
+        self.assertEqual(response.status_code, 200)
+        rows = {row["name"]: row for row in response.data["results"]}
+        self.assertEqual([row["name"] for row in response.data["results"]], ["Sunshine", "Moonlight", "Empty"])
+        self.assertEqual(
+            {name: [row[metric] for metric in leaderboard.METRICS] for name, row in rows.items()},
+            {"Sunshine": [4.0, 2.0, 0.5, 0.5], "Moonlight": [1.0, 0.0, 1.0, 0.0], "Empty": [0.0, None, None, None]},
+        )
+        self.assertEqual([rows[name]["attendance_coverage_rank"] for name in ("Moonlight", "Sunshine", "Empty")], [1, 2, 3])
+        self.assertEqual([rows[name]["posts_per_week_percentile"] for name in ("Empty", "Moonlight", "Sunshine")], [33.3, 66.7, 100.0])
+
+    def test_pages_keep_ranks_across_the_whole_table(self):
+        response = self.client.get(self.url, {**self.week, "order_by": "attendance_coverage", "page": 2, "page_size": 2})
+
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual([(row["name"], row["attendance_coverage_rank"]) for row in response.data["results"]], [("Empty", 3)])
+
+    def test_classes_and_access(self):
+        response = self.client.get(self.url, {**self.week, "level": "class", "order_by": "comments_per_post"})
+        self.assertEqual(
+            [(row["name"], row["kindergarten_name"], row["comments_per_post"]) for row in response.data["results"]],
+            [("Bees", "Sunshine", 0.5), ("Owls", "Moonlight", 0.0)],
+        )
+        self.assertEqual(self.client.get(self.url, {"level": "section"}).status_code, 400)
+
+        self.client.force_authenticate(self.add_admin())
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class AttendanceForecastTests(KindergartenTestCase):
+    url = "/analytics/attendance-forecast/"
+    today = date(2025, 3, 17)  # A Monday.
+
+    def setUp(self):
+        super().setUp()
+        self.bees, self.ants = self.add_class("Bees"), self.add_class("Ants")
+        bees = self.add_children(4, self.bees)
+        for child in bees[:2]:
+            Attendance.objects.create(child=child, date=date(2025, 3, 3), check_in_time=time(8, 0))
+        for child in bees:
+            Attendance.objects.create(child=child, date=date(2025, 3, 10), check_in_time=time(8, 0))
+        Attendance.objects.create(child=self.add_child("Unplaced"), date=date(2025, 3, 10), check_in_time=time(8, 0))
+
+    def test_weekday_ewma_matches_a_weighted_loop(self):
+        rng = np.random.default_rng(7)
+        counts = rng.integers(0, 20, size=(3, 5, 7)).astype(float)
+        valid = np.ones((5, 7), dtype=bool)
+        valid[0, :2] = valid[-1, 4:] = False
+
+        expected = np.zeros((3, 7))
+        for series in range(3):
+            for weekday in range(7):
+                weighted = [(0.7 ** (4 - week), counts[series, week, weekday]) for week in range(5) if valid[week, weekday]]
+                expected[series, weekday] = sum(weight * value for weight, value in weighted) / sum(weight for weight, _ in weighted)
+
+        np.testing.assert_allclose(forecast.weekday_ewma(counts, valid, alpha=0.3), expected)
+
+    def test_newer_weeks_weigh_more(self):
+        written = forecast.forecast_kindergarten(self.kindergarten.id, self.today, horizon=7, history_days=14, alpha=0.5)
+
+        self.assertEqual(written, 7 * 3)
+        monday = dict(AttendanceForecast.objects.filter(day=self.today).values_list("kindergarten_class_id", "expected"))
+        self.assertEqual(monday, {self.bees.id: round((2 * 0.5 + 4) / 1.5, 2), self.ants.id: 0.0, None: 4.0})
+        self.assertFalse(AttendanceForecast.objects.filter(day=date(2025, 3, 18)).exclude(expected=0).exists())
+
+    @mock.patch("django.utils.timezone.localdate", return_value=today)
+    def test_command_and_endpoint(self, localdate):
+        call_command("forecast_attendance", "--days", "7", "--history-days", "14", "--alpha", "0.5", stdout=StringIO())
+        call_command("forecast_attendance", "--days", "7", "--history-days", "14", "--alpha", "0.5", stdout=StringIO())
+        self.assertEqual(AttendanceForecast.objects.count(), 21)
+
+        self.client.force_authenticate(self.add_admin())
+        data = self.client.get(self.url, {"days": 2}).data
+        self.assertEqual((data["generated_on"], [point["expected"] for point in data["kindergarten"]]), (self.today, [4.0, 0.0]))
+        self.assertEqual([row["class_name"] for row in data["classes"]], ["Bees", "Ants"])
+
+        self.client.force_authenticate(self.add_teacher(self.bees))
+        data = self.client.get(self.url, {"days": 1}).data
+        self.assertNotIn("kindergarten", data)
+        self.assertEqual(data["classes"], [{"class_id": self.bees.id, "class_name": "Bees", "forecast": [{"date": self.today, "expected": 3.33}]}])
+        self.assertEqual(self.client.get(self.url, {"class_id": self.ants.id}).status_code, 404)
+
+
+class WeeklyReportTests(KindergartenTestCase):
+    week_start = date(2025, 3, 3)
+
+    def setUp(self):
+        super().setUp()
+        self.bees = self.add_class("Bees")
+        self.amy, self.ben = self.add_child("Amy", self.bees), self.add_child("Ben", self.bees)
+        for day in (3, 4):
+            Attendance.objects.create(child=self.amy, date=date(2025, 3, day), check_in_time=time(8, 0), check_out_time=time(16, 0))
+        Meal.objects.create(child=self.amy, date=date(2025, 3, 3), meal_title="Soup", intake_time=time(12, 0), appetite_level="low")
+        Meal.objects.create(child=self.amy, date=date(2025, 3, 10), meal_title="Next week")
+        MenuPlan.objects.create(class_id=self.bees, date=date(2025, 3, 4), meal_title="Stew", intake_time=time(12, 0))
+        Nap.objects.create(child=self.amy, date=date(2025, 3, 3), sleep_from=time(13, 0), sleep_to=time(14, 30))
+        for day in (5, 6):
+            ChildMood.objects.create(child=self.amy, date=date(2025, 3, day), mood="happy")
+        Hygiene.objects.create(child=self.amy, date=date(2025, 3, 3), activity="Hand washing", hygiene_activity_time=time(10, 0))
+        painting = Activity.objects.create(name="Painting", class_id=self.bees, time=timezone.make_aware(datetime(2025, 3, 5, 10, 0)))
+        painting.children.add(self.amy)
+
+    def build(self, *args):
+        output = StringIO()
+        call_command("build_weekly_reports", "--week", "2025-03-05", "--workers", "1", *args, stdout=output)
+        return output.getvalue()
+
+    def test_report_contents(self):
+        amy, ben = weekly_reports.load_week(self.kindergarten.id, self.week_start)
+
+        [(_, html, text)] = weekly_reports.render_reports([amy])
+
+        for line in (
+            "Amy — Sunshine", "Week of Mar 3 – Mar 9, 2025", "Days present: 2", "Total nap time: 90 minutes",
+            "Meals logged: 2 (1 with low appetite)", "Moods: Happy x 2", "- Mon: Soup (Low Appetite)", "- Tue: Stew (Normal Appetite)",
+            "- Mon: 13:00-14:30 (90 min)", "- Mon 10:00: Hand washing", "- Wed 10:00: Painting",
+        ):
+            self.assertIn(line, text)
+        self.assertNotIn("Next week", text)
+        self.assertIn("Amy", html)
+        self.assertEqual(weekly_reports.summarize(ben)["days_present"], 0)
+        self.assertEqual([meal["title"] for meal in ben["meals"]], ["Stew"])
+
+    def test_command_stores_reports_once_and_emails_them_once(self):
+        self.assertIn(f"kindergarten {self.kindergarten.id}: 2 report(s)", self.build())
+        self.build("--email")
+        self.build("--email")
+
+        self.assertEqual(WeeklyReport.objects.filter(week_start=self.week_start).count(), 2)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].to, ["parent@example.com"])
+        self.assertFalse(WeeklyReport.objects.filter(emailed_at__isnull=True).exists())
+
+        report = WeeklyReport.objects.get(child=self.amy)
+        self.client.force_authenticate(self.parent)
+        self.assertEqual(len(self.client.get("/analytics/weekly-reports/", {"week_start": "2025-03-03"}).data), 2)
+        self.assertEqual(self.client.get(f"/analytics/weekly-reports/{report.id}/download/", {"output": "text"}).content.decode(), report.text)
+
+    def test_query_count_does_not_grow_with_500_children(self):
+        Children.objects.bulk_create(
+            Children(name=f"Child {index:03}", date_of_birth=date(2020, 1, 1), kindergarten=self.kindergarten, class_id=self.bees, parent=self.parent)
+            for index in range(498)
+        )
+        # Children, then one query per log table; the menu plans add their overrides.
+        with self.assertNumQueries(9):
+            payloads = weekly_reports.load_week(self.kindergarten.id, self.week_start)
+        self.assertEqual(len(payloads), 500)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.build()
+        self.assertEqual(WeeklyReport.objects.count(), 500)
+        # Kindergartens and the week's logs; the rest are upsert batches, sized by the database backend.
+        self.assertEqual(len([query for query in queries if not query["sql"].startswith("INSERT")]), 10)
@@ -1,10 +1,23 @@
 from django.urls import path
-from .views import dashboard_statistics, StatisticsAPIView, TeacherActivityView, StudentProgressView, AttendanceReportView
+from .views import dashboard_statistics, StatisticsAPIView, TeacherActivityView, StudentProgressView, BatchStudentProgressView, AttendanceReportView, AttendanceMatrixView, AttendanceTermView, MoodTrendView, NapDurationStatsView, AnomalyFlagListView, LeaderboardView, AttendanceForecastView, WeeklyReportListView, WeeklyReportDownloadView, ReportJobListCreateView, ReportJobDetailView, ReportJobDownloadView
 
 urlpatterns = [
     path("dashboard/cards-statistics/", dashboard_statistics, name="dashboard-statistics"),
     path("dashboard/chart-statistics/", StatisticsAPIView.as_view(), name="statistics"),
     path("teacher-activity/", TeacherActivityView.as_view(), name="teacher-activity"),
+    path("student-progress/", BatchStudentProgressView.as_view(), name="student-progress-batch"),
     path("student-progress/<int:child_id>/", StudentProgressView.as_view(), name="student-progress"),
     path("attendance-report/", AttendanceReportView.as_view(), name="attendance-report"),
+    path("attendance-matrix/", AttendanceMatrixView.as_view(), name="attendance-matrix"),
+    path("attendance-term/", AttendanceTermView.as_view(), name="attendance-term"),
+    path("mood-trend/", MoodTrendView.as_view(), name="mood-trend"),
+    path("nap-durations/", NapDurationStatsView.as_view(), name="nap-durations"),
+    path("anomalies/", AnomalyFlagListView.as_view(), name="anomalies"),
+    path("leaderboard/", LeaderboardView.as_view(), name="leaderboard"),
+    path("attendance-forecast/", AttendanceForecastView.as_view(), name="attendance-forecast"),
+    path("weekly-reports/", WeeklyReportListView.as_view(), name="weekly-reports"),
+    path("weekly-reports/<int:report_id>/download/", WeeklyReportDownloadView.as_view(), name="weekly-report-download"),
+    path("reports/", ReportJobListCreateView.as_view(), name="report-jobs"),
+    path("reports/<uuid:job_id>/", ReportJobDetailView.as_view(), name="report-job"),
+    path("reports/<uuid:job_id>/download/", ReportJobDownloadView.as_view(), name="report-job-download"),
 ]
\ No newline at end of file
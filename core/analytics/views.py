@@ -1,45 +1,62 @@
-from django.db.models import Count, Sum, F
+import csv
+from collections import Counter
+
+import numpy as np
+from django.db.models import Count, Sum
 from datetime import datetime, timedelta
-from django.db.models.functions import TruncDay, TruncWeek, TruncMonth, TruncYear
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework import status, permissions
-from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.pagination import PageNumberPagination
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 from auth_app.models import User
-from kindergarten.models import Kindergarten, KindergartenClass, Teacher
+from kindergarten.models import Kindergarten, KindergartenClass, Teacher, TeacherClass
 from kindergarten.permissions import IsSuperAdmin
 from children.models import Children
 from posts.models import Post
-from comments.models import Comment
 from activities.models import Activity
 from attendance.models import Attendance
-from meals.models import Meal
+from meals.models import Meal, MenuPlan
+from meals.plans import planned_meal_counts
 from hygiene.models import Hygiene
 from naps.models import Nap
 from mood.models import ChildMood
+from .models import AnomalyFlag, AttendanceForecast, KindergartenCounter, ReportJob, WeeklyReport
+from .serializers import AnomalyFlagSerializer, ReportJobSerializer, WeeklyReportSerializer
+from . import bitmaps, leaderboard, matrix, moods, nap_stats, rollups
+from .cache import cached_aggregate, scope_for
+
+
+def parse_date_param(value):
+    """Parse an optional YYYY-MM-DD query parameter; raises ValueError on bad input."""
+    if not value:
+        return None
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+class TeacherActivityPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+class LeaderboardPagination(PageNumberPagination):
+    page_size = 25
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
 
 class StatisticsAPIView(APIView):
+    """Chart statistics, served from the DailyRollup rows written by ``manage.py rollup_stats``."""
     permission_classes = [permissions.IsAuthenticated] 
 
-    MODEL_MAP = {
-        "posts": Post,
-        "comments": Comment,
-        "activities": Activity,
-        "attendance": Attendance,
-        "meals": Meal,
-        "hygiene": Hygiene,
-        "naps": Nap,
-        "moods": ChildMood,
-        "users":User,
-        "children":Children,
-    }
-
     PREDEFINED_RANGES = {
         "past_hour": timedelta(hours=1),
         "past_4_hours": timedelta(hours=4),
@@ -59,20 +76,41 @@ class StatisticsAPIView(APIView):
             openapi.Parameter("time_range", openapi.IN_QUERY, description="Predefined time range", type=openapi.TYPE_STRING, required=False),
             openapi.Parameter("start_date", openapi.IN_QUERY, description="Custom start date (YYYY-MM-DD)", type=openapi.TYPE_STRING, required=False),
             openapi.Parameter("end_date", openapi.IN_QUERY, description="Custom end date (YYYY-MM-DD)", type=openapi.TYPE_STRING, required=False),
+            openapi.Parameter("kindergarten_id", openapi.IN_QUERY, description="Superadmin only: restrict to one kindergarten", type=openapi.TYPE_INTEGER, required=False),
         ],
         responses={200: openapi.Response("Success", openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Items(type=openapi.TYPE_OBJECT)))},
     )
     def get(self, request):
-        model_name = request.GET.get("model")
-        interval = request.GET.get("interval", "month")  # Default: month
-        time_range = request.GET.get("time_range")  # Predefined range
-        start_date = request.GET.get("start_date")
-        end_date = request.GET.get("end_date")
+        return self.report(request.user, request.GET)
+
+    def report(self, user, params):
+        """Build the chart response for ``user``; also run by report jobs."""
+        model_name = params.get("model")
+        interval = params.get("interval", "month")  # Default: month
+        time_range = params.get("time_range")  # Predefined range
+        start_date = params.get("start_date")
+        end_date = params.get("end_date")
 
-        if model_name not in self.MODEL_MAP:
+        if model_name not in rollups.METRICS:
             return Response({"error": "Invalid model name."}, status=status.HTTP_400_BAD_REQUEST)
 
-        Model = self.MODEL_MAP[model_name]
+        if interval not in rollups.INTERVALS:
+            return Response({"error": "Invalid interval. Use 'day', 'week', 'month', or 'year'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if user.role == "superadmin":
+            kindergarten_id = params.get("kindergarten_id") or None
+        elif user.role == "admin":
+            try:
+                kindergarten_id = user.kindergarten_admin.kindergarten_id
+            except AttributeError:
+                return Response({"error": "Not assigned to a kindergarten"}, status=400)
+        elif user.role == "teacher" and hasattr(user, "teacher_profile"):
+            kindergarten_id = user.teacher_profile.kindergarten_id
+        else:
+            return Response({"error": "Access Denied"}, status=status.HTTP_403_FORBIDDEN)
+
+        if kindergarten_id is not None and rollups.METRICS[model_name][2] is None:
+            return Response({"error": "This model is only available across all kindergartens."}, status=status.HTTP_403_FORBIDDEN)
 
         if time_range in self.PREDEFINED_RANGES:
             if isinstance(self.PREDEFINED_RANGES[time_range], timedelta):
@@ -90,42 +128,33 @@ class StatisticsAPIView(APIView):
             except ValueError:
                 return Response({"error": "Invalid date format. Use YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
 
-        cache_key = f"stats_{model_name}_{start_date}_{end_date}_{interval}"
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return Response(cached_data)
-        print(request.GET.get("model")=="users",request.GET.get("model"))
-        if request.GET.get("model")=="users":
-          data = Model.objects.filter(date_joined__date__range=[start_date, end_date])
-          trunc_map = {
-              "day": TruncDay("date_joined"),
-              "week": TruncWeek("date_joined"),
-              "month": TruncMonth("date_joined"),
-              "year": TruncYear("date_joined"),
-          }
-        else:
-          data = Model.objects.filter(created_at__date__range=[start_date, end_date])
+        start_date, end_date = start_date.date(), end_date.date()
 
-          trunc_map = {
-              "day": TruncDay("created_at"),
-              "week": TruncWeek("created_at"),
-              "month": TruncMonth("created_at"),
-              "year": TruncYear("created_at"),
-          }
+        response_data = cached_aggregate(
+            "chart",
+            None if kindergarten_id is None else [kindergarten_id],
+            {"model": model_name, "interval": interval, "start": start_date, "end": end_date},
+            lambda: rollups.chart_series(model_name, interval, start_date, end_date, kindergarten_id),
+        )
+        return Response(response_data)
 
-        if interval not in trunc_map:
-            return Response({"error": "Invalid interval. Use 'day', 'week', 'month', or 'year'."}, status=status.HTTP_400_BAD_REQUEST)
 
-        data = (
-            data.annotate(period=trunc_map[interval])
-            .values("period")
-            .annotate(count=Count("id"))
-            .order_by("period")
-        )
+# Dashboard card key for each counter entity.
+DASHBOARD_COUNTER_KEYS = {
+    KindergartenCounter.Entity.CLASSES: "total_classes",
+    KindergartenCounter.Entity.TEACHERS: "total_teachers",
+    KindergartenCounter.Entity.PARENTS: "total_parents",
+    KindergartenCounter.Entity.CHILDREN: "total_children",
+    KindergartenCounter.Entity.POSTS: "total_posts",
+    KindergartenCounter.Entity.COMMENTS: "total_comments",
+    KindergartenCounter.Entity.ACTIVITIES: "total_activities",
+    KindergartenCounter.Entity.ATTENDANCE: "total_attendance_records",
+    KindergartenCounter.Entity.MEALS: "total_meals_logged",
+    KindergartenCounter.Entity.HYGIENE: "total_hygiene_records",
+    KindergartenCounter.Entity.NAPS: "total_nap_records",
+    KindergartenCounter.Entity.MOODS: "total_moods_recorded",
+}
 
-        response_data = list(data)
-        cache.set(cache_key, response_data, timeout=600)
-        return Response(response_data)
 
 @swagger_auto_schema(
     method="get",
@@ -134,44 +163,29 @@ class StatisticsAPIView(APIView):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def dashboard_statistics(request):
+    """Dashboard cards, read from the incrementally maintained KindergartenCounter rows."""
     user = request.user
+    stats = dict.fromkeys(DASHBOARD_COUNTER_KEYS.values(), 0)
 
     if user.role == "superadmin":
-        stats = {
-            "total_kindergartens": Kindergarten.objects.count(),
-            "total_classes": KindergartenClass.objects.count(),
-            "total_teachers": Teacher.objects.count(),
-            "total_parents": User.objects.filter(role="parent").count(),
-            "total_children": Children.objects.count(),
-            "total_posts": Post.objects.count(),
-            "total_comments": Comment.objects.count(),
-            "total_activities": Activity.objects.count(),
-            "total_attendance_records": Attendance.objects.count(),
-            "total_meals_logged": Meal.objects.count(),
-            "total_hygiene_records": Hygiene.objects.count(),
-            "total_nap_records": Nap.objects.count(),
-            "total_moods_recorded": ChildMood.objects.count(),
-        }
+        totals = (
+            KindergartenCounter.objects.values("entity")
+            .annotate(total=Sum("count"))
+            .values_list("entity", "total")
+        )
+        for entity, total in totals:
+            stats[DASHBOARD_COUNTER_KEYS[entity]] = total
+        stats = {"total_kindergartens": Kindergarten.objects.count(), **stats}
+        stats["total_parents"] = User.objects.filter(role="parent").count()
     elif user.role == "admin":
         try:
             kindergarten = user.kindergarten_admin.kindergarten
         except AttributeError:
             return Response({"error": "User is not assigned to a kindergarten"}, status=400)
 
-        stats = {
-            "total_classes": KindergartenClass.objects.filter(kindergarten=kindergarten).count(),
-            "total_teachers": Teacher.objects.filter(kindergarten=kindergarten).count(),
-            "total_parents": User.objects.filter(children__kindergarten=kindergarten).distinct().count(),
-            "total_children": Children.objects.filter(kindergarten=kindergarten).count(),
-            "total_posts": Post.objects.filter(kindergarten=kindergarten).count(),
-            "total_comments": Comment.objects.filter(post__kindergarten=kindergarten).count(),
-            "total_activities": Activity.objects.filter(class_id__kindergarten=kindergarten).count(),
-            "total_attendance_records": Attendance.objects.filter(child__kindergarten=kindergarten).count(),
-            "total_meals_logged": Meal.objects.filter(child__kindergarten=kindergarten).count(),
-            "total_hygiene_records": Hygiene.objects.filter(child__kindergarten=kindergarten).count(),
-            "total_nap_records": Nap.objects.filter(child__kindergarten=kindergarten).count(),
-            "total_moods_recorded": ChildMood.objects.filter(child__kindergarten=kindergarten).count(),
-        }
+        counters = KindergartenCounter.objects.filter(kindergarten=kindergarten).values_list("entity", "count")
+        for entity, count in counters:
+            stats[DASHBOARD_COUNTER_KEYS[entity]] = count
     else:
         return Response({"error": "Access Denied"}, status=403)
 
@@ -179,27 +193,40 @@ def dashboard_statistics(request):
 
 
 class TeacherActivityView(APIView):
-    """GET /analytics/teacher-activity/ — per-teacher activity summary (superadmin/admin)"""
+    """GET /analytics/teacher-activity/ — per-teacher activity summary (superadmin/admin)
+
+    Totals are computed with one grouped query per source table for the whole
+    page of teachers, so the query count does not grow with the teacher count.
+    """
     permission_classes = [IsAuthenticated]
+    pagination_class = TeacherActivityPagination
 
     @swagger_auto_schema(
         manual_parameters=[
             openapi.Parameter('kindergarten_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
             openapi.Parameter('start_date', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='YYYY-MM-DD'),
             openapi.Parameter('end_date', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='YYYY-MM-DD'),
+            openapi.Parameter('page', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
         ],
-        responses={200: openapi.Response('Success', openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Items(type=openapi.TYPE_OBJECT)))},
+        responses={200: openapi.Response('Success', openapi.Schema(type=openapi.TYPE_OBJECT))},
     )
     def get(self, request):
-        user = request.user
+        return self.report(request.user, request.GET, request)
+
+    def report(self, user, params, request=None):
+        """Build the activity summary; report jobs call this without a request and get every teacher."""
         if user.role not in ('superadmin', 'admin'):
             return Response({"error": "Access Denied"}, status=status.HTTP_403_FORBIDDEN)
 
-        start_date = request.GET.get('start_date')
-        end_date = request.GET.get('end_date')
-        kindergarten_id = request.GET.get('kindergarten_id')
+        try:
+            start_date = parse_date_param(params.get('start_date'))
+            end_date = parse_date_param(params.get('end_date'))
+        except ValueError:
+            return Response({"error": "Invalid date format. Use YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+        kindergarten_id = params.get('kindergarten_id')
 
-        teachers_qs = Teacher.objects.select_related('user', 'kindergarten')
+        teachers_qs = Teacher.objects.select_related('user', 'kindergarten').order_by('id')
 
         if user.role == 'admin':
             try:
@@ -210,35 +237,117 @@ class TeacherActivityView(APIView):
         elif kindergarten_id:
             teachers_qs = teachers_qs.filter(kindergarten_id=kindergarten_id)
 
-        result = []
-        for teacher in teachers_qs:
-            class_ids = teacher.teacher_classes.values_list('class_id', flat=True)
+        if user.role == 'admin':
+            scope = [kindergarten.id]
+        else:
+            scope = [kindergarten_id] if kindergarten_id else None
 
-            post_qs = Post.objects.filter(class_id__in=class_ids)
-            activity_qs = Activity.objects.filter(class_id__in=class_ids)
-            attendance_qs = Attendance.objects.filter(child__class_id__in=class_ids)
+        if request is None:
+            return Response(self.summarize(None, teachers_qs, start_date, end_date))
 
-            if start_date:
-                post_qs = post_qs.filter(created_at__date__gte=start_date)
-                activity_qs = activity_qs.filter(time__date__gte=start_date)
-                attendance_qs = attendance_qs.filter(date__gte=start_date)
-            if end_date:
-                post_qs = post_qs.filter(created_at__date__lte=end_date)
-                activity_qs = activity_qs.filter(time__date__lte=end_date)
-                attendance_qs = attendance_qs.filter(date__lte=end_date)
+        data = cached_aggregate(
+            "teacher_activity", scope, {"uri": request.build_absolute_uri()},
+            lambda: self.summarize(request, teachers_qs, start_date, end_date),
+        )
+        return Response(data)
+
+    def summarize(self, request, teachers_qs, start_date, end_date):
+        if request is None:
+            paginator, teachers = None, list(teachers_qs)
+        else:
+            paginator = self.pagination_class()
+            teachers = paginator.paginate_queryset(teachers_qs, request, view=self)
+
+        classes_by_teacher = {}
+        assignments = TeacherClass.objects.filter(teacher__in=teachers).values_list('teacher_id', 'class_id')
+        for teacher_id, class_id in assignments:
+            classes_by_teacher.setdefault(teacher_id, set()).add(class_id)
+        class_ids = set().union(*classes_by_teacher.values())
 
+        post_qs = Post.objects.filter(class_id__in=class_ids)
+        activity_qs = Activity.objects.filter(class_id__in=class_ids)
+        attendance_qs = Attendance.objects.filter(class_id__in=class_ids)
+
+        if start_date:
+            post_qs = post_qs.filter(created_at__date__gte=start_date)
+            activity_qs = activity_qs.filter(time__date__gte=start_date)
+            attendance_qs = attendance_qs.filter(date__gte=start_date)
+        if end_date:
+            post_qs = post_qs.filter(created_at__date__lte=end_date)
+            activity_qs = activity_qs.filter(time__date__lte=end_date)
+            attendance_qs = attendance_qs.filter(date__lte=end_date)
+
+        def counts_by_class(qs, class_field):
+            return dict(qs.order_by().values(class_field).annotate(total=Count('id')).values_list(class_field, 'total'))
+
+        posts_by_class = counts_by_class(post_qs, 'class_id')
+        activities_by_class = counts_by_class(activity_qs, 'class_id')
+        attendance_by_class = counts_by_class(attendance_qs, 'class_id')
+
+        result = []
+        for teacher in teachers:
+            teacher_class_ids = classes_by_teacher.get(teacher.id, ())
             result.append({
                 'teacher_id': teacher.id,
                 'user_id': teacher.user.id,
                 'email': teacher.user.email,
                 'full_name': f"{teacher.user.first_name} {teacher.user.last_name}".strip(),
                 'kindergarten': teacher.kindergarten.name,
-                'total_posts': post_qs.count(),
-                'total_activities': activity_qs.count(),
-                'total_attendance_records': attendance_qs.count(),
+                'total_posts': sum(posts_by_class.get(c, 0) for c in teacher_class_ids),
+                'total_activities': sum(activities_by_class.get(c, 0) for c in teacher_class_ids),
+                'total_attendance_records': sum(attendance_by_class.get(c, 0) for c in teacher_class_ids),
             })
 
-        return Response(result)
+        if paginator is None:
+            return {'count': len(result), 'next': None, 'previous': None, 'results': result}
+        return paginator.get_paginated_response(result).data
+
+
+def progress_for_children(children, start_date=None, end_date=None):
+    """Progress summary for each child, using one grouped query per log table."""
+    child_ids = [child.id for child in children]
+
+    def date_filter(qs, field='date'):
+        qs = qs.filter(child_id__in=child_ids).order_by()
+        if start_date:
+            qs = qs.filter(**{f'{field}__gte': start_date})
+        if end_date:
+            qs = qs.filter(**{f'{field}__lte': end_date})
+        return qs
+
+    def counts_by_child(model):
+        rows = date_filter(model.objects.all()).values('child_id').annotate(total=Count('id'))
+        return dict(rows.values_list('child_id', 'total'))
+
+    attendance = counts_by_child(Attendance)
+    meals = counts_by_child(Meal)
+    # Meals resolved from class menu plans count as logged.
+    plans = MenuPlan.objects.filter(kindergarten_id__in={child.kindergarten_id for child in children})
+    if start_date:
+        plans = plans.filter(date__gte=start_date)
+    if end_date:
+        plans = plans.filter(date__lte=end_date)
+    meals = Counter(meals) + planned_meal_counts(plans, lambda plan, child_id: child_id, children)
+    naps = counts_by_child(Nap)
+    hygiene = counts_by_child(Hygiene)
+
+    moods = {}
+    mood_rows = date_filter(ChildMood.objects.all()).values('child_id', 'mood').annotate(total=Count('id'))
+    for child_id, mood, total in mood_rows.values_list('child_id', 'mood', 'total'):
+        moods.setdefault(child_id, {})[mood] = total
+
+    return [
+        {
+            'child_id': child.id,
+            'child_name': child.name,
+            'attendance_days': attendance.get(child.id, 0),
+            'total_meals_logged': meals.get(child.id, 0),
+            'mood_distribution': moods.get(child.id, {}),
+            'total_naps': naps.get(child.id, 0),
+            'total_hygiene_records': hygiene.get(child.id, 0),
+        }
+        for child in children
+    ]
 
 
 class StudentProgressView(APIView):
@@ -270,35 +379,64 @@ class StudentProgressView(APIView):
             if child.class_id_id not in teacher_class_ids:
                 return Response({"error": "Access Denied"}, status=status.HTTP_403_FORBIDDEN)
 
-        start_date = request.GET.get('start_date')
-        end_date = request.GET.get('end_date')
+        try:
+            start_date = parse_date_param(request.GET.get('start_date'))
+            end_date = parse_date_param(request.GET.get('end_date'))
+        except ValueError:
+            return Response({"error": "Invalid date format. Use YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
 
-        def date_filter(qs, field='date'):
-            if start_date:
-                qs = qs.filter(**{f'{field}__gte': start_date})
-            if end_date:
-                qs = qs.filter(**{f'{field}__lte': end_date})
-            return qs
+        data = cached_aggregate(
+            "student_progress", [child.kindergarten_id], {"child": child.id, "start": start_date, "end": end_date},
+            lambda: progress_for_children([child], start_date, end_date)[0],
+        )
+        return Response(data)
 
-        attendance_qs = date_filter(child.attendances.all())
-        meals_qs = date_filter(child.meals.all())
-        moods_qs = date_filter(child.moods.all())
-        naps_qs = date_filter(child.naps.all())
-        hygiene_qs = date_filter(child.hygiene_records.all())
 
-        mood_distribution = dict(
-            moods_qs.values('mood').annotate(count=Count('id')).values_list('mood', 'count')
-        )
+class BatchStudentProgressView(APIView):
+    """GET /analytics/student-progress/ — progress for every visible child in a class, kindergarten or id list"""
+    permission_classes = [IsAuthenticated]
 
-        return Response({
-            'child_id': child.id,
-            'child_name': child.name,
-            'attendance_days': attendance_qs.count(),
-            'total_meals_logged': meals_qs.count(),
-            'mood_distribution': mood_distribution,
-            'total_naps': naps_qs.count(),
-            'total_hygiene_records': hygiene_qs.count(),
-        })
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('class_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('kindergarten_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('child_ids', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='Comma-separated child ids'),
+            openapi.Parameter('start_date', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='YYYY-MM-DD'),
+            openapi.Parameter('end_date', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='YYYY-MM-DD'),
+        ],
+        responses={200: openapi.Response('Success', openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Items(type=openapi.TYPE_OBJECT)))},
+    )
+    def get(self, request):
+        class_id = request.GET.get('class_id')
+        kindergarten_id = request.GET.get('kindergarten_id')
+        child_ids = request.GET.get('child_ids')
+
+        if sum(bool(value) for value in (class_id, kindergarten_id, child_ids)) != 1:
+            return Response({"error": "Provide exactly one of class_id, kindergarten_id or child_ids."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            start_date = parse_date_param(request.GET.get('start_date'))
+            end_date = parse_date_param(request.GET.get('end_date'))
+            if class_id:
+                selection = {'class_id': int(class_id)}
+            elif kindergarten_id:
+                selection = {'kindergarten_id': int(kindergarten_id)}
+            else:
+                selection = {'id__in': [int(child_id) for child_id in child_ids.split(',') if child_id.strip()]}
+        except ValueError:
+            return Response({"error": "Invalid parameter. Ids must be integers and dates YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+
+        def compute():
+            # Children the caller cannot see are silently excluded.
+            children = list(Children.objects.visible_to(request.user).filter(**selection).order_by('name', 'id'))
+            return progress_for_children(children, start_date, end_date)
+
+        scope, viewer = scope_for(request.user)
+        data = cached_aggregate(
+            "student_progress_batch", scope,
+            {"viewer": viewer, "selection": selection, "start": start_date, "end": end_date}, compute,
+        )
+        return Response(data)
 
 
 class AttendanceReportView(APIView):
@@ -315,7 +453,10 @@ class AttendanceReportView(APIView):
         responses={200: openapi.Response('Success', openapi.Schema(type=openapi.TYPE_OBJECT))},
     )
     def get(self, request):
-        user = request.user
+        return self.report(request.user, request.GET)
+
+    def report(self, user, params):
+        """Build the attendance summary for ``user``; also run by report jobs."""
         if user.role not in ('superadmin', 'admin', 'teacher'):
             return Response({"error": "Access Denied"}, status=status.HTTP_403_FORBIDDEN)
 
@@ -323,36 +464,609 @@ class AttendanceReportView(APIView):
 
         if user.role == 'admin':
             try:
-                qs = qs.filter(child__kindergarten=user.kindergarten_admin.kindergarten)
+                qs = qs.filter(kindergarten=user.kindergarten_admin.kindergarten)
             except AttributeError:
                 return Response({"error": "Not assigned to a kindergarten"}, status=400)
         elif user.role == 'teacher':
             class_ids = user.teacher_profile.teacher_classes.values_list('class_id', flat=True)
-            qs = qs.filter(child__class_id__in=class_ids)
+            qs = qs.filter(class_id__in=class_ids)
 
-        kindergarten_id = request.GET.get('kindergarten_id')
+        kindergarten_id = params.get('kindergarten_id')
         if kindergarten_id and user.role == 'superadmin':
-            qs = qs.filter(child__kindergarten_id=kindergarten_id)
+            qs = qs.filter(kindergarten_id=kindergarten_id)
 
-        class_id = request.GET.get('class_id')
+        class_id = params.get('class_id')
         if class_id:
-            qs = qs.filter(child__class_id=class_id)
+            qs = qs.filter(class_id=class_id)
 
-        start_date = request.GET.get('start_date')
+        start_date = params.get('start_date')
         if start_date:
             qs = qs.filter(date__gte=start_date)
 
-        end_date = request.GET.get('end_date')
+        end_date = params.get('end_date')
         if end_date:
             qs = qs.filter(date__lte=end_date)
 
-        by_class = (
-            qs.values('child__class_id', 'child__class_id__name', 'child__kindergarten__name')
-            .annotate(attendance_count=Count('id'))
-            .order_by('child__class_id')
+        def compute():
+            by_class = (
+                qs.values_list('class_id', 'class_id__name', 'kindergarten__name')
+                .annotate(attendance_count=Count('id'))
+                .order_by('class_id')
+            )
+            return {
+                'total_attendance_records': qs.count(),
+                'by_class': [
+                    {'child__class_id': class_id, 'child__class_id__name': class_name,
+                     'child__kindergarten__name': kindergarten_name, 'attendance_count': count}
+                    for class_id, class_name, kindergarten_name, count in by_class
+                ],
+            }
+
+        scope, viewer = scope_for(user)
+        if scope is None and kindergarten_id:
+            scope = [kindergarten_id]
+        data = cached_aggregate("attendance_report", scope, {"viewer": viewer, "params": sorted(params.items())}, compute)
+        return Response(data)
+
+
+class _Echo:
+    """File-like object whose write() hands the row back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+class AttendanceMatrixView(APIView):
+    """GET /analytics/attendance-matrix/ — child × day presence grid for one class
+
+    Each child's row is a string with one character per calendar day from
+    start_date to end_date ("1" present, "0" absent), or its run-length form
+    ("P3A2P2") with ``encoding=rle``, or that bitstring read as a big-endian
+    binary number in hex with ``encoding=hex``. ``output=csv`` streams the
+    grid as CSV.
+    """
+    permission_classes = [IsAuthenticated]
+    MAX_DAYS = 366
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('class_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True),
+            openapi.Parameter('start_date', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='YYYY-MM-DD', required=True),
+            openapi.Parameter('end_date', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='YYYY-MM-DD', required=True),
+            openapi.Parameter('encoding', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='bitstring (default), rle or hex'),
+            openapi.Parameter('output', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='json (default) or csv'),
+        ],
+        responses={200: openapi.Response('Success', openapi.Schema(type=openapi.TYPE_OBJECT))},
+    )
+    def get(self, request):
+        user = request.user
+        if user.role not in ('superadmin', 'admin', 'teacher'):
+            return Response({"error": "Access Denied"}, status=status.HTTP_403_FORBIDDEN)
+
+        encoding = request.GET.get('encoding', 'bitstring')
+        if encoding not in matrix.ENCODINGS:
+            return Response({"error": "Invalid encoding. Use 'bitstring', 'rle' or 'hex'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            class_id = int(request.GET.get('class_id', ''))
+            start_date = parse_date_param(request.GET.get('start_date'))
+            end_date = parse_date_param(request.GET.get('end_date'))
+        except ValueError:
+            return Response({"error": "class_id must be an integer and dates YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+        if not start_date or not end_date or start_date > end_date:
+            return Response({"error": "Provide start_date and end_date with start_date <= end_date."}, status=status.HTTP_400_BAD_REQUEST)
+        if (end_date - start_date).days >= self.MAX_DAYS:
+            return Response({"error": f"The range can span at most {self.MAX_DAYS} days."}, status=status.HTTP_400_BAD_REQUEST)
+
+        kindergarten_class = KindergartenClass.objects.visible_to(user).filter(pk=class_id).first()
+        if kindergarten_class is None:
+            return Response({"error": "Class not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        def class_rows():
+            children = list(Children.objects.filter(class_id=kindergarten_class).order_by('id').only('id', 'name'))
+            return matrix.presence_rows(children, start_date, end_date)
+
+        if request.GET.get('output') == 'csv':
+            days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+            writer = csv.writer(_Echo())
+
+            def stream():
+                yield writer.writerow(['child_id', 'child_name', *[day.isoformat() for day in days]])
+                for child, presence in class_rows():
+                    yield writer.writerow([child.id, child.name, *presence.decode()])
+
+            response = StreamingHttpResponse(stream(), content_type='text/csv')
+            response['Content-Disposition'] = (
+                f'attachment; filename="attendance_{kindergarten_class.id}_{start_date}_{end_date}.csv"'
+            )
+            return response
+
+        data = cached_aggregate(
+            "attendance_matrix", [kindergarten_class.kindergarten_id],
+            {"class": kindergarten_class.id, "start": start_date, "end": end_date, "encoding": encoding},
+            lambda: self.matrix_data(kindergarten_class, class_rows(), start_date, end_date, encoding),
+        )
+        return Response(data)
+
+    def matrix_data(self, kindergarten_class, rows, start_date, end_date, encoding):
+        return {
+            'class_id': kindergarten_class.id,
+            'class_name': kindergarten_class.name,
+            'start_date': start_date,
+            'end_date': end_date,
+            'days': (end_date - start_date).days + 1,
+            'encoding': encoding,
+            'children': [
+                {
+                    'child_id': child.id,
+                    'child_name': child.name,
+                    'present_days': presence.count(b'1'),
+                    'presence': matrix.encode_presence(presence, encoding),
+                }
+                for child, presence in rows
+            ],
+        }
+
+
+class MoodTrendView(APIView):
+    """GET /analytics/mood-trend/ — rolling mood distributions, negative streaks and weekly shifts for one class
+
+    Defaults to the year up to today and a 7-day rolling window. Results are
+    cached per class and day and dropped when a mood record changes.
+    """
+    permission_classes = [IsAuthenticated]
+    MAX_DAYS = 366
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('class_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True),
+            openapi.Parameter('start_date', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='YYYY-MM-DD'),
+            openapi.Parameter('end_date', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='YYYY-MM-DD'),
+            openapi.Parameter('window', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Rolling window in days (default 7)'),
+        ],
+        responses={200: openapi.Response('Success', openapi.Schema(type=openapi.TYPE_OBJECT))},
+    )
+    def get(self, request):
+        user = request.user
+        if user.role not in ('superadmin', 'admin', 'teacher'):
+            return Response({"error": "Access Denied"}, status=status.HTTP_403_FORBIDDEN)
+
+        today = timezone.localdate()
+        try:
+            class_id = int(request.GET.get('class_id', ''))
+            window = int(request.GET.get('window', 7))
+            end_date = parse_date_param(request.GET.get('end_date')) or today
+            start_date = parse_date_param(request.GET.get('start_date')) or end_date - timedelta(days=self.MAX_DAYS - 1)
+        except ValueError:
+            return Response({"error": "class_id and window must be integers and dates YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+        if start_date > end_date or (end_date - start_date).days >= self.MAX_DAYS:
+            return Response({"error": f"start_date must not be after end_date and the range can span at most {self.MAX_DAYS} days."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= window <= 90:
+            return Response({"error": "window must be between 1 and 90 days."}, status=status.HTTP_400_BAD_REQUEST)
+
+        kindergarten_class = KindergartenClass.objects.visible_to(user).filter(pk=class_id).first()
+        if kindergarten_class is None:
+            return Response({"error": "Class not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        def compute():
+            children = list(Children.objects.filter(class_id=kindergarten_class).order_by('id').only('id', 'name'))
+            return {'class_id': kindergarten_class.id, **moods.class_mood_trend(children, start_date, end_date, window)}
+
+        data = cached_aggregate(
+            "mood_trend", [kindergarten_class.kindergarten_id],
+            {"class": kindergarten_class.id, "day": today, "start": start_date, "end": end_date, "window": window},
+            compute,
         )
+        return Response(data)
+
+
+class NapDurationStatsView(APIView):
+    """GET /analytics/nap-durations/ — nap length statistics per child, class or kindergarten
+
+    Mean, median, p10/p90 (nearest rank) and a histogram of nap minutes over
+    a date range, plus the longest naps. Naps ending after midnight count
+    until their end time on the next day.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('group_by', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='child, class (default) or kindergarten'),
+            openapi.Parameter('kindergarten_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('class_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('child_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('start_date', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='YYYY-MM-DD'),
+            openapi.Parameter('end_date', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='YYYY-MM-DD'),
+            openapi.Parameter('bucket_minutes', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Histogram bucket width (default 15)'),
+        ],
+        responses={200: openapi.Response('Success', openapi.Schema(type=openapi.TYPE_OBJECT))},
+    )
+    def get(self, request):
+        group_by = request.GET.get('group_by', 'class')
+        if group_by not in nap_stats.GROUPS:
+            return Response({"error": "Invalid group_by. Use 'child', 'class' or 'kindergarten'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            start_date = parse_date_param(request.GET.get('start_date'))
+            end_date = parse_date_param(request.GET.get('end_date'))
+            bucket_minutes = int(request.GET.get('bucket_minutes', 15))
+            selection = {
+                field: int(request.GET[param])
+                for param, field in (('kindergarten_id', 'kindergarten_id'), ('class_id', 'class_id'), ('child_id', 'child_id'))
+                if request.GET.get(param)
+            }
+        except ValueError:
+            return Response({"error": "Invalid parameter. Ids must be integers and dates YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= bucket_minutes <= 240:
+            return Response({"error": "bucket_minutes must be between 1 and 240."}, status=status.HTTP_400_BAD_REQUEST)
+
+        def compute():
+            naps = Nap.objects.filter(child__in=Children.objects.visible_to(request.user), **selection)
+            if start_date:
+                naps = naps.filter(date__gte=start_date)
+            if end_date:
+                naps = naps.filter(date__lte=end_date)
+            return {
+                'group_by': group_by,
+                'groups': nap_stats.duration_stats(naps, group_by, bucket_minutes),
+                'longest_naps': nap_stats.longest_naps(naps),
+            }
+
+        scope, viewer = scope_for(request.user)
+        if scope is None and 'kindergarten_id' in selection:
+            scope = [selection['kindergarten_id']]
+        data = cached_aggregate(
+            "nap_durations", scope,
+            {"viewer": viewer, "group_by": group_by, "selection": selection, "start": start_date, "end": end_date, "bucket": bucket_minutes},
+            compute,
+        )
+        return Response(data)
+
+
+class AttendanceTermView(APIView):
+    """GET /analytics/attendance-term/ — per-child attendance over a term, from the attendance bitmaps
+
+    For every visible child of the class or kindergarten: days present out
+    of the term's school days (weekdays) up to today, the rate, the longest
+    presence and absence streaks and absences per weekday. ``below=0.8``
+    keeps only children under that rate; ``days=YYYY-MM-DD,...`` adds
+    whether each child was present on all of those days.
+    """
+    permission_classes = [IsAuthenticated]
+    MAX_DAYS = 400
 
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('class_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('kindergarten_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('start_date', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='YYYY-MM-DD', required=True),
+            openapi.Parameter('end_date', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='YYYY-MM-DD', required=True),
+            openapi.Parameter('below', openapi.IN_QUERY, type=openapi.TYPE_NUMBER, description='Only children with a rate under this, e.g. 0.8'),
+            openapi.Parameter('days', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='Comma-separated YYYY-MM-DD days within the term'),
+        ],
+        responses={200: openapi.Response('Success', openapi.Schema(type=openapi.TYPE_OBJECT))},
+    )
+    def get(self, request):
+        if request.user.role not in ('superadmin', 'admin', 'teacher'):
+            return Response({"error": "Access Denied"}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            start_date = parse_date_param(request.GET.get('start_date'))
+            end_date = parse_date_param(request.GET.get('end_date'))
+            below = float(request.GET['below']) if request.GET.get('below') else None
+            days = [parse_date_param(day) for day in request.GET.get('days', '').split(',') if day]
+            filters = {
+                field: int(request.GET[param])
+                for param, field in (('class_id', 'class_id'), ('kindergarten_id', 'kindergarten_id'))
+                if request.GET.get(param)
+            }
+        except ValueError:
+            return Response({"error": "Invalid parameter. Ids must be integers, below a number and dates YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+        if not start_date or not end_date or start_date > end_date:
+            return Response({"error": "Provide start_date and end_date with start_date <= end_date."}, status=status.HTTP_400_BAD_REQUEST)
+        if (end_date - start_date).days >= self.MAX_DAYS:
+            return Response({"error": f"The range can span at most {self.MAX_DAYS} days."}, status=status.HTTP_400_BAD_REQUEST)
+        # Days still to come are not absences; the term counts up to today.
+        counted_until = min(end_date, timezone.localdate())
+        if counted_until < start_date:
+            return Response({"error": "The term has not started yet."}, status=status.HTTP_400_BAD_REQUEST)
+        if any(not start_date <= day <= counted_until for day in days):
+            return Response({"error": "days must fall within the term, up to today."}, status=status.HTTP_400_BAD_REQUEST)
+        if not filters:
+            return Response({"error": "Provide class_id or kindergarten_id."}, status=status.HTTP_400_BAD_REQUEST)
+
+        children = Children.objects.visible_to(request.user).filter(**filters)
+        child_ids, school_days, present = bitmaps.load_term(children, start_date, counted_until)
+        rates = bitmaps.rates(present)
+        selected = np.flatnonzero(rates < below) if below is not None else np.arange(len(child_ids))
+
+        present = present[selected]
+        longest_present = bitmaps.longest_runs(present)
+        longest_absent = bitmaps.longest_runs(~present)
+        absences = bitmaps.absences_by_weekday(present, school_days)
+        on_all = bitmaps.present_on_all(present, school_days, days) if days else None
+        names = dict(Children.objects.filter(id__in=child_ids[selected].tolist()).values_list('id', 'name'))
+
+        rows = []
+        for row, index in enumerate(selected):
+            child_id = int(child_ids[index])
+            entry = {
+                'child_id': child_id,
+                'name': names.get(child_id),
+                'present_days': int(present[row].sum()),
+                'rate': round(float(rates[index]), 4),
+                'longest_streak': int(longest_present[row]),
+                'longest_absence': int(longest_absent[row]),
+                'absences_by_weekday': dict(zip(bitmaps.WEEKDAYS, absences[row].tolist())),
+            }
+            if on_all is not None:
+                entry['present_on_all_days'] = bool(on_all[row])
+            rows.append(entry)
         return Response({
-            'total_attendance_records': qs.count(),
-            'by_class': list(by_class),
+            'start_date': start_date,
+            'end_date': end_date,
+            'counted_until': counted_until,
+            'school_days': len(school_days),
+            'children': rows,
         })
+
+
+class AnomalyFlagListView(APIView):
+    """GET /analytics/anomalies/ — flags written by ``manage.py detect_anomalies``
+
+    Defaults to the most recent detection day visible to the caller.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('date', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='Detection day (YYYY-MM-DD), defaults to the latest'),
+            openapi.Parameter('rule', openapi.IN_QUERY, type=openapi.TYPE_STRING, description=', '.join(AnomalyFlag.Rule.values)),
+            openapi.Parameter('kindergarten_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('child_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        ],
+        responses={200: AnomalyFlagSerializer(many=True)},
+    )
+    def get(self, request):
+        if request.user.role not in ('superadmin', 'admin', 'teacher'):
+            return Response({"error": "Access Denied"}, status=status.HTTP_403_FORBIDDEN)
+
+        rule = request.GET.get('rule')
+        if rule and rule not in AnomalyFlag.Rule.values:
+            return Response({"error": f"Invalid rule. Use one of: {', '.join(AnomalyFlag.Rule.values)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            detected_on = parse_date_param(request.GET.get('date'))
+            filters = {
+                field: int(request.GET[param])
+                for param, field in (('kindergarten_id', 'kindergarten_id'), ('child_id', 'child_id'))
+                if request.GET.get(param)
+            }
+        except ValueError:
+            return Response({"error": "Invalid parameter. Ids must be integers and dates YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+        if rule:
+            filters['rule'] = rule
+
+        flags = AnomalyFlag.objects.filter(child__in=Children.objects.visible_to(request.user), **filters)
+        if detected_on is None:
+            detected_on = flags.order_by('-detected_on').values_list('detected_on', flat=True).first()
+        flags = flags.filter(detected_on=detected_on).select_related('child')
+        return Response(AnomalyFlagSerializer(flags, many=True).data)
+
+
+class LeaderboardView(APIView):
+    """GET /analytics/leaderboard/ — engagement of every kindergarten or class, ranked (superadmin)
+
+    Posts per week, activities per class and week, attendance coverage (share
+    of weekday child-days with an attendance record) and comments per post,
+    each with a rank and percentile across all rows. A page costs two
+    queries however many kindergartens exist.
+    """
+    permission_classes = [IsSuperAdmin]
+    pagination_class = LeaderboardPagination
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('level', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='kindergarten (default) or class'),
+            openapi.Parameter('order_by', openapi.IN_QUERY, type=openapi.TYPE_STRING, description=', '.join(leaderboard.METRICS)),
+            openapi.Parameter('start_date', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='YYYY-MM-DD, defaults to 28 days before end_date'),
+            openapi.Parameter('end_date', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='YYYY-MM-DD, defaults to today'),
+            openapi.Parameter('page', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        ],
+        responses={200: openapi.Response('Success', openapi.Schema(type=openapi.TYPE_OBJECT))},
+    )
+    def get(self, request):
+        level = request.GET.get('level', 'kindergarten')
+        if level not in leaderboard.LEVELS:
+            return Response({"error": "Invalid level. Use 'kindergarten' or 'class'."}, status=status.HTTP_400_BAD_REQUEST)
+        order_by = request.GET.get('order_by', 'posts_per_week')
+        if order_by not in leaderboard.METRICS:
+            return Response({"error": f"Invalid order_by. Use one of: {', '.join(leaderboard.METRICS)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            end_date = parse_date_param(request.GET.get('end_date')) or timezone.localdate()
+            start_date = parse_date_param(request.GET.get('start_date')) or end_date - timedelta(days=27)
+        except ValueError:
+            return Response({"error": "Invalid date format. Use YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+        if start_date > end_date:
+            return Response({"error": "start_date must not be after end_date."}, status=status.HTTP_400_BAD_REQUEST)
+
+        def compute():
+            rows = leaderboard.leaderboard(level, start_date, end_date).order_by(f'{order_by}_rank', 'id')
+            paginator = self.pagination_class()
+            page = paginator.paginate_queryset(rows, request, view=self)
+            return paginator.get_paginated_response([leaderboard.format_row(row, level) for row in page]).data
+
+        data = cached_aggregate(
+            "leaderboard", None, {"uri": request.build_absolute_uri(), "start": start_date, "end": end_date}, compute,
+        )
+        return Response(data)
+
+
+class AttendanceForecastView(APIView):
+    """GET /analytics/attendance-forecast/ — expected daily headcount for the coming days
+
+    Reads the rows stored by ``manage.py forecast_attendance``; nothing is
+    fitted per request. Teachers see their own classes only.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('kindergarten_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Required for superadmins'),
+            openapi.Parameter('class_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('days', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Days from today (default 7)'),
+        ],
+        responses={200: openapi.Response('Success', openapi.Schema(type=openapi.TYPE_OBJECT))},
+    )
+    def get(self, request):
+        user = request.user
+        try:
+            days = int(request.GET.get('days', 7))
+            class_id = int(request.GET['class_id']) if request.GET.get('class_id') else None
+            kindergarten_id = int(request.GET['kindergarten_id']) if request.GET.get('kindergarten_id') else None
+        except ValueError:
+            return Response({"error": "days, class_id and kindergarten_id must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= days <= 60:
+            return Response({"error": "days must be between 1 and 60."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if user.role == 'superadmin':
+            if kindergarten_id is None and class_id is None:
+                return Response({"error": "Provide kindergarten_id or class_id."}, status=status.HTTP_400_BAD_REQUEST)
+        elif user.role == 'admin':
+            try:
+                kindergarten_id = user.kindergarten_admin.kindergarten_id
+            except AttributeError:
+                return Response({"error": "Not assigned to a kindergarten"}, status=400)
+        elif user.role != 'teacher':
+            return Response({"error": "Access Denied"}, status=status.HTTP_403_FORBIDDEN)
+
+        classes = KindergartenClass.objects.visible_to(user)
+        if kindergarten_id is not None:
+            classes = classes.filter(kindergarten_id=kindergarten_id)
+        if class_id is not None:
+            classes = classes.filter(pk=class_id)
+        classes = {kindergarten_class.id: kindergarten_class for kindergarten_class in classes}
+        if class_id is not None and not classes:
+            return Response({"error": "Class not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        today = timezone.localdate()
+        forecasts = AttendanceForecast.objects.filter(
+            day__range=(today, today + timedelta(days=days - 1)), kindergarten_class_id__in=list(classes),
+        )
+        include_total = class_id is None and user.role in ('superadmin', 'admin')
+        if include_total:
+            forecasts = forecasts | AttendanceForecast.objects.filter(
+                day__range=(today, today + timedelta(days=days - 1)),
+                kindergarten_id=kindergarten_id, kindergarten_class__isnull=True,
+            )
+
+        total, by_class, generated_on = [], {}, None
+        for row in forecasts.order_by('day').values('kindergarten_class_id', 'day', 'expected', 'generated_on'):
+            generated_on = max(generated_on or row['generated_on'], row['generated_on'])
+            point = {'date': row['day'], 'expected': row['expected']}
+            if row['kindergarten_class_id'] is None:
+                total.append(point)
+            else:
+                by_class.setdefault(row['kindergarten_class_id'], []).append(point)
+
+        data = {
+            'generated_on': generated_on,
+            'classes': [
+                {'class_id': pk, 'class_name': classes[pk].name, 'forecast': by_class[pk]}
+                for pk in sorted(by_class)
+            ],
+        }
+        if include_total:
+            data = {'kindergarten_id': kindergarten_id, **data, 'kindergarten': total}
+        return Response(data)
+
+
+class WeeklyReportListView(APIView):
+    """GET /analytics/weekly-reports/ — weekly reports of the children visible to the caller"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('child_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('week_start', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='Monday of the week (YYYY-MM-DD)'),
+        ],
+        responses={200: WeeklyReportSerializer(many=True)},
+    )
+    def get(self, request):
+        reports = WeeklyReport.objects.filter(child__in=Children.objects.visible_to(request.user)).select_related('child')
+        try:
+            if request.GET.get('child_id'):
+                reports = reports.filter(child_id=int(request.GET['child_id']))
+            week_start = parse_date_param(request.GET.get('week_start'))
+        except ValueError:
+            return Response({"error": "child_id must be an integer and week_start YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+        if week_start:
+            reports = reports.filter(week_start=week_start)
+        return Response(WeeklyReportSerializer(reports[:200], many=True).data)
+
+
+class WeeklyReportDownloadView(APIView):
+    """GET /analytics/weekly-reports/<id>/download/ — the report as HTML (default) or ``output=text``"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[openapi.Parameter('output', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='html (default) or text')],
+    )
+    def get(self, request, report_id):
+        report = get_object_or_404(
+            WeeklyReport.objects.filter(child__in=Children.objects.visible_to(request.user)), id=report_id,
+        )
+        if request.GET.get('output') == 'text':
+            return HttpResponse(report.text, content_type='text/plain; charset=utf-8')
+        return HttpResponse(report.html, content_type='text/html; charset=utf-8')
+
+
+class ReportJobListCreateView(APIView):
+    """GET/POST /analytics/reports/ — queue a long-running report and list your own jobs
+
+    POST ``{"kind": "statistics" | "teacher_activity" | "attendance_report",
+    "params": {...}}`` where ``params`` are the query parameters of the
+    matching endpoint. The job is computed by ``manage.py run_report_worker``;
+    poll ``/analytics/reports/<id>/`` and fetch ``download/`` once it is done.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(responses={200: ReportJobSerializer(many=True)})
+    def get(self, request):
+        jobs = ReportJob.objects.filter(requested_by=request.user)
+        return Response(ReportJobSerializer(jobs, many=True).data)
+
+    @swagger_auto_schema(request_body=ReportJobSerializer, responses={202: ReportJobSerializer})
+    def post(self, request):
+        serializer = ReportJobSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = serializer.save(requested_by=request.user)
+        return Response(ReportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class ReportJobDetailView(APIView):
+    """GET /analytics/reports/<id>/ — status of one of your report jobs"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(responses={200: ReportJobSerializer})
+    def get(self, request, job_id):
+        job = get_object_or_404(ReportJob, id=job_id, requested_by=request.user)
+        return Response(ReportJobSerializer(job).data)
+
+
+class ReportJobDownloadView(APIView):
+    """GET /analytics/reports/<id>/download/ — result of a finished report job"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(responses={200: openapi.Response('Success', openapi.Schema(type=openapi.TYPE_OBJECT))})
+    def get(self, request, job_id):
+        job = get_object_or_404(ReportJob, id=job_id, requested_by=request.user)
+        if job.expires_at and job.expires_at <= timezone.now():
+            return Response({"error": "This report has expired."}, status=status.HTTP_410_GONE)
+        if job.status == ReportJob.Status.FAILED:
+            return Response({"error": job.error or "Report failed."}, status=status.HTTP_400_BAD_REQUEST)
+        if job.status != ReportJob.Status.DONE:
+            return Response({"error": "Report is not ready yet.", "status": job.status}, status=status.HTTP_409_CONFLICT)
+        return Response(job.result)
@@ -0,0 +1,139 @@
+"""Weekly parent reports, built by ``manage.py build_weekly_reports``.
+
+A kindergarten's week is loaded with one query per log table and grouped
+by child into plain dicts; rendering those dicts to HTML and text is the
+expensive part and runs in worker processes, after which the reports are
+upserted in bulk.
+"""
+from collections import Counter, defaultdict
+from datetime import time, timedelta
+
+from django.template.loader import get_template
+from django.utils import timezone
+
+from children.models import Children
+from attendance.models import Attendance
+from meals.models import Meal, MenuPlan
+from meals.plans import planned_meals
+from naps.models import Nap
+from mood.models import ChildMood
+from hygiene.models import Hygiene
+from activities.models import Activity
+from .models import WeeklyReport
+
+SECTIONS = ("attendance", "meals", "naps", "moods", "hygiene", "activities")
+
+
+def week_bounds(day):
+    """Monday and Sunday of the week containing ``day``."""
+    week_start = day - timedelta(days=day.weekday())
+    return week_start, week_start + timedelta(days=6)
+
+
+def _hhmm(value):
+    return f"{value:%H:%M}" if value else ""
+
+
+def load_week(kindergarten_id, week_start):
+    """Return one report payload per child of the kindergarten, using one query per log table.
+
+    Meals include those resolved from the week's class menu plans.
+
+    Dates and times are formatted here, once, so the templates only place
+    strings; Django's per-value date filters dominate rendering otherwise.
+    """
+    week_end = week_start + timedelta(days=6)
+    in_week = {"kindergarten_id": kindergarten_id, "date__range": (week_start, week_end)}
+    logs = defaultdict(lambda: {section: [] for section in SECTIONS})
+
+    for child_id, day, check_in, check_out in (
+        Attendance.objects.filter(**in_week).order_by("date").values_list("child_id", "date", "check_in_time", "check_out_time")
+    ):
+        logs[child_id]["attendance"].append({"date": day, "check_in": _hhmm(check_in), "check_out": _hhmm(check_out)})
+
+    meals = [
+        *Meal.objects.filter(**in_week).values_list("child_id", "date", "intake_time", "meal_title", "appetite_level"),
+        *(
+            (meal.child_id, meal.date, meal.intake_time, meal.meal_title, meal.appetite_level)
+            for meal in planned_meals(MenuPlan.objects.filter(**in_week))
+        ),
+    ]
+    meals.sort(key=lambda meal: (meal[1], meal[2] is None, meal[2] or time.min))
+    for child_id, day, _, title, appetite in meals:
+        logs[child_id]["meals"].append({"day": f"{day:%a}", "title": title, "appetite": Meal.AppetiteLevel(appetite).label})
+
+    for child_id, day, sleep_from, sleep_to, minutes in (
+        Nap.objects.filter(**in_week).order_by("date", "sleep_from").values_list("child_id", "date", "sleep_from", "sleep_to", "duration_minutes")
+    ):
+        logs[child_id]["naps"].append({"day": f"{day:%a}", "from": _hhmm(sleep_from), "to": _hhmm(sleep_to), "minutes": minutes or 0})
+
+    for child_id, day, mood in ChildMood.objects.filter(**in_week).order_by("date").values_list("child_id", "date", "mood"):
+        logs[child_id]["moods"].append({"day": f"{day:%a}", "mood": ChildMood.MoodChoices(mood).label})
+
+    for child_id, day, activity, at in (
+        Hygiene.objects.filter(**in_week).order_by("date", "hygiene_activity_time").values_list("child_id", "date", "activity", "hygiene_activity_time")
+    ):
+        logs[child_id]["hygiene"].append({"day": f"{day:%a}", "activity": activity, "time": _hhmm(at)})
+
+    for child_id, name, at in (
+        Activity.children.through.objects
+        .filter(children__kindergarten_id=kindergarten_id, activity__time__date__range=(week_start, week_end))
+        .order_by("activity__time")
+        .values_list("children_id", "activity__name", "activity__time")
+    ):
+        logs[child_id]["activities"].append({"name": name, "time": f"{timezone.localtime(at):%a %H:%M}"})
+
+    children = (
+        Children.objects.filter(kindergarten_id=kindergarten_id)
+        .order_by("id")
+        .values_list("id", "name", "kindergarten__name")
+    )
+    return [
+        {
+            "child_id": child_id,
+            "child_name": name,
+            "kindergarten_name": kindergarten_name,
+            "week_start": week_start,
+            "week_end": week_end,
+            "period": f"{week_start:%b} {week_start.day} – {week_end:%b} {week_end.day}, {week_end.year}",
+            **logs.get(child_id, {section: [] for section in SECTIONS}),
+        }
+        for child_id, name, kindergarten_name in children
+    ]
+
+
+def summarize(payload):
+    """Add the totals shown at the top of a report."""
+    return {
+        **payload,
+        "days_present": len({row["date"] for row in payload["attendance"]}),
+        "nap_minutes": sum(row["minutes"] for row in payload["naps"]),
+        "mood_counts": Counter(row["mood"] for row in payload["moods"]).most_common(),
+        "low_appetite_meals": sum(row["appetite"] == Meal.AppetiteLevel.LOW.label for row in payload["meals"]),
+    }
+
+
+def render_reports(payloads):
+    """Render ``(child_id, html, text)`` for each payload. Runs in worker processes."""
+    html_template = get_template("analytics/weekly_report.html")
+    text_template = get_template("analytics/weekly_report.txt")
+    rendered = []
+    for payload in payloads:
+        context = summarize(payload)
+        rendered.append((payload["child_id"], html_template.render(context), text_template.render(context)))
+    return rendered
+
+
+def store_reports(kindergarten_id, week_start, rendered):
+    """Insert or replace the rendered reports of one kindergarten and week."""
+    WeeklyReport.objects.bulk_create(
+        [
+            WeeklyReport(child_id=child_id, kindergarten_id=kindergarten_id, week_start=week_start, html=html, text=text)
+            for child_id, html, text in rendered
+        ],
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["child", "week_start"],
+        update_fields=["kindergarten", "html", "text", "rendered_at"],
+    )
+    return len(rendered)
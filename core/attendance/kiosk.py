@@ -0,0 +1,162 @@
+"""Kiosk check-in: drop-off tablets that scan children's QR codes.
+
+A ``KioskDevice`` authenticates with ``Authorization: Kiosk <token>`` and
+posts the scans it buffered to ``POST /attendance/kiosk/scans/``::
+
+    {"scans": [{"qr": "12:...", "action": "check_in", "scanned_at": "2025-03-03T08:01:12+01:00"}, ...]}
+
+A child's QR code is its id signed with the project secret (see
+``GET /attendance/qr/<child_id>/``), so codes cannot be guessed from ids.
+
+A batch is written with one query for the children, one for their
+existing records and at most one insert and one update. Check-in keeps the
+earliest time and check-out the latest, so a batch resent after a timeout,
+or scans arriving out of order, leave the same records.
+"""
+import hashlib
+import secrets
+
+from django.contrib.auth.models import AnonymousUser
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import exceptions, serializers
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.permissions import BasePermission
+
+from children.models import Children
+from children.signals import logs_bulk_created, logs_bulk_updated
+from .models import Attendance, KioskDevice
+
+KEYWORD = "Kiosk"
+QR_SALT = "attendance.kiosk.qr"
+MAX_BATCH = 500
+CHECK_IN = "check_in"
+CHECK_OUT = "check_out"
+
+
+def new_token():
+    return secrets.token_urlsafe(32)
+
+
+def hash_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def qr_payload(child_id):
+    return signing.Signer(salt=QR_SALT).sign(str(child_id))
+
+
+def child_id_from_qr(payload):
+    """The child id signed into ``payload``, or None if it was not issued here."""
+    try:
+        return int(signing.Signer(salt=QR_SALT).unsign(payload))
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+class KioskTokenAuthentication(BaseAuthentication):
+    """Authenticate a kiosk by its device token; ``request.auth`` is the ``KioskDevice``."""
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != KEYWORD.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed("Invalid kiosk token header.")
+
+        device = KioskDevice.objects.filter(
+            token_hash=hash_token(auth[1].decode(errors="replace")), revoked_at__isnull=True,
+        ).first()
+        if device is None:
+            raise exceptions.AuthenticationFailed("Invalid or revoked kiosk token.")
+        return AnonymousUser(), device
+
+    def authenticate_header(self, request):
+        return KEYWORD
+
+
+class IsKioskDevice(BasePermission):
+    def has_permission(self, request, view):
+        return isinstance(request.auth, KioskDevice)
+
+
+class ScanSerializer(serializers.Serializer):
+    qr = serializers.CharField(max_length=200)
+    action = serializers.ChoiceField(choices=[CHECK_IN, CHECK_OUT])
+    scanned_at = serializers.DateTimeField(required=False, help_text="When the code was scanned; defaults to now.")
+
+
+class ScanBatchSerializer(serializers.Serializer):
+    scans = ScanSerializer(many=True, allow_empty=False, max_length=MAX_BATCH)
+
+
+def record_scans(device, scans):
+    """Upsert the attendance of ``scans`` (validated ``ScanSerializer`` data); return one result per scan."""
+    now = timezone.now()
+    resolved = []
+    for scan in scans:
+        moment = timezone.localtime(scan.get("scanned_at") or now)
+        resolved.append((child_id_from_qr(scan["qr"]), scan["action"], moment.date(), moment.time().replace(microsecond=0)))
+
+    children = {
+        child.id: child
+        for child in Children.objects.filter(
+            kindergarten_id=device.kindergarten_id, id__in={child_id for child_id, *_ in resolved if child_id},
+        ).only("id", "kindergarten_id", "class_id")
+    }
+    try:
+        with transaction.atomic():
+            return _apply_scans(resolved, children, now)
+    except IntegrityError:
+        # A concurrent batch created some of the same records; update them instead.
+        with transaction.atomic():
+            return _apply_scans(resolved, children, now)
+
+
+def _apply_scans(resolved, children, now):
+    keys = {(child_id, day) for child_id, _, day, _ in resolved if child_id in children}
+    records = {
+        (record.child_id, record.date): record
+        for record in Attendance.objects.select_for_update().filter(
+            child_id__in={child_id for child_id, _ in keys}, date__in={day for _, day in keys},
+        )
+    }
+    created, changed = {}, {}
+    results = [None] * len(resolved)
+
+    # In scan order, so a check-out buffered behind its check-in finds the record.
+    for index in sorted(range(len(resolved)), key=lambda i: resolved[i][2:]):
+        child_id, action, day, at = resolved[index]
+        if child_id not in children:
+            results[index] = {"child": child_id, "action": action, "status": "rejected", "error": "Unknown QR code."}
+            continue
+
+        key = (child_id, day)
+        record = records.get(key)
+        if action == CHECK_IN:
+            if record is None:
+                record = records[key] = created[key] = Attendance(child=children[child_id], date=day, check_in_time=at)
+            elif at < record.check_in_time:
+                record.check_in_time = at
+                changed[key] = record
+        elif record is None:
+            results[index] = {"child": child_id, "action": action, "status": "rejected", "error": "Child is not checked in."}
+            continue
+        elif record.check_out_time is None or at > record.check_out_time:
+            record.check_out_time = at
+            changed[key] = record
+        results[index] = {"child": child_id, "action": action, "status": "recorded", "date": day}
+
+    if created:
+        for record in created.values():
+            record.set_derived_fields()
+        Attendance.objects.bulk_create(created.values())
+        logs_bulk_created.send(sender=Attendance, instances=list(created.values()))
+    updated = [record for key, record in changed.items() if key not in created]
+    if updated:
+        for record in updated:
+            record.updated_at = now
+        Attendance.objects.bulk_update(updated, ["check_in_time", "check_out_time", "updated_at"])
+        logs_bulk_updated.send(sender=Attendance, instances=updated)
+    return results
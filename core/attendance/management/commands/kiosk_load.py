@@ -0,0 +1,77 @@
+import time as clock
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from auth_app.models import User
+from kindergarten.models import Kindergarten, KindergartenAdmin, KindergartenClass
+from children.models import Children
+from attendance.kiosk import hash_token, new_token, qr_payload
+from attendance.models import Attendance, KioskDevice
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate a drop-off peak against the local database: check children in one POST /attendance/ "
+        "at a time, then through kiosk scan batches, and compare time and queries. Everything is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--children", type=int, default=120, help="Children checked in during the peak.")
+        parser.add_argument("--batch", type=int, default=20, help="Scans a kiosk buffers per request.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options["children"], options["batch"])
+            transaction.set_rollback(True)
+
+    def run(self, child_count, batch_size):
+        kindergarten = Kindergarten.objects.create(name="Load test", location="-")
+        kindergarten_class = KindergartenClass.objects.create(name="Load test", kindergarten=kindergarten)
+        admin = User.objects.create_user("kiosk-load-admin@example.com", "-", role="admin")
+        KindergartenAdmin.objects.create(user=admin, kindergarten=kindergarten)
+        parent = User.objects.create_user("kiosk-load-parent@example.com", "-")
+        children = Children.objects.bulk_create([
+            Children(name=f"Child {i}", date_of_birth=date(2020, 1, 1), kindergarten=kindergarten,
+                     class_id=kindergarten_class, parent=parent)
+            for i in range(child_count)
+        ])
+        token = new_token()
+        KioskDevice.objects.create(kindergarten=kindergarten, name="Load test", token_hash=hash_token(token))
+
+        client = APIClient(SERVER_NAME="localhost")
+        client.force_authenticate(admin)
+        day = timezone.localdate()
+        self.measure("one POST /attendance/ per child", child_count, [
+            lambda child=child: client.post("/attendance/", {"child": child.id, "date": day, "check_in_time": "08:00"})
+            for child in children
+        ])
+        Attendance.objects.filter(kindergarten=kindergarten).delete()
+
+        kiosk = APIClient(SERVER_NAME="localhost", HTTP_AUTHORIZATION=f"Kiosk {token}")
+        start = timezone.make_aware(datetime.combine(day, datetime.min.time()) + timedelta(hours=8))
+        scans = [
+            {"qr": qr_payload(child.id), "action": "check_in", "scanned_at": (start + timedelta(seconds=10 * i)).isoformat()}
+            for i, child in enumerate(children)
+        ]
+        self.measure(f"kiosk batches of {batch_size} scans", child_count, [
+            lambda batch=scans[i:i + batch_size]: kiosk.post("/attendance/kiosk/scans/", {"scans": batch}, format="json")
+            for i in range(0, len(scans), batch_size)
+        ])
+
+    def measure(self, label, checkins, requests):
+        with CaptureQueriesContext(connection) as queries:
+            started = clock.perf_counter()
+            for send in requests:
+                response = send()
+                if response.status_code >= 400:
+                    raise RuntimeError(f"{label}: {response.status_code} {response.content[:200]!r}")
+            elapsed = clock.perf_counter() - started
+        self.stdout.write(
+            f"{label}: {len(requests)} requests, {elapsed * 1000:.0f} ms, "
+            f"{checkins / elapsed:.0f} check-ins/s, {len(queries) / checkins:.1f} queries per check-in"
+        )
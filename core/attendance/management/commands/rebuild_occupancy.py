@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from attendance.occupancy import rebuild
+from kindergarten.models import Kindergarten
+
+
+class Command(BaseCommand):
+    help = "Rebuild today's live occupancy (children checked in and not out) from the attendance records, e.g. after a cache restart."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kindergarten", type=int, action="append", help="Only rebuild this kindergarten id (repeatable).")
+
+    def handle(self, *args, **options):
+        kindergartens = Kindergarten.objects.order_by("id").values_list("id", flat=True)
+        if options["kindergarten"]:
+            kindergartens = kindergartens.filter(id__in=options["kindergarten"])
+
+        inside = 0
+        for kindergarten_id in kindergartens:
+            inside += sum(len(child_ids) for child_ids in rebuild(kindergarten_id).values())
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt occupancy: {inside} child(ren) in the building."))
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:44
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicates(apps, schema_editor):
+    """Keep the first record of each (child, date), taking a check-out time from a later duplicate if it lacks one."""
+    Attendance = apps.get_model("attendance", "Attendance")
+    duplicated = (
+        Attendance.objects.order_by().values("child_id", "date")
+        .annotate(total=Count("id"), first_id=Min("id"))
+        .filter(total__gt=1)
+    )
+    for group in duplicated:
+        records = Attendance.objects.filter(child_id=group["child_id"], date=group["date"])
+        kept = records.get(id=group["first_id"])
+        if kept.check_out_time is None:
+            check_out = records.exclude(check_out_time=None).order_by("-check_out_time").values_list("check_out_time", flat=True).first()
+            if check_out is not None:
+                kept.check_out_time = check_out
+                kept.save(update_fields=["check_out_time"])
+        records.exclude(id=kept.id).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_alter_attendance_date'),
+        ('children', '0004_children_created_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['date', 'child'], name='attendance_date_child'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendance',
+            constraint=models.UniqueConstraint(fields=('child', 'date'), name='unique_attendance_child_date'),
+        ),
+    ]
@@ -1,12 +1,42 @@
 from django.db import models
 from datetime import date
-from children.models import Children  
+from children.models import ChildLog, Children
+from kindergarten.models import Kindergarten
 
-class Attendance(models.Model):
+class Attendance(ChildLog):
     child = models.ForeignKey(Children, on_delete=models.CASCADE, related_name="attendances")
     date = models.DateField(default=date.today) # Default to current date
     check_in_time = models.TimeField()
     check_out_time = models.TimeField(null=True, blank=True)  # Optional check-out
 
+    class Meta:
+        constraints = [
+            # One record per child per day; also serves as the (child, date) index.
+            models.UniqueConstraint(fields=["child", "date"], name="unique_attendance_child_date"),
+        ]
+        indexes = [
+            models.Index(fields=["date", "child"], name="attendance_date_child"),
+            models.Index(fields=["kindergarten", "date"], name="attendance_kg_date"),
+            models.Index(fields=["class_id", "date"], name="attendance_class_date"),
+            models.Index(fields=["kindergarten", "updated_at"], name="attendance_kg_updated"),
+        ]
+
+    def __str__(self):
+        return f"{self.child.name} - {self.date}"
+
+
+class KioskDevice(models.Model):
+    """A drop-off tablet that checks children in and out by scanning their QR codes.
+
+    It authenticates with its own token (``Authorization: Kiosk <token>``)
+    and can only record attendance in its kindergarten. Only a hash of the
+    token is stored; the token itself is shown once, when the device is added.
+    """
+    kindergarten = models.ForeignKey(Kindergarten, on_delete=models.CASCADE, related_name="kiosk_devices")
+    name = models.CharField(max_length=100)
+    token_hash = models.CharField(max_length=64, unique=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    revoked_at = models.DateTimeField(null=True, blank=True)
+
     def __str__(self):
-        return f"{self.child.name} - {self.date}"
\ No newline at end of file
+        return f"{self.kindergarten.name} - {self.name}"
@@ -0,0 +1,117 @@
+"""Who is in the building now: today's checked-in children per class, kept in the shared cache.
+
+One cache entry per kindergarten and day maps each class id (None for
+children without a class) to the ids of the children checked in and not
+yet checked out. Check-ins and check-outs update it after their
+transaction commits (see ``attendance.signals``), so reading occupancy is
+a single cache read that never touches the attendance table.
+
+A missing entry (first read of the day, eviction, a cache restart) is
+rebuilt from today's attendance rows on read, and
+``manage.py rebuild_occupancy`` rebuilds every kindergarten's entry at
+once. Edits that may move a record to another day or child drop the entry
+instead of patching it, so the next read rebuilds it.
+"""
+import time
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Attendance
+
+KEY = "attendance:occupancy:{}:{}"
+TIMEOUT = 2 * 24 * 60 * 60
+LOCK_TIMEOUT = 5
+LOCK_POLL_INTERVAL = 0.01
+OUT = object()
+
+
+def _key(kindergarten_id, day):
+    return KEY.format(kindergarten_id, day.isoformat())
+
+
+def _pack(members):
+    classes = {}
+    for child_id, class_id in members.items():
+        classes.setdefault(class_id, []).append(child_id)
+    return {class_id: sorted(child_ids) for class_id, child_ids in classes.items()}
+
+
+@contextmanager
+def _locked(key):
+    lock_key = f"{key}:lock"
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while not cache.add(lock_key, 1, timeout=LOCK_TIMEOUT):
+        if time.monotonic() > deadline:
+            yield False
+            return
+        time.sleep(LOCK_POLL_INTERVAL)
+    try:
+        yield True
+    finally:
+        cache.delete(lock_key)
+
+
+def rebuild(kindergarten_id, day=None):
+    """Recompute the entry of one kindergarten from its attendance rows; returns it."""
+    day = day or timezone.localdate()
+    key = _key(kindergarten_id, day)
+    with _locked(key) as acquired:
+        # Under the lock, so a check-in applied meanwhile is not overwritten by an older read.
+        classes = _pack(dict(
+            Attendance.objects.filter(kindergarten_id=kindergarten_id, date=day, check_out_time__isnull=True)
+            .values_list("child_id", "class_id")
+        ))
+        if acquired:
+            cache.set(key, classes, timeout=TIMEOUT)
+    return classes
+
+
+def current(kindergarten_id, day=None):
+    """``{class_id: [child ids]}`` of the children in the building."""
+    day = day or timezone.localdate()
+    classes = cache.get(_key(kindergarten_id, day))
+    if classes is None:
+        classes = rebuild(kindergarten_id, day)
+    return classes
+
+
+def apply(kindergarten_id, day, changes):
+    """Move children in (``{child_id: class_id}``) or out (``{child_id: OUT}``) of the entry."""
+    key = _key(kindergarten_id, day)
+    with _locked(key) as acquired:
+        if not acquired:
+            cache.delete(key)
+            return
+        classes = cache.get(key)
+        if classes is None:
+            # Rebuilt from the table on the next read, which already sees this write.
+            return
+        members = {child_id: class_id for class_id, child_ids in classes.items() for child_id in child_ids}
+        for child_id, class_id in changes.items():
+            if class_id is OUT:
+                members.pop(child_id, None)
+            else:
+                members[child_id] = class_id
+        cache.set(key, _pack(members), timeout=TIMEOUT)
+
+
+def record_on_commit(records, deleted=False):
+    """Apply today's ``records`` to the occupancy once the surrounding transaction commits."""
+    today = timezone.localdate()
+    by_kindergarten = {}
+    for record in records:
+        if record.date != today:
+            continue
+        inside = not deleted and record.check_out_time is None
+        by_kindergarten.setdefault(record.kindergarten_id, {})[record.child_id] = record.class_id_id if inside else OUT
+    for kindergarten_id, changes in by_kindergarten.items():
+        transaction.on_commit(lambda kindergarten_id=kindergarten_id, changes=changes: apply(kindergarten_id, today, changes))
+
+
+def forget_on_commit(kindergarten_id):
+    """Drop today's entry once the transaction commits; the next read rebuilds it."""
+    day = timezone.localdate()
+    transaction.on_commit(lambda: cache.delete(_key(kindergarten_id, day)))
@@ -46,4 +46,13 @@ class CanManageAttendance(BasePermission):
           
           return obj.child.kindergarten == user_kindergarten
 
-      return False
\ No newline at end of file
+      return False
+
+
+class CanManageKioskDevices(BasePermission):
+    """Superadmins manage every kiosk; kindergarten admins manage their kindergarten's."""
+
+    def has_permission(self, request, view):
+        if not request.user.is_authenticated:
+            return False
+        return request.user.role == "superadmin" or (request.user.role == "admin" and hasattr(request.user, "kindergarten_admin"))
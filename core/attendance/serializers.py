@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Attendance
+from .models import Attendance, KioskDevice
 
 class AttendanceSerializer(serializers.ModelSerializer):
     child_details = serializers.SerializerMethodField()
@@ -7,6 +7,16 @@ class AttendanceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Attendance
         fields = ["id", "child", "child_details", "date", "check_in_time", "check_out_time"]
+        # (child, date) uniqueness is enforced by the database constraint; see AttendanceViewSet.
+        validators = []
 
     def get_child_details(self, obj):
-        return {"id": obj.child.id, "name": obj.child.name}
\ No newline at end of file
+        return {"id": obj.child.id, "name": obj.child.name}
+
+
+class KioskDeviceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = KioskDevice
+        fields = ["id", "kindergarten", "name", "created_at", "revoked_at"]
+        read_only_fields = ["created_at", "revoked_at"]
+        extra_kwargs = {"kindergarten": {"required": False}}
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from children.signals import logs_bulk_created, logs_bulk_updated
+from . import occupancy
+from .models import Attendance
+
+
+@receiver(post_save, sender=Attendance)
+def track_occupancy(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if created or (update_fields is not None and not {"child", "child_id", "date"} & set(update_fields)):
+        occupancy.record_on_commit([instance])
+    else:
+        # A full save may have moved the record to another child or day.
+        occupancy.forget_on_commit(instance.kindergarten_id)
+
+
+@receiver(post_delete, sender=Attendance)
+def track_occupancy_delete(sender, instance, **kwargs):
+    occupancy.record_on_commit([instance], deleted=True)
+
+
+@receiver(logs_bulk_created, sender=Attendance)
+@receiver(logs_bulk_updated, sender=Attendance)
+def track_occupancy_bulk(sender, instances, **kwargs):
+    occupancy.record_on_commit(instances)
@@ -1,3 +1,160 @@
-from django.test import TestCase
+import os
+from datetime import date, time
+from unittest import mock
 
-# Create your tests here.
+from django.db import IntegrityError, transaction
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from kindergarten.models import Kindergarten
+from core.testing import KindergartenTestCase, locmem_cache
+from .kiosk import qr_payload
+from .models import Attendance
+
+
+class AttendanceUniquenessTests(KindergartenTestCase):
+    url = "/attendance/"
+
+    def setUp(self):
+        super().setUp()
+        self.child = self.add_child()
+        self.client.force_authenticate(self.add_admin())
+
+    def test_database_rejects_second_record_for_same_day(self):
+        Attendance.objects.create(child=self.child, date=date(2025, 3, 3), check_in_time=time(8, 0))
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Attendance.objects.create(child=self.child, date=date(2025, 3, 3), check_in_time=time(9, 0))
+
+    def test_duplicate_post_returns_400(self):
+        payload = {"child": self.child.id, "date": "2025-03-03", "check_in_time": "08:00"}
+
+        self.assertEqual(self.client.post(self.url, payload).status_code, 201)
+        response = self.client.post(self.url, payload)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["error"], "Attendance record already exists for this date.")
+        self.assertEqual(Attendance.objects.filter(child=self.child).count(), 1)
+
+    def test_other_integrity_errors_are_not_reported_as_duplicates(self):
+        payload = {"child": self.child.id, "date": "2025-03-03", "check_in_time": "08:00"}
+
+        with mock.patch.object(Attendance, "save", side_effect=IntegrityError("NOT NULL constraint failed")):
+            with self.assertRaises(IntegrityError):
+                self.client.post(self.url, payload)
+
+    def test_moving_record_onto_taken_day_returns_400(self):
+        Attendance.objects.create(child=self.child, date=date(2025, 3, 3), check_in_time=time(8, 0))
+        other = Attendance.objects.create(child=self.child, date=date(2025, 3, 4), check_in_time=time(8, 0))
+
+        response = self.client.patch(f"{self.url}{other.id}/", {"date": "2025-03-03"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_upsert_checks_out_existing_record(self):
+        Attendance.objects.create(child=self.child, date=date(2025, 3, 3), check_in_time=time(8, 0))
+
+        response = self.client.post(f"{self.url}upsert/", {"child": self.child.id, "date": "2025-03-03", "check_out_time": "16:30"})
+
+        self.assertEqual(response.status_code, 200)
+        record = Attendance.objects.get(child=self.child)
+        self.assertEqual((record.check_in_time, record.check_out_time), (time(8, 0), time(16, 30)))
+
+    def test_upsert_creates_missing_record(self):
+        payload = {"child": self.child.id, "date": "2025-03-03", "check_in_time": "08:00"}
+
+        self.assertEqual(self.client.post(f"{self.url}upsert/", payload).status_code, 201)
+        self.assertEqual(self.client.post(f"{self.url}upsert/", payload).status_code, 200)
+        self.assertEqual(Attendance.objects.filter(child=self.child).count(), 1)
+        response = self.client.post(f"{self.url}upsert/", {"child": self.child.id, "date": "2025-03-04", "check_out_time": "16:30"})
+        self.assertEqual(response.status_code, 400)
+
+
+class KioskTests(KindergartenTestCase):
+    url = "/attendance/kiosk/scans/"
+
+    def setUp(self):
+        super().setUp()
+        other = Kindergarten.objects.create(name="Moonlight", location="Side St")
+        self.child = self.add_child()
+        self.stranger = self.add_child("Stranger", kindergarten=other)
+
+        self.admin = self.client
+        self.admin.force_authenticate(self.add_admin())
+        response = self.admin.post("/attendance/kiosks/", {"name": "Front door"})
+        self.assertEqual(response.status_code, 201)
+        self.device_id = response.data["id"]
+        self.kiosk = APIClient()
+        self.kiosk.credentials(HTTP_AUTHORIZATION=f"Kiosk {response.data['token']}")
+
+    def scan(self, child, action, at):
+        return {"qr": qr_payload(child.id), "action": action, "scanned_at": f"2025-03-03T{at}:00"}
+
+    def post(self, *scans):
+        return self.kiosk.post(self.url, {"scans": list(scans)}, format="json")
+
+    def test_batch_checks_in_and_out_and_is_safe_to_resend(self):
+        batch = [self.scan(self.child, "check_out", "16:30"), self.scan(self.child, "check_in", "08:05")]
+
+        first = self.post(*batch)
+        self.assertEqual(self.post(self.scan(self.child, "check_in", "08:10"), *batch).status_code, 200)
+
+        self.assertEqual([row["status"] for row in first.data["results"]], ["recorded", "recorded"])
+        record = Attendance.objects.get(child=self.child)
+        self.assertEqual((record.date, record.check_in_time, record.check_out_time), (date(2025, 3, 3), time(8, 5), time(16, 30)))
+
+    def test_foreign_or_forged_codes_are_rejected(self):
+        forged = {"qr": f"{self.child.id}:forged", "action": "check_in"}
+
+        response = self.post(self.scan(self.stranger, "check_in", "08:00"), forged, self.scan(self.child, "check_out", "16:00"))
+
+        self.assertEqual([row["status"] for row in response.data["results"]], ["rejected"] * 3)
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_requires_an_active_kiosk_token(self):
+        self.assertEqual(self.admin.post(self.url, {"scans": []}, format="json").status_code, 403)
+        self.assertEqual(self.admin.delete(f"/attendance/kiosks/{self.device_id}/").status_code, 204)
+
+        self.assertEqual(self.post(self.scan(self.child, "check_in", "08:00")).status_code, 401)
+
+
+@override_settings(CACHES=locmem_cache("occupancy-tests"))
+class OccupancyTests(KindergartenTestCase):
+    url = "/attendance/occupancy/"
+
+    def setUp(self):
+        super().setUp()
+        self.bees = self.add_class("Bees")
+        self.children = self.add_children(3, self.bees)
+        self.client.force_authenticate(self.add_admin())
+
+    def upsert(self, child, **times):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/attendance/upsert/", {"child": child.id, **times})
+        self.assertIn(response.status_code, (200, 201))
+
+    def test_check_ins_and_outs_update_the_counters(self):
+        self.assertEqual(self.client.get(self.url).data["total"], 0)
+        for child in self.children:
+            self.upsert(child, check_in_time="08:00")
+        self.upsert(self.children[1], check_out_time="12:00")
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.data["total"], 2)
+        self.assertEqual(response.data["classes"], [
+            {"class_id": self.bees.id, "count": 2, "children": [self.children[0].id, self.children[2].id]},
+        ])
+
+    def test_rebuild_restores_lost_counters(self):
+        for child in self.children[:2]:
+            self.upsert(child, check_in_time="08:00")
+        cache.clear()
+
+        call_command("rebuild_occupancy", stdout=open(os.devnull, "w"))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).data["total"], 2)
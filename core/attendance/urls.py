@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AttendanceViewSet
+from .views import AttendanceViewSet, KioskDeviceViewSet, KioskScanView
 
 router = DefaultRouter()
+router.register(r'kiosks', KioskDeviceViewSet)
 router.register(r'', AttendanceViewSet)
 
 urlpatterns = [
+    path('kiosk/scans/', KioskScanView.as_view()),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,15 +1,23 @@
-from rest_framework import viewsets, status
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.views import APIView
 from datetime import date
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .models import Attendance
+from django.utils import timezone
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from .models import Attendance, KioskDevice
 from children.models import Children
-from .serializers import AttendanceSerializer
-from .permissions import CanManageAttendance
+from children.idempotency import IdempotentCreateMixin
+from . import occupancy
+from .kiosk import IsKioskDevice, KioskTokenAuthentication, ScanBatchSerializer, hash_token, new_token, qr_payload, record_scans
+from .serializers import AttendanceSerializer, KioskDeviceSerializer
+from .permissions import CanManageAttendance, CanManageKioskDevices
 
-class AttendanceViewSet(viewsets.ModelViewSet):
+class AttendanceViewSet(IdempotentCreateMixin, viewsets.ModelViewSet):
     """
     CRUD API for Attendance:
     - Superadmins & Admins have full access.
@@ -71,6 +79,59 @@ class AttendanceViewSet(viewsets.ModelViewSet):
         attendance_records = child.attendances.all().order_by("-date")
         return Response(AttendanceSerializer(attendance_records, many=True).data, status=status.HTTP_200_OK)
 
+    @swagger_auto_schema(
+        method="get",
+        operation_description="The payload to encode in the child's QR code for kiosk check-in.",
+        responses={200: openapi.Schema(type=openapi.TYPE_OBJECT, properties={
+            "child": openapi.Schema(type=openapi.TYPE_INTEGER),
+            "qr": openapi.Schema(type=openapi.TYPE_STRING),
+        })},
+    )
+    @action(detail=False, methods=["get"], url_path="qr/(?P<child_id>[^/.]+)")
+    def qr_code(self, request, child_id=None):
+        child = get_object_or_404(Children, id=child_id)
+        permission_error = self.validate_permission(request, child)
+        if permission_error:
+            return permission_error
+        return Response({"child": child.id, "qr": qr_payload(child.id)}, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        method="get",
+        operation_description=(
+            "Children checked in and not yet checked out today, per class. Read from live counters, not the "
+            "attendance table. Superadmins pass kindergarten_id; teachers see their classes."
+        ),
+        manual_parameters=[openapi.Parameter("kindergarten_id", openapi.IN_QUERY, type=openapi.TYPE_INTEGER)],
+    )
+    @action(detail=False, methods=["get"], url_path="occupancy")
+    def occupancy(self, request):
+        user = request.user
+        class_ids = None
+        if user.role == "superadmin":
+            try:
+                kindergarten_id = int(request.query_params["kindergarten_id"])
+            except (KeyError, ValueError):
+                return Response({"error": "kindergarten_id is required."}, status=status.HTTP_400_BAD_REQUEST)
+        elif user.role == "admin" and hasattr(user, "kindergarten_admin"):
+            kindergarten_id = user.kindergarten_admin.kindergarten_id
+        elif user.role == "teacher" and hasattr(user, "teacher_profile"):
+            kindergarten_id = user.teacher_profile.kindergarten_id
+            class_ids = set(user.teacher_profile.teacher_classes.values_list("class_id", flat=True))
+        else:
+            return Response({"error": "Permission denied."}, status=status.HTTP_403_FORBIDDEN)
+
+        classes = [
+            {"class_id": class_id, "count": len(child_ids), "children": child_ids}
+            for class_id, child_ids in sorted(occupancy.current(kindergarten_id).items(), key=lambda item: (item[0] is None, item[0] or 0))
+            if class_ids is None or class_id in class_ids
+        ]
+        return Response({
+            "date": timezone.localdate(),
+            "kindergarten_id": kindergarten_id,
+            "total": sum(row["count"] for row in classes),
+            "classes": classes,
+        }, status=status.HTTP_200_OK)
+
     def create(self, request, *args, **kwargs):
         """Ensure only superadmins or kindergarten admins can create an attendance record."""
         child_id = request.data.get("child")
@@ -81,7 +142,141 @@ class AttendanceViewSet(viewsets.ModelViewSet):
         if request.user.role == "parent":
           return Response({"error": "Parents cannot create attendance records."}, status=status.HTTP_403_FORBIDDEN)
 
-        if Attendance.objects.filter(child_id=child_id, date=request.data.get("date",str(date.today()))).exists():
+        return self.save_unique(super().create, request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        return self.save_unique(super().update, request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        method="post",
+        operation_description=(
+            "Create or update a child's attendance for a day (default: today), e.g. to check out. "
+            "Only the times sent are written; check_in_time is required when there is no record yet. "
+            "Safe to retry."
+        ),
+        request_body=AttendanceSerializer,
+        responses={200: AttendanceSerializer, 201: AttendanceSerializer},
+    )
+    @action(detail=False, methods=["post"], url_path="upsert")
+    def upsert(self, request):
+        """Write the (child, date) record in place, creating it if needed."""
+        serializer = AttendanceSerializer(data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        child = data.get("child")
+        if child is None:
+            return Response({"error": "child is required."}, status=status.HTTP_400_BAD_REQUEST)
+        permission_error = self.validate_permission(request, child)
+        if permission_error:
+            return permission_error
+
+        day = data.get("date") or date.today()
+        times = {field: data[field] for field in ("check_in_time", "check_out_time") if field in data}
+        records = Attendance.objects.select_for_update().select_related("child").filter(child=child, date=day)
+        with transaction.atomic():
+            record = records.first()
+            if record is None and "check_in_time" in times:
+                try:
+                    with transaction.atomic():
+                        record = Attendance.objects.create(child=child, date=day, **times)
+                    return Response(AttendanceSerializer(record).data, status=status.HTTP_201_CREATED)
+                except IntegrityError:
+                    # Created by a concurrent request; update that one instead.
+                    record = records.first()
+            if record is None:
+                return Response({"error": "check_in_time is required to create an attendance record."}, status=status.HTTP_400_BAD_REQUEST)
+
+            if times:
+                for field, value in times.items():
+                    setattr(record, field, value)
+                record.save(update_fields=list(times))
+        return Response(AttendanceSerializer(record).data, status=status.HTTP_200_OK)
+
+    def perform_create(self, serializer):
+        self.saving = serializer
+        serializer.save()
+
+    def perform_update(self, serializer):
+        self.saving = serializer
+        serializer.save()
+
+    def save_unique(self, save, request, *args, **kwargs):
+        """Run ``save``, turning a (child, date) unique-constraint violation into a 400.
+
+        Other integrity errors (foreign keys, NOT NULL) are raised as they are.
+        """
+        self.saving = None
+        try:
+            with transaction.atomic():
+                return save(request, *args, **kwargs)
+        except IntegrityError:
+            if not self.day_taken(self.saving):
+                raise
             return Response({"error": "Attendance record already exists for this date."}, status=status.HTTP_400_BAD_REQUEST)
-        
-        return super().create(request, *args, **kwargs)
\ No newline at end of file
+
+    def day_taken(self, serializer):
+        """Whether another record holds the (child, date) that ``serializer`` failed to save."""
+        if serializer is None:
+            return False
+        instance = serializer.instance
+        child = serializer.validated_data.get("child", getattr(instance, "child", None))
+        day = serializer.validated_data.get("date", getattr(instance, "date", None)) or Attendance._meta.get_field("date").get_default()
+        return Attendance.objects.filter(child=child, date=day).exclude(pk=getattr(instance, "pk", None)).exists()
+
+
+class KioskDeviceViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Drop-off kiosks of a kindergarten, managed by its admins:
+    - Creating a device returns its token, once.
+    - Deleting a device revokes its token.
+    """
+    queryset = KioskDevice.objects.all()
+    serializer_class = KioskDeviceSerializer
+    permission_classes = [IsAuthenticated, CanManageKioskDevices]
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.role == "superadmin":
+            return KioskDevice.objects.all()
+        return KioskDevice.objects.filter(kindergarten=user.kindergarten_admin.kindergarten)
+
+    @swagger_auto_schema(
+        operation_description="Add a kiosk and return its token, which is not shown again. Admins add kiosks to their own kindergarten.",
+        responses={201: openapi.Schema(type=openapi.TYPE_OBJECT, properties={"token": openapi.Schema(type=openapi.TYPE_STRING)})},
+    )
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if request.user.role == "superadmin":
+            kindergarten = serializer.validated_data.get("kindergarten")
+            if kindergarten is None:
+                return Response({"error": "kindergarten is required."}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            kindergarten = request.user.kindergarten_admin.kindergarten
+
+        token = new_token()
+        device = serializer.save(kindergarten=kindergarten, token_hash=hash_token(token))
+        return Response({**self.get_serializer(device).data, "token": token}, status=status.HTTP_201_CREATED)
+
+    def perform_destroy(self, instance):
+        instance.revoked_at = timezone.now()
+        instance.save(update_fields=["revoked_at"])
+
+
+class KioskScanView(APIView):
+    """Check children in and out from a batch of QR scans sent by a kiosk."""
+    authentication_classes = [KioskTokenAuthentication]
+    permission_classes = [IsKioskDevice]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Record a batch of buffered QR scans (Authorization: Kiosk <token>). Check-in keeps the earliest "
+            "time of the day and check-out the latest, so resending a batch is safe. Returns one result per scan; "
+            "scans of unknown codes, or check-outs without a check-in, are rejected individually."
+        ),
+        request_body=ScanBatchSerializer,
+    )
+    def post(self, request):
+        serializer = ScanBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({"results": record_scans(request.auth, serializer.validated_data["scans"])}, status=status.HTTP_200_OK)
@@ -0,0 +1,123 @@
+"""Class-wide logging: one request writes a daily-log row for every child of a class.
+
+``POST /<logs>/bulk/`` takes::
+
+    {"class_id": 3, "defaults": {...}, "overrides": [{"child": 12, ...}], "exclude": [14]}
+
+Every child of the class except those in ``exclude`` gets ``defaults``
+merged with its override. Access to the children is checked with one scoped
+query, the rows are validated with the endpoint's own serializer and written
+with one ``bulk_create``.
+"""
+from functools import cache
+
+from django.db import transaction
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .idempotency import idempotent
+from .models import Children
+from .signals import logs_bulk_created
+
+BULK_REQUEST = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    required=["class_id"],
+    properties={
+        "class_id": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "defaults": openapi.Schema(type=openapi.TYPE_OBJECT, description="Fields applied to every child, e.g. date and title."),
+        "overrides": openapi.Schema(
+            type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT),
+            description='Per-child fields, each with "child": <id>.',
+        ),
+        "exclude": openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER), description="Child ids to skip."),
+    },
+)
+
+
+class PreloadedChildField(serializers.PrimaryKeyRelatedField):
+    """Resolve ``child`` from the children loaded for the request instead of one query per row."""
+
+    def to_internal_value(self, data):
+        try:
+            return self.context["children"][int(data)]
+        except (KeyError, TypeError, ValueError):
+            self.fail("does_not_exist", pk_value=data)
+
+
+@cache
+def row_serializer(serializer_class):
+    return type(f"Bulk{serializer_class.__name__}", (serializer_class,), {
+        "child": PreloadedChildField(queryset=Children.objects.none()),
+    })
+
+
+def class_children(user, class_id):
+    """``{id: child}`` for the class, limited to the user's kindergarten; None if the user cannot log."""
+    children = Children.objects.filter(class_id=class_id)
+    if user.role == "superadmin" or user.is_superuser:
+        pass
+    elif user.role == "admin" and hasattr(user, "kindergarten_admin"):
+        children = children.filter(kindergarten_id=user.kindergarten_admin.kindergarten_id)
+    elif user.role == "teacher" and hasattr(user, "teacher_profile"):
+        children = children.filter(kindergarten_id=user.teacher_profile.kindergarten_id)
+    else:
+        return None
+    return {child.id: child for child in children.only("id", "kindergarten_id", "class_id").order_by("id")}
+
+
+class ClassBulkCreateMixin:
+    """Adds ``POST bulk/`` to a daily-log viewset."""
+
+    @swagger_auto_schema(
+        method="post",
+        operation_description=(
+            "Log the same entry for every child of a class, with per-child overrides. "
+            "Accepts an Idempotency-Key header."
+        ),
+        request_body=BULK_REQUEST,
+    )
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        return idempotent(request, self.create_for_class)
+
+    def create_for_class(self, request):
+        payload = request.data
+        try:
+            class_id = int(payload["class_id"])
+            defaults = dict(payload.get("defaults") or {})
+            overrides = {int(row["child"]): row for row in payload.get("overrides") or []}
+            exclude = {int(child_id) for child_id in payload.get("exclude") or []}
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return Response(
+                {"error": "Expected class_id, and optionally defaults (object), overrides (objects with child) and exclude (child ids)."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        children = class_children(request.user, class_id)
+        if children is None:
+            return Response({"error": "Permission denied."}, status=status.HTTP_403_FORBIDDEN)
+        if not children:
+            return Response({"error": "No children found in this class."}, status=status.HTTP_404_NOT_FOUND)
+        unknown = sorted(set(overrides) - set(children))
+        if unknown:
+            return Response({"error": f"Children not in this class: {unknown}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = [
+            {**defaults, **overrides.get(child_id, {}), "child": child_id}
+            for child_id in children if child_id not in exclude
+        ]
+        context = {**self.get_serializer_context(), "children": children}
+        serializer = row_serializer(self.get_serializer_class())(data=rows, many=True, context=context)
+        serializer.is_valid(raise_exception=True)
+
+        model = self.get_serializer_class().Meta.model
+        instances = [model(**attrs) for attrs in serializer.validated_data]
+        for instance in instances:
+            instance.set_derived_fields()
+        with transaction.atomic():
+            model.objects.bulk_create(instances, batch_size=500)
+            logs_bulk_created.send(sender=model, instances=instances)
+        return Response(self.get_serializer(instances, many=True).data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,86 @@
+"""``Idempotency-Key`` support for the daily-log create endpoints.
+
+A client on a flaky connection sends the same key (any string up to 64
+characters, typically a UUID it generated) with every retry of one POST.
+The first request stores its response under ``(user, key)``; retries get
+that response back from a single indexed lookup and create nothing.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 64
+
+
+def request_fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.method} {request.path}\n{body}".encode()).hexdigest()
+
+
+def replay(record, fingerprint):
+    if record.fingerprint != fingerprint:
+        return Response(
+            {"error": f"{HEADER} was already used for a different request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(record.response, status=record.status_code, headers={"Idempotent-Replayed": "true"})
+
+
+def idempotent(request, handler, *args, **kwargs):
+    """Call ``handler(request, *args, **kwargs)`` once per ``Idempotency-Key``; replay its response on retries.
+
+    Only successful responses are stored; a failed request can be retried
+    with the same key. The key row is inserted before the handler runs, in
+    the same transaction, so a concurrent retry waits on the unique index
+    and then replays instead of writing a second time.
+    """
+    key = request.headers.get(HEADER)
+    if not key:
+        return handler(request, *args, **kwargs)
+    if len(key) > MAX_KEY_LENGTH:
+        return Response({"error": f"{HEADER} must be at most {MAX_KEY_LENGTH} characters."}, status=status.HTTP_400_BAD_REQUEST)
+
+    fingerprint = request_fingerprint(request)
+    now = timezone.now()
+    stored = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+    if stored and stored.expires_at > now:
+        return replay(stored, fingerprint)
+
+    with transaction.atomic():
+        if stored:
+            stored.delete()
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=request.user, key=key, fingerprint=fingerprint,
+                    expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+                )
+        except IntegrityError:
+            # A concurrent request with this key committed first.
+            return replay(IdempotencyKey.objects.get(user=request.user, key=key), fingerprint)
+
+        response = handler(request, *args, **kwargs)
+        if not status.is_success(response.status_code):
+            transaction.set_rollback(True)
+            return response
+
+        record.status_code = response.status_code
+        record.response = response.data
+        record.save(update_fields=["status_code", "response"])
+    return response
+
+
+class IdempotentCreateMixin:
+    """Make ``create`` replay the stored response when the request repeats an ``Idempotency-Key``."""
+
+    def create(self, request, *args, **kwargs):
+        return idempotent(request, super().create, *args, **kwargs)
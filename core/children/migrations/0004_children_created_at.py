@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('children', '0003_children_bio_alter_children_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='children',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, null=True),
+        ),
+    ]
@@ -1,8 +1,29 @@
 
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from auth_app.models import User
 from kindergarten.models import Kindergarten, KindergartenClass
 
+class ChildrenQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Children the user may see, resolved as joins rather than extra queries.
+
+        - Superadmins: all children.
+        - Admins: children in the kindergarten they administer.
+        - Teachers: children in their assigned classes.
+        - Parents: their own children.
+        """
+        if user.role == "superadmin" or user.is_superuser:
+            return self
+        if user.role == "admin":
+            return self.filter(kindergarten__admin_user__user=user)
+        if user.role == "teacher":
+            return self.filter(class_id__kindergarten_class__teacher__user=user)
+        if user.role == "parent":
+            return self.filter(parent=user)
+        return self.none()
+
+
 class Children(models.Model):
     name = models.CharField(max_length=250)
     bio = models.CharField(max_length=500,null=True,)
@@ -11,6 +32,61 @@ class Children(models.Model):
     class_id = models.ForeignKey(KindergartenClass, on_delete=models.SET_NULL, null=True, blank=True)
     parent = models.ForeignKey(User, on_delete=models.CASCADE, related_name="children")
     profile_picture = models.TextField( null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, null=True)
+
+    objects = ChildrenQuerySet.as_manager()
+
+    def __str__(self):
+        return self.name
+
+class ChildLog(models.Model):
+    """Base for the per-child daily logs (attendance, meals, naps, hygiene, moods).
+
+    ``kindergarten`` and ``class_id`` copy the child's, so scoped list and
+    aggregate queries stay on the log table. They are set whenever the row
+    is saved and follow the child when it moves (see ``analytics.signals``).
+    ``updated_at`` drives ``/sync/``. The composite indexes leading with
+    these columns live on each model.
+    """
+    kindergarten = models.ForeignKey(Kindergarten, on_delete=models.CASCADE, editable=False, related_name="+", db_index=False)
+    class_id = models.ForeignKey(
+        KindergartenClass, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name="+", db_index=False,
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+    def set_derived_fields(self):
+        """Fill the fields computed on save; call it before ``bulk_create``, which skips ``save()``."""
+        self.kindergarten_id = self.child.kindergarten_id
+        self.class_id_id = self.child.class_id_id
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = kwargs["update_fields"] = {*update_fields, "updated_at"}
+        if update_fields is None or "child" in update_fields or "child_id" in update_fields:
+            self.set_derived_fields()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "kindergarten", "class_id"}
+        super().save(*args, **kwargs)
+
+
+class IdempotencyKey(models.Model):
+    """Stored response of a log-create request, replayed when the client retries with the same key."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    key = models.CharField(max_length=64)
+    # SHA-256 of the method, path and body, so a reused key with a different request is refused.
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="unique_idempotency_user_key"),
+        ]
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return f"{self.user_id}:{self.key}"
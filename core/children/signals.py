@@ -0,0 +1,9 @@
+from django.dispatch import Signal
+
+# Sent with ``sender`` (the log model) and ``instances`` after daily-log rows
+# are written with ``bulk_create``, which does not send ``post_save``.
+logs_bulk_created = Signal()
+
+# Sent with ``sender`` and ``instances`` after rows are changed with
+# ``bulk_update``, which does not send ``post_save`` either.
+logs_bulk_updated = Signal()
@@ -1,3 +1,243 @@
-from django.test import TestCase
+from datetime import date, datetime, time
 
-# Create your tests here.
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from auth_app.models import User
+from kindergarten import board
+from kindergarten.models import Kindergarten
+from attendance.models import Attendance
+from meals.models import Meal, MealOverride, MenuPlan
+from naps.models import Nap
+from hygiene.models import Hygiene
+from mood.models import ChildMood
+from activities.models import Activity
+from analytics import bitmaps
+from analytics.cache import scope_version
+from analytics.counters import Entity, compute_counters, stored_counters
+from analytics.models import AttendanceBitmap
+from core.testing import KindergartenTestCase, locmem_cache
+from .signals import logs_bulk_created
+
+
+class ChildLogScopeTests(KindergartenTestCase):
+    def setUp(self):
+        super().setUp()
+        self.kindergarten_class = self.add_class("Bees")
+        self.child = self.add_child(kindergarten_class=self.kindergarten_class)
+
+    def test_logs_copy_the_childs_kindergarten_and_class(self):
+        meal = Meal.objects.create(child=self.child, meal_title="Soup")
+
+        self.assertEqual(meal.kindergarten_id, self.kindergarten.id)
+        self.assertEqual(meal.class_id_id, self.kindergarten_class.id)
+
+    def test_logs_follow_the_child_when_it_moves(self):
+        Attendance.objects.create(child=self.child, date=date(2025, 3, 3), check_in_time=time(8, 0))
+        Meal.objects.create(child=self.child, meal_title="Soup")
+        other = Kindergarten.objects.create(name="Rainbow", location="High St")
+
+        self.child.kindergarten = other
+        self.child.class_id = None
+        self.child.save()
+
+        for model in (Attendance, Meal):
+            self.assertEqual(list(model.objects.values_list("kindergarten_id", "class_id")), [(other.id, None)])
+
+
+class IdempotencyKeyTests(KindergartenTestCase):
+    url = "/meals/"
+
+    def setUp(self):
+        super().setUp()
+        self.child = self.add_child()
+        self.client.force_authenticate(self.add_admin())
+        self.payload = {"child": self.child.id, "meal_title": "Soup", "date": "2025-03-03"}
+
+    def post(self, payload, key="3f1c9a"):
+        return self.client.post(self.url, payload, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_first_response(self):
+        first = self.post(self.payload)
+        with self.assertNumQueries(1):
+            retry = self.post(self.payload)
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Meal.objects.count(), 1)
+
+    def test_key_reused_for_other_request_is_refused(self):
+        self.post(self.payload)
+
+        response = self.post({**self.payload, "meal_title": "Pasta"})
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Meal.objects.count(), 1)
+
+    def test_failed_request_does_not_keep_the_key(self):
+        self.assertEqual(self.post({"child": self.child.id}).status_code, 400)
+
+        self.assertEqual(self.post(self.payload).status_code, 201)
+
+
+class ClassBulkCreateTests(KindergartenTestCase):
+    def setUp(self):
+        super().setUp()
+        self.kindergarten_class = self.add_class("Bees")
+        self.client.force_authenticate(self.add_admin())
+
+    def add_children(self, count):
+        return super().add_children(count, self.kindergarten_class)
+
+    def test_logs_every_child_with_overrides(self):
+        first, second, absent = self.add_children(3)
+
+        response = self.client.post("/meals/bulk/", {
+            "class_id": self.kindergarten_class.id,
+            "defaults": {"meal_title": "Lunch", "date": "2025-03-03"},
+            "overrides": [{"child": second.id, "appetite_level": "low"}],
+            "exclude": [absent.id],
+        }, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        meals = {meal.child_id: meal for meal in Meal.objects.all()}
+        self.assertEqual(set(meals), {first.id, second.id})
+        self.assertEqual(meals[second.id].appetite_level, "low")
+        self.assertEqual(meals[first.id].kindergarten_id, self.kindergarten.id)
+        self.assertIsNotNone(meals[first.id].intake_time)
+
+    def test_query_count_does_not_grow_with_class_size(self):
+        payload = {"class_id": self.kindergarten_class.id, "defaults": {"sleep_from": "12:30", "sleep_to": "14:00"}}
+        self.add_children(2)
+        self.client.post("/naps/bulk/", payload, format="json")  # Creates the naps counter row.
+        # Children, savepoint, insert, counter update, release.
+        with self.assertNumQueries(5):
+            self.client.post("/naps/bulk/", payload, format="json")
+
+        self.add_children(20)
+        with self.assertNumQueries(5):
+            response = self.client.post("/naps/bulk/", payload, format="json")
+
+        self.assertEqual(len(response.data), 22)
+        self.assertEqual(Nap.objects.filter(duration_minutes=90).count(), 26)
+
+    def test_invalid_row_writes_nothing(self):
+        self.add_children(2)
+
+        response = self.client.post("/meals/bulk/", {"class_id": self.kindergarten_class.id, "defaults": {}}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Meal.objects.exists())
+
+    def test_bulk_matches_the_per_row_path_in_fewer_queries(self):
+        children = self.add_children(20)
+        nap = {"sleep_from": "12:30", "sleep_to": "14:00"}
+        self.client.post("/naps/bulk/", {"class_id": self.kindergarten_class.id, "defaults": {**nap, "date": "2025-03-02"}}, format="json")
+
+        with CaptureQueriesContext(connection) as per_row:
+            for child in children:
+                self.client.post("/naps/", {**nap, "child": child.id, "date": "2025-03-03"}, format="json")
+        with CaptureQueriesContext(connection) as bulk:
+            self.client.post("/naps/bulk/", {"class_id": self.kindergarten_class.id, "defaults": {**nap, "date": "2025-03-04"}}, format="json")
+
+        fields = ("child_id", "kindergarten_id", "class_id_id", "sleep_from", "sleep_to", "duration_minutes")
+        by_day = {
+            day: sorted(Nap.objects.filter(date=day).values_list(*fields))
+            for day in (date(2025, 3, 3), date(2025, 3, 4))
+        }
+        self.assertEqual(len(by_day[date(2025, 3, 3)]), 20)
+        self.assertEqual(by_day[date(2025, 3, 3)], by_day[date(2025, 3, 4)])
+        self.assertLess(len(bulk) * 10, len(per_row))
+        self.assertEqual(stored_counters(self.kindergarten.id), compute_counters(self.kindergarten.id))
+
+    def test_bulk_rows_are_counted(self):
+        self.add_children(3)
+        Meal.objects.create(child=self.add_child(), meal_title="Snack")
+
+        self.client.post("/meals/bulk/", {
+            "class_id": self.kindergarten_class.id, "defaults": {"meal_title": "Lunch", "date": "2025-03-03"},
+        }, format="json")
+
+        self.assertEqual(stored_counters(self.kindergarten.id)[self.kindergarten.id][Entity.MEALS], 4)
+        self.assertEqual(stored_counters(self.kindergarten.id), compute_counters(self.kindergarten.id))
+
+    @override_settings(CACHES=locmem_cache("class-bulk-create-tests"))
+    def test_bulk_rows_invalidate_caches_once_committed(self):
+        self.add_children(2)
+        analytics_version = scope_version([self.kindergarten.id])
+        board_versions = {day: board._versions(self.kindergarten_class.id, day) for day in (date(2025, 3, 3), date(2025, 3, 4))}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/naps/bulk/", {
+                "class_id": self.kindergarten_class.id, "defaults": {"date": "2025-03-03", "sleep_from": "12:30", "sleep_to": "14:00"},
+            }, format="json")
+            self.assertEqual(scope_version([self.kindergarten.id]), analytics_version)
+
+        self.assertNotEqual(scope_version([self.kindergarten.id]), analytics_version)
+        self.assertNotEqual(board._versions(self.kindergarten_class.id, date(2025, 3, 3)), board_versions[date(2025, 3, 3)])
+        self.assertEqual(board._versions(self.kindergarten_class.id, date(2025, 3, 4)), board_versions[date(2025, 3, 4)])
+
+    def test_bulk_attendance_marks_bitmaps(self):
+        children = self.add_children(3)
+        records = [Attendance(child=child, date=date(2025, 3, 3), check_in_time=time(8, 0)) for child in children[:2]]
+        for record in records:
+            record.set_derived_fields()
+        Attendance.objects.bulk_create(records)
+
+        logs_bulk_created.send(sender=Attendance, instances=records)
+
+        marked = {(bitmap.child_id, bytes(bitmap.bits)) for bitmap in AttendanceBitmap.objects.all()}
+        bitmaps.rebuild(2025)
+        self.assertEqual(marked, {(bitmap.child_id, bytes(bitmap.bits)) for bitmap in AttendanceBitmap.objects.all()})
+        self.assertEqual({child_id for child_id, _ in marked}, {children[0].id, children[1].id})
+        self.assertEqual(stored_counters(self.kindergarten.id)[self.kindergarten.id][Entity.ATTENDANCE], 2)
+
+
+class ChildTimelineTests(KindergartenTestCase):
+    def setUp(self):
+        super().setUp()
+        bees = self.add_class("Bees")
+        self.child = self.add_child(kindergarten_class=bees)
+        self.other = self.add_child("Other", bees, User.objects.create_user("other@example.com", "pass"))
+        day = date(2025, 3, 3)
+        Attendance.objects.create(child=self.child, date=day, check_in_time=time(8, 0), check_out_time=time(16, 0))
+        Meal.objects.create(child=self.child, date=day, meal_title="Porridge", intake_time=time(9, 0))
+        plan = MenuPlan.objects.create(class_id=bees, date=day, meal_title="Soup", intake_time=time(12, 0))
+        MealOverride.objects.create(plan=plan, child=self.other, skipped=True)
+        Nap.objects.create(child=self.child, date=day, sleep_from=time(13, 0), sleep_to=time(14, 0))
+        Hygiene.objects.create(child=self.child, date=day, activity="Hand washing", hygiene_activity_time=time(11, 55))
+        ChildMood.objects.create(child=self.child, date=day, mood=ChildMood.MoodChoices.HAPPY)
+        Activity.objects.create(name="Painting", class_id=bees, time=timezone.make_aware(datetime(2025, 3, 3, 10, 0))).children.add(self.child)
+        Meal.objects.create(child=self.child, date=date(2025, 3, 12), meal_title="Pasta", intake_time=time(12, 0))
+        self.client.force_authenticate(self.parent)
+
+    def test_day_is_one_ordered_feed(self):
+        with self.assertNumQueries(9):
+            response = self.client.get(f"/children/{self.child.id}/timeline/", {"date": "2025-03-03"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(event["type"], event["time"] and event["time"].strftime("%H:%M")) for event in response.data["events"]],
+            [("mood", None), ("check_in", "08:00"), ("meal", "09:00"), ("activity", "10:00"), ("hygiene", "11:55"),
+             ("meal", "12:00"), ("nap", "13:00"), ("check_out", "16:00")],
+        )
+        self.assertIsNone(response.data["next_cursor"])
+
+    def test_ranges_are_paged_by_day(self):
+        url = f"/children/{self.child.id}/timeline/"
+        first = self.client.get(url, {"start_date": "2025-03-01", "end_date": "2025-03-14"}).data
+        second = self.client.get(url, {"start_date": "2025-03-01", "end_date": "2025-03-14", "cursor": first["next_cursor"]}).data
+
+        self.assertEqual(first["next_cursor"], date(2025, 3, 8))
+        self.assertEqual(len(first["events"]), 8)
+        self.assertEqual([event["data"]["meal_title"] for event in second["events"]], ["Pasta"])
+        self.assertIsNone(second["next_cursor"])
+
+    def test_other_childs_timeline_is_not_found(self):
+        response = self.client.get(f"/children/{self.other.id}/timeline/")
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,84 @@
+"""A child's day as one feed: attendance, meals, naps, hygiene, moods and activities.
+
+``GET /children/<id>/timeline/`` reads each source with one query for the
+requested days (meals add the class menu plans and their overrides) and
+merges the rows in memory into events ordered by date and time. Each event
+carries the row as its own endpoint renders it, so the app can reuse its
+existing models::
+
+    {"type": "meal", "date": "2025-03-03", "time": "12:00:00", "data": {...}}
+
+Events without a time of day (moods) open their day. Multi-day ranges are
+paged by day: a page covers up to ``PAGE_DAYS`` days and ``next_cursor``
+is the first day of the next page.
+"""
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+from attendance.models import Attendance
+from attendance.serializers import AttendanceSerializer
+from meals.models import Meal, MenuPlan
+from meals.plans import planned_meals
+from meals.serializers import MealSerializer
+from naps.models import Nap
+from naps.serializers import NapSerializer
+from hygiene.models import Hygiene
+from hygiene.serializers import HygieneSerializer
+from mood.models import ChildMood
+from mood.serializers import ChildMoodSerializer
+from activities.models import Activity
+from activities.serializers import ActivitySerializer
+
+PAGE_DAYS = 7
+MAX_DAYS = 92
+
+# Order of simultaneous events.
+TYPES = ("mood", "check_in", "meal", "nap", "hygiene", "activity", "check_out")
+
+
+class TimelineActivitySerializer(ActivitySerializer):
+    """An activity without its participant list, which would cost a query per activity."""
+
+    class Meta(ActivitySerializer.Meta):
+        exclude = ["updated_at", "children"]
+        ref_name = "TimelineActivity"
+
+
+def _event(kind, day, at, data):
+    return {"type": kind, "date": day, "time": at, "data": data}
+
+
+def events(child, start_date, end_date):
+    """The events of ``child`` from ``start_date`` to ``end_date`` inclusive, in order."""
+    days = {"child": child, "date__range": (start_date, end_date)}
+    feed = []
+
+    for record in Attendance.objects.filter(**days):
+        record.child = child
+        data = AttendanceSerializer(record).data
+        feed.append(_event("check_in", record.date, record.check_in_time, data))
+        if record.check_out_time:
+            feed.append(_event("check_out", record.date, record.check_out_time, data))
+
+    # The rosters, not the child's current class, say which plans were theirs.
+    plans = MenuPlan.objects.filter(kindergarten_id=child.kindergarten_id, date__range=(start_date, end_date))
+    for meal in [*Meal.objects.filter(**days), *planned_meals(plans, [child])]:
+        feed.append(_event("meal", meal.date, meal.intake_time, MealSerializer(meal).data))
+    for nap in Nap.objects.filter(**days):
+        feed.append(_event("nap", nap.date, nap.sleep_from, NapSerializer(nap).data))
+    for record in Hygiene.objects.filter(**days):
+        feed.append(_event("hygiene", record.date, record.hygiene_activity_time, HygieneSerializer(record).data))
+    for mood in ChildMood.objects.filter(**days):
+        feed.append(_event("mood", mood.date, None, ChildMoodSerializer(mood).data))
+
+    start = timezone.make_aware(datetime.combine(start_date, time.min))
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+    for activity in Activity.objects.filter(children=child, time__gte=start, time__lt=end):
+        moment = timezone.localtime(activity.time) if timezone.is_aware(activity.time) else activity.time
+        feed.append(_event("activity", moment.date(), moment.time(), TimelineActivitySerializer(activity).data))
+
+    feed.sort(key=lambda event: (
+        event["date"], event["time"] is not None, event["time"] or time.min, TYPES.index(event["type"]), event["data"].get("id") or 0,
+    ))
+    return feed
@@ -2,9 +2,16 @@
 
 
 from rest_framework import viewsets, status,permissions,views
+from datetime import date, timedelta
+
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from . import timeline
 from .models import Children
 from kindergarten.models import KindergartenClass
 from .serializers import ChildrenSerializer,KindergartenClassSerializer
@@ -61,4 +68,44 @@ class ChildrenViewSet(viewsets.ModelViewSet):
         """Custom delete response message."""
         instance = self.get_object()
         self.perform_destroy(instance)
-        return Response({"message": "Child deleted successfully"}, status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        return Response({"message": "Child deleted successfully"}, status=status.HTTP_204_NO_CONTENT)
+
+    @swagger_auto_schema(
+        method="get",
+        operation_description=(
+            "The child's day as one feed of check-in/out, meals, naps, hygiene, moods and activities, ordered by time. "
+            "Pass date (default today), or start_date and end_date for a range; ranges are paged by day with cursor."
+        ),
+        manual_parameters=[
+            openapi.Parameter("date", openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+            openapi.Parameter("start_date", openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+            openapi.Parameter("end_date", openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+            openapi.Parameter("cursor", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="next_cursor of the previous page"),
+        ],
+    )
+    @action(detail=True, methods=["get"], url_path="timeline")
+    def timeline(self, request, pk=None):
+        params = request.query_params
+        try:
+            start_date = date.fromisoformat(params.get("start_date") or params.get("date") or timezone.localdate().isoformat())
+            end_date = date.fromisoformat(params["end_date"]) if params.get("end_date") else start_date
+            page_start = date.fromisoformat(params["cursor"]) if params.get("cursor") else start_date
+        except ValueError:
+            return Response({"error": "Dates and cursor must be YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+        if not start_date <= page_start <= end_date:
+            return Response({"error": "Provide start_date <= end_date and a cursor within them."}, status=status.HTTP_400_BAD_REQUEST)
+        if (end_date - start_date).days >= timeline.MAX_DAYS:
+            return Response({"error": f"The range can span at most {timeline.MAX_DAYS} days."}, status=status.HTTP_400_BAD_REQUEST)
+
+        child = Children.objects.visible_to(request.user).filter(pk=pk).only("id", "name", "kindergarten_id", "class_id").first()
+        if child is None:
+            return Response({"error": "Child not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        page_end = min(end_date, page_start + timedelta(days=timeline.PAGE_DAYS - 1))
+        return Response({
+            "child": child.id,
+            "start_date": page_start,
+            "end_date": page_end,
+            "events": timeline.events(child, page_start, page_end),
+            "next_cursor": page_end + timedelta(days=1) if page_end < end_date else None,
+        })
@@ -76,6 +76,7 @@ INSTALLED_APPS = [
     "notifications",
     "audit",
     "settings_app",
+    "sync",
     'drf_yasg',
     'django_extensions',
 ]
@@ -134,6 +135,29 @@ DATABASES = {
 #     }
 # }
 
+# Shared across Gunicorn workers; create the table with `manage.py createcachetable`.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+        },
+    }
+}
+
+# Seconds a finished /analytics/reports/ result stays downloadable.
+REPORT_RESULT_TTL = env.int('REPORT_RESULT_TTL', default=24 * 60 * 60)
+
+# Seconds an Idempotency-Key on a daily-log create is remembered.
+IDEMPOTENCY_KEY_TTL = env.int('IDEMPOTENCY_KEY_TTL', default=24 * 60 * 60)
+
+# Days deletions are kept for /sync/; older cursors must start a full sync.
+SYNC_TOMBSTONE_DAYS = env.int('SYNC_TOMBSTONE_DAYS', default=30)
+
+# Seconds each /sync/ run re-reads before the previous one's end; must exceed the longest write transaction.
+SYNC_RESCAN_SECONDS = env.int('SYNC_RESCAN_SECONDS', default=60)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -0,0 +1,59 @@
+"""Shared base for the apps' API tests: a kindergarten, a parent and an API client.
+
+The shared cache is a no-op in these tests, so cached aggregates never leak
+from one test into the next. Tests of the caching itself override ``CACHES``
+with ``locmem_cache``.
+"""
+from datetime import date
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from auth_app.models import User
+from children.models import Children
+from kindergarten.models import Kindergarten, KindergartenAdmin, KindergartenClass, Teacher, TeacherClass
+
+DUMMY_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+def locmem_cache(location):
+    return {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": location}}
+
+
+@override_settings(CACHES=DUMMY_CACHE)
+class KindergartenTestCase(TestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        cache.clear()
+        self.kindergarten = Kindergarten.objects.create(name="Sunshine", location="Main St")
+        self.parent = User.objects.create_user("parent@example.com", "pass")
+
+    def add_class(self, name, kindergarten=None):
+        return KindergartenClass.objects.create(name=name, kindergarten=kindergarten or self.kindergarten)
+
+    def add_admin(self, email="admin@example.com", kindergarten=None):
+        user = User.objects.create_user(email, "pass", role="admin")
+        KindergartenAdmin.objects.create(user=user, kindergarten=kindergarten or self.kindergarten)
+        return user
+
+    def add_teacher(self, *classes, email="teacher@example.com", kindergarten=None):
+        """A teacher user of the kindergarten, assigned to ``classes``."""
+        user = User.objects.create_user(email, "pass", role="teacher")
+        teacher = Teacher.objects.create(user=user, kindergarten=kindergarten or self.kindergarten)
+        for kindergarten_class in classes:
+            TeacherClass.objects.create(teacher=teacher, class_id=kindergarten_class)
+        return user
+
+    def add_child(self, name="Child", kindergarten_class=None, parent=None, kindergarten=None):
+        """A child of ``parent`` (default: ``self.parent``) in ``kindergarten_class``, or in no class of ``kindergarten``."""
+        if kindergarten is None:
+            kindergarten = kindergarten_class.kindergarten if kindergarten_class else self.kindergarten
+        return Children.objects.create(
+            name=name, date_of_birth=date(2020, 1, 1), kindergarten=kindergarten,
+            class_id=kindergarten_class, parent=parent or self.parent,
+        )
+
+    def add_children(self, count, kindergarten_class=None, parent=None):
+        return [self.add_child(f"Child {index:02}", kindergarten_class, parent) for index in range(count)]
@@ -19,6 +19,7 @@ from django.urls import path,include
 from .swagger import schema_view 
 from django.conf import settings
 from django.conf.urls.static import static
+from sync.views import BootstrapView
 
 
 urlpatterns = [
@@ -38,6 +39,8 @@ urlpatterns = [
     path('attendance/', include('attendance.urls')),
     path('superadmin/', include('audit.urls')),
     path('system/', include('settings_app.urls')),
+    path('sync/', include('sync.urls')),
+    path('bootstrap/', BootstrapView.as_view(), name='bootstrap'),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0),
          name='schema-swagger-ui'),
 ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_scope(apps, schema_editor):
+    Hygiene = apps.get_model("hygiene", "Hygiene")
+    Children = apps.get_model("children", "Children")
+    child = Children.objects.filter(pk=OuterRef("child_id"))
+    Hygiene.objects.update(
+        kindergarten_id=Subquery(child.values("kindergarten_id")[:1]),
+        class_id_id=Subquery(child.values("class_id_id")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('children', '0004_children_created_at'),
+        ('hygiene', '0002_daily_log_indexes'),
+        ('kindergarten', '0010_section_kindergartenclass_section'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hygiene',
+            name='class_id',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='kindergarten.kindergartenclass'),
+        ),
+        migrations.AddField(
+            model_name='hygiene',
+            name='kindergarten',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='kindergarten.kindergarten'),
+        ),
+        migrations.RunPython(backfill_scope, migrations.RunPython.noop),
+    ]
@@ -1,18 +1,27 @@
 from django.db import models
-from children.models import Children
+from children.models import ChildLog, Children
 from datetime import date, datetime
 
 
-class Hygiene(models.Model):
+class Hygiene(ChildLog):
     child = models.ForeignKey(Children, on_delete=models.CASCADE, related_name="hygiene_records")
     activity = models.CharField(max_length=50) 
     date = models.DateField(default=date.today) 
     hygiene_activity_time = models.TimeField(null=True, blank=True)
 
-    def save(self, *args, **kwargs):
+    class Meta:
+        indexes = [
+            models.Index(fields=["child", "date"], name="hygiene_child_date"),
+            models.Index(fields=["date", "child"], name="hygiene_date_child"),
+            models.Index(fields=["kindergarten", "date"], name="hygiene_kg_date"),
+            models.Index(fields=["class_id", "date"], name="hygiene_class_date"),
+            models.Index(fields=["kindergarten", "updated_at"], name="hygiene_kg_updated"),
+        ]
+
+    def set_derived_fields(self):
+        super().set_derived_fields()
         if not self.hygiene_activity_time:
-            self.hygiene_activity_time = datetime.now().time()  
-        super().save(*args, **kwargs)
+            self.hygiene_activity_time = datetime.now().time()
 
     def __str__(self):
         return f"{self.child.name} - {self.activity} ({self.date})"
\ No newline at end of file
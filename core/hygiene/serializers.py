@@ -4,7 +4,7 @@ from .models import Hygiene
 class HygieneSerializer(serializers.ModelSerializer):
     class Meta:
         model = Hygiene
-        fields = "__all__"
+        exclude = ["kindergarten", "class_id", "updated_at"]
 
     def validate(self, data):
         child = data.get("child")
@@ -10,9 +10,11 @@ from hygiene.models import Hygiene
 from hygiene.serializers import HygieneSerializer
 from hygiene.permissions import CanManageHygieneActivities
 from children.models import Children
+from children.bulk import ClassBulkCreateMixin
+from children.idempotency import IdempotentCreateMixin
 
 
-class HygieneViewSet(ModelViewSet):
+class HygieneViewSet(IdempotentCreateMixin, ClassBulkCreateMixin, ModelViewSet):
     queryset = Hygiene.objects.all()
     serializer_class = HygieneSerializer
     permission_classes = [IsAuthenticated, CanManageHygieneActivities]
@@ -77,11 +79,11 @@ class HygieneViewSet(ModelViewSet):
         queryset = Hygiene.objects.all()
 
         if user.role == "admin" and hasattr(user, "kindergarten_admin"):
-            queryset = queryset.filter(child__kindergarten=user.kindergarten_admin.kindergarten)
+            queryset = queryset.filter(kindergarten=user.kindergarten_admin.kindergarten)
 
         elif user.role == "teacher" and hasattr(user, "teacher_profile"):
             teacher_classes = user.teacher_profile.teacher_classes.values_list("class_id", flat=True)
-            queryset = queryset.filter(child__class_id__in=teacher_classes)
+            queryset = queryset.filter(class_id__in=teacher_classes)
 
         elif user.role == "parent":
             queryset = queryset.filter(child__parent=user)
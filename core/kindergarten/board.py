@@ -0,0 +1,117 @@
+"""A class's day at a glance: every child with their attendance, meals, naps, hygiene and moods.
+
+``GET /kindergarten/classes/<id>/board/?date=`` reads the class's children
+and then each log table once for the class and day (meals add the menu
+plans and their overrides), and groups the rows by child in memory, so the
+board costs the same few queries for 5 children or 50.
+
+Boards are cached per class and day under two version tokens, one for the
+class and one for the day. Log writes bump the day's token once their
+transaction commits, and an edit that moves a row also bumps the token of
+its old class and day (see ``kindergarten.signals``); roster changes
+(children joining or leaving the class) bump the class token. A board
+computed while a write commits is stored under the old token and never
+read again.
+"""
+import datetime
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from attendance.models import Attendance
+from children.models import Children
+from hygiene.models import Hygiene
+from hygiene.serializers import HygieneSerializer
+from meals.models import Meal, MenuPlan
+from meals.plans import planned_meals
+from meals.serializers import MealSerializer
+from mood.models import ChildMood
+from mood.serializers import ChildMoodSerializer
+from naps.models import Nap
+from naps.serializers import NapSerializer
+
+KEY = "kindergarten:board:{}:{}:{}"
+CLASS_VERSION_KEY = "kindergarten:board:version:{}"
+DAY_VERSION_KEY = "kindergarten:board:version:{}:{}"
+TIMEOUT = 24 * 60 * 60
+
+ABSENT = "absent"
+PRESENT = "present"
+CHECKED_OUT = "checked_out"
+
+
+def _versions(class_id, day):
+    keys = [CLASS_VERSION_KEY.format(class_id), DAY_VERSION_KEY.format(class_id, day.isoformat())]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # A fresh token, never 0: an evicted version must not readdress old boards.
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key, 0)
+    return ".".join(str(versions[key]) for key in keys)
+
+
+def _attendance(record):
+    if record is None:
+        return {"state": ABSENT, "check_in_time": None, "check_out_time": None}
+    return {
+        "state": CHECKED_OUT if record.check_out_time else PRESENT,
+        "check_in_time": record.check_in_time,
+        "check_out_time": record.check_out_time,
+    }
+
+
+def build(kindergarten_class, day):
+    """The board of ``kindergarten_class`` on ``day``, read from the database."""
+    children = list(Children.objects.filter(class_id=kindergarten_class).order_by("name", "id").only("id", "name", "profile_picture", "class_id"))
+    logs = {"class_id": kindergarten_class, "date": day}
+
+    attendance = {record.child_id: record for record in Attendance.objects.filter(**logs)}
+    grouped = {child.id: {"meals": [], "naps": [], "hygiene": [], "moods": []} for child in children}
+
+    def collect(name, rows, serializer):
+        for row in rows:
+            if row.child_id in grouped:
+                grouped[row.child_id][name].append(serializer(row).data)
+
+    plans = MenuPlan.objects.filter(class_id=kindergarten_class, date=day)
+    meals = [*Meal.objects.filter(**logs), *planned_meals(plans, children)]
+    meals.sort(key=lambda meal: (meal.intake_time is None, meal.intake_time or datetime.time.min, meal.id < 0, abs(meal.id)))
+    collect("meals", meals, MealSerializer)
+    collect("naps", Nap.objects.filter(**logs).order_by("sleep_from", "id"), NapSerializer)
+    collect("hygiene", Hygiene.objects.filter(**logs).order_by("hygiene_activity_time", "id"), HygieneSerializer)
+    collect("moods", ChildMood.objects.filter(**logs).order_by("id"), ChildMoodSerializer)
+
+    return {
+        "class": {"id": kindergarten_class.id, "name": kindergarten_class.name},
+        "date": day,
+        "children": [
+            {
+                "id": child.id,
+                "name": child.name,
+                "profile_picture": child.profile_picture,
+                "attendance": _attendance(attendance.get(child.id)),
+                **grouped[child.id],
+            }
+            for child in children
+        ],
+    }
+
+
+def board(kindergarten_class, day):
+    """The board of ``kindergarten_class`` on ``day``, from the cache when it is current."""
+    key = KEY.format(kindergarten_class.id, day.isoformat(), _versions(kindergarten_class.id, day))
+    value = cache.get(key)
+    if value is None:
+        value = build(kindergarten_class, day)
+        cache.set(key, value, timeout=TIMEOUT)
+    return value
+
+
+def forget_on_commit(class_id, day=None):
+    """Retire the cached board of ``class_id`` on ``day`` (every day when None) once the transaction commits."""
+    if class_id is None:
+        return
+    key = CLASS_VERSION_KEY.format(class_id) if day is None else DAY_VERSION_KEY.format(class_id, day.isoformat())
+    transaction.on_commit(lambda: cache.set(key, time.time_ns(), timeout=None))
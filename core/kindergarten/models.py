@@ -28,11 +28,25 @@ class Section(models.Model):
         return f"{self.name} ({self.kindergarten.name})"
 
 
+class KindergartenClassQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Classes the user may see as staff: all for superadmins, their kindergarten's for admins, assigned ones for teachers."""
+        if user.role == "superadmin" or user.is_superuser:
+            return self
+        if user.role == "admin":
+            return self.filter(kindergarten__admin_user__user=user)
+        if user.role == "teacher":
+            return self.filter(kindergarten_class__teacher__user=user)
+        return self.none()
+
+
 class KindergartenClass(models.Model):
     name = models.CharField(max_length=255)
     kindergarten = models.ForeignKey(Kindergarten, on_delete=models.CASCADE, related_name="classes")
     section = models.ForeignKey(Section, null=True, blank=True, on_delete=models.SET_NULL, related_name='classes')
 
+    objects = KindergartenClassQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name} - {self.kindergarten.name}"
 
@@ -0,0 +1,73 @@
+from datetime import date, datetime
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from attendance.models import Attendance
+from children.models import Children
+from children.signals import logs_bulk_created, logs_bulk_updated
+from hygiene.models import Hygiene
+from meals.models import Meal, MealOverride, MenuPlan
+from mood.models import ChildMood
+from naps.models import Nap
+from . import board
+
+# Rows shown on the class board; each has ``class_id`` and ``date``.
+BOARD_MODELS = [Attendance, Meal, MenuPlan, MealOverride, Nap, Hygiene, ChildMood]
+
+
+def _day(value):
+    # A mood's date defaults to ``timezone.now``, a datetime, until it is reloaded.
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def remember_board_row(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Snapshot the stored class and day, so a full save that moves the row also retires its old board."""
+    instance._board_previous = None
+    if not raw and instance.pk and update_fields is None:
+        instance._board_previous = sender.objects.filter(pk=instance.pk).values_list("class_id", "date").first()
+
+
+def forget_board(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    board.forget_on_commit(instance.class_id_id, _day(instance.date))
+    previous = getattr(instance, "_board_previous", None) if kwargs["signal"] is post_save and not created else None
+    if previous and previous != (instance.class_id_id, _day(instance.date)):
+        board.forget_on_commit(previous[0], _day(previous[1]))
+
+
+for model in BOARD_MODELS:
+    pre_save.connect(remember_board_row, sender=model, dispatch_uid=f"board_presave_{model._meta.label_lower}")
+    post_save.connect(forget_board, sender=model, dispatch_uid=f"board_saved_{model._meta.label_lower}")
+    post_delete.connect(forget_board, sender=model, dispatch_uid=f"board_deleted_{model._meta.label_lower}")
+
+
+@receiver(logs_bulk_created)
+@receiver(logs_bulk_updated)
+def forget_bulk_boards(sender, instances, **kwargs):
+    for class_id, day in {(instance.class_id_id, _day(instance.date)) for instance in instances}:
+        board.forget_on_commit(class_id, day)
+
+
+@receiver(pre_save, sender=Children)
+def remember_board_class(sender, instance, raw=False, **kwargs):
+    instance._board_previous_class_id = None
+    if not raw and instance.pk:
+        instance._board_previous_class_id = Children.objects.filter(pk=instance.pk).values_list("class_id", flat=True).first()
+
+
+@receiver(post_save, sender=Children)
+@receiver(post_delete, sender=Children)
+def forget_roster_boards(sender, instance, raw=False, **kwargs):
+    """A child joined, left or changed: every board of its class (and its previous one) is stale."""
+    if raw:
+        return
+    board.forget_on_commit(instance.class_id_id)
+    previous = getattr(instance, "_board_previous_class_id", None)
+    if previous != instance.class_id_id:
+        board.forget_on_commit(previous)
@@ -1,3 +1,90 @@
-from django.test import TestCase
+from datetime import date, time
 
-# Create your tests here.
+from django.test import override_settings
+
+from attendance.models import Attendance
+from core.testing import KindergartenTestCase, locmem_cache
+from meals.models import MealOverride, MenuPlan
+from naps.models import Nap
+
+DAY = date(2025, 3, 3)
+
+
+@override_settings(CACHES=locmem_cache("class-board-tests"))
+class ClassBoardTests(KindergartenTestCase):
+    def setUp(self):
+        super().setUp()
+        self.bees, self.ants = self.add_class("Bees"), self.add_class("Ants")
+        self.children = self.add_children(20, self.bees)
+        self.client.force_authenticate(self.add_teacher(self.bees))
+
+    def get_board(self, day=DAY):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(f"/kindergarten/classes/{self.bees.id}/board/", {"date": day.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_board_groups_each_log_table_read_once(self):
+        first, second = self.children[0], self.children[1]
+        Attendance.objects.create(child=first, date=DAY, check_in_time=time(8, 0))
+        Attendance.objects.create(child=second, date=DAY, check_in_time=time(8, 5), check_out_time=time(12, 0))
+        plan = MenuPlan.objects.create(class_id=self.bees, date=DAY, meal_title="Soup", intake_time=time(12, 0))
+        MealOverride.objects.create(plan=plan, child=second, skipped=True)
+        Nap.objects.create(child=first, date=DAY, sleep_from=time(13, 0), sleep_to=time(14, 0))
+
+        with self.assertNumQueries(9):
+            board = self.get_board()
+
+        rows = {row["id"]: row for row in board["children"]}
+        self.assertEqual(len(rows), 20)
+        self.assertEqual(rows[first.id]["attendance"]["state"], "present")
+        self.assertEqual(rows[second.id]["attendance"]["state"], "checked_out")
+        self.assertEqual(rows[self.children[2].id]["attendance"]["state"], "absent")
+        self.assertEqual([meal["meal_title"] for meal in rows[first.id]["meals"]], ["Soup"])
+        self.assertEqual(rows[second.id]["meals"], [])
+        self.assertEqual(len(rows[first.id]["naps"]), 1)
+
+        # Served from the cache: only the access check reads the database.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_board(), board)
+
+    def test_writes_invalidate_only_their_day(self):
+        other_day = date(2025, 3, 4)
+        self.get_board()
+        self.get_board(other_day)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Nap.objects.create(child=self.children[0], date=DAY, sleep_from=time(13, 0), sleep_to=time(14, 0))
+
+        self.assertEqual(len(self.get_board()["children"][0]["naps"]), 1)
+        with self.assertNumQueries(1):
+            self.get_board(other_day)
+
+    def test_roster_changes_invalidate_every_day(self):
+        self.get_board()
+        moved = self.children[0]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            moved.class_id = self.ants
+            moved.save()
+
+        self.assertNotIn(moved.id, [row["id"] for row in self.get_board()["children"]])
+
+    def test_moved_rows_leave_their_old_board(self):
+        Attendance.objects.create(child=self.children[0], date=DAY, check_in_time=time(8, 0))
+        plan = MenuPlan.objects.create(class_id=self.bees, date=DAY, meal_title="Soup", intake_time=time(12, 0))
+        self.assertEqual(len(self.get_board()["children"][0]["meals"]), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            plan.class_id = self.ants
+            plan.save()
+
+        self.assertEqual(self.get_board()["children"][0]["meals"], [])
+
+    def test_parents_and_other_classes_are_not_found(self):
+        response = self.client.get(f"/kindergarten/classes/{self.ants.id}/board/")
+        self.assertEqual(response.status_code, 404)
+
+        self.client.force_authenticate(self.parent)
+        response = self.client.get(f"/kindergarten/classes/{self.bees.id}/board/")
+        self.assertEqual(response.status_code, 404)
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import KindergartenViewSet, AttachAdminView, DetachAdminView, ClassView, ClassDetailView, TeacherClassViewSet, TeacherViewSet, SectionViewSet
+from .views import KindergartenViewSet, AttachAdminView, DetachAdminView, ClassView, ClassDetailView, ClassBoardView, TeacherClassViewSet, TeacherViewSet, SectionViewSet
 
 router = DefaultRouter()
 router.register(r'kindergarten', KindergartenViewSet, basename='kindergarten')
@@ -13,5 +13,6 @@ urlpatterns = [
     path('kindergarten/detach-admin/', DetachAdminView.as_view(), name='detach_admin'),
     path('kindergarten/classes/', ClassView.as_view(), name='classes'),
     path('kindergarten/classes/<int:pk>/', ClassDetailView.as_view(), name='class-detail'),
+    path('kindergarten/classes/<int:pk>/board/', ClassBoardView.as_view(), name='class-board'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -9,6 +9,9 @@ from django.db import transaction
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from datetime import date
+from . import board
 from .models import KindergartenAdmin, Kindergarten, TeacherClass, KindergartenClass, Teacher, Section
 from .serializers import KindergartenSerializer, AttachAdminSerializer, DetachAdminSerializer, TeacherClassSerializer, ClassSerializer, TeacherSerializer, SectionSerializer
 from .permissions import KindergartenPermission,IsSuperAdmin
@@ -169,6 +172,30 @@ class ClassDetailView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class ClassBoardView(APIView):
+    """
+    A class's day at a glance: each child with attendance state, meals, naps, hygiene and moods.
+    - Staff who can see the class (superadmins, its kindergarten's admins, its teachers).
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter("date", openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE, description="Day to show (default today)"),
+        ],
+    )
+    def get(self, request, pk):
+        try:
+            day = date.fromisoformat(request.query_params["date"]) if request.query_params.get("date") else timezone.localdate()
+        except ValueError:
+            return Response({"error": "date must be YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+
+        kindergarten_class = KindergartenClass.objects.visible_to(request.user).filter(pk=pk).only("id", "name").first()
+        if kindergarten_class is None:
+            return Response({"error": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(board.board(kindergarten_class, day))
+
+
 class TeacherViewSet(viewsets.ModelViewSet):
     """
     API endpoints to manage teachers.
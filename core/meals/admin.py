@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Meal
+from .models import Meal, MealOverride, MenuPlan
 
 # Register your models here.
-admin.site.register(Meal)
\ No newline at end of file
+admin.site.register(Meal)
+admin.site.register(MenuPlan)
+admin.site.register(MealOverride)
\ No newline at end of file
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('children', '0005_idempotencykey'),
+        ('kindergarten', '0010_section_kindergartenclass_section'),
+        ('meals', '0005_child_scope_required'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meal',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='meal',
+            index=models.Index(fields=['kindergarten', 'updated_at'], name='meal_kg_updated'),
+        ),
+    ]
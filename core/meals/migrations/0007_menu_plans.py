@@ -0,0 +1,68 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:59
+
+import datetime
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('children', '0005_idempotencykey'),
+        ('kindergarten', '0010_section_kindergartenclass_section'),
+        ('meals', '0006_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MenuPlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(default=datetime.date.today)),
+                ('meal_title', models.CharField(max_length=150)),
+                ('meal_description', models.TextField(blank=True, null=True)),
+                ('intake_time', models.TimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('class_id', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='menu_plans', to='kindergarten.kindergartenclass')),
+                ('kindergarten', models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='kindergarten.kindergarten')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MealOverride',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('date', models.DateField(editable=False)),
+                ('appetite_level', models.CharField(blank=True, choices=[('low', 'Low Appetite'), ('normal', 'Normal Appetite'), ('high', 'High Appetite')], max_length=10, null=True)),
+                ('skipped', models.BooleanField(default=False, help_text='The child did not eat this meal.')),
+                ('child', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='meal_overrides', to='children.children')),
+                ('class_id', models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='kindergarten.kindergartenclass')),
+                ('kindergarten', models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='kindergarten.kindergarten')),
+                ('plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='overrides', to='meals.menuplan')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='menuplan',
+            index=models.Index(fields=['class_id', 'date'], name='menu_plan_class_date'),
+        ),
+        migrations.AddIndex(
+            model_name='menuplan',
+            index=models.Index(fields=['kindergarten', 'date'], name='menu_plan_kg_date'),
+        ),
+        migrations.AddIndex(
+            model_name='menuplan',
+            index=models.Index(fields=['kindergarten', 'updated_at'], name='menu_plan_kg_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='mealoverride',
+            index=models.Index(fields=['kindergarten', 'date'], name='meal_override_kg_date'),
+        ),
+        migrations.AddIndex(
+            model_name='mealoverride',
+            index=models.Index(fields=['kindergarten', 'updated_at'], name='meal_override_kg_updated'),
+        ),
+        migrations.AddConstraint(
+            model_name='mealoverride',
+            constraint=models.UniqueConstraint(fields=('plan', 'child'), name='unique_meal_override_plan_child'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+def fill_rosters(apps, schema_editor):
+    """Existing plans get the class's current children, the best record there is."""
+    MenuPlan = apps.get_model("meals", "MenuPlan")
+    Children = apps.get_model("children", "Children")
+    for plan in MenuPlan.objects.all():
+        plan.roster = list(Children.objects.filter(class_id=plan.class_id_id).order_by("id").values_list("id", flat=True))
+        plan.save(update_fields=["roster"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('children', '0005_idempotencykey'),
+        ('meals', '0007_menu_plans'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menuplan',
+            name='roster',
+            field=models.JSONField(default=list, editable=False, help_text="Ids of the class's children when the plan was written."),
+        ),
+        migrations.RunPython(fill_rosters, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,10 @@
 from django.db import models
-from children.models import Children
+from django.utils import timezone
+from children.models import ChildLog, Children
+from kindergarten.models import Kindergarten, KindergartenClass
 from datetime import date, datetime
 
-class Meal(models.Model):
+class Meal(ChildLog):
     class AppetiteLevel(models.TextChoices):
         LOW = "low", "Low Appetite"
         NORMAL = "normal", "Normal Appetite"
@@ -19,10 +21,87 @@ class Meal(models.Model):
         default=AppetiteLevel.NORMAL  # Default to "Normal Appetite"
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["child", "date"], name="meal_child_date"),
+            models.Index(fields=["date", "child"], name="meal_date_child"),
+            models.Index(fields=["kindergarten", "date"], name="meal_kg_date"),
+            models.Index(fields=["class_id", "date"], name="meal_class_date"),
+            models.Index(fields=["kindergarten", "updated_at"], name="meal_kg_updated"),
+        ]
+
+    def set_derived_fields(self):
+        super().set_derived_fields()
+        if not self.intake_time:
+            self.intake_time = datetime.now().time()
+
+    def __str__(self):
+        return f"{self.child.name} - {self.date} - {self.meal_title} ({self.get_appetite_level_display()})"
+
+
+class MenuPlan(models.Model):
+    """A meal served to a whole class on a date, stored once instead of once per child.
+
+    ``roster`` fixes the class's children when the plan is written (or moved
+    to another class), so later roster changes leave past meals alone. They
+    eat it as planned unless they have a ``MealOverride``; ``meals.plans``
+    resolves both into the per-child meals that ``/meals/`` returns.
+    """
+    kindergarten = models.ForeignKey(Kindergarten, on_delete=models.CASCADE, editable=False, related_name="+", db_index=False)
+    class_id = models.ForeignKey(KindergartenClass, on_delete=models.CASCADE, related_name="menu_plans", db_index=False)
+    date = models.DateField(default=date.today)
+    meal_title = models.CharField(max_length=150)
+    meal_description = models.TextField(null=True, blank=True)
+    intake_time = models.TimeField(null=True, blank=True)
+    roster = models.JSONField(default=list, editable=False, help_text="Ids of the class's children when the plan was written.")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["class_id", "date"], name="menu_plan_class_date"),
+            models.Index(fields=["kindergarten", "date"], name="menu_plan_kg_date"),
+            models.Index(fields=["kindergarten", "updated_at"], name="menu_plan_kg_updated"),
+        ]
+
     def save(self, *args, **kwargs):
+        self.kindergarten_id = self.class_id.kindergarten_id
+        moved = bool(self.pk) and not MenuPlan.objects.filter(pk=self.pk, class_id=self.class_id_id).exists()
+        if not self.pk or moved:
+            self.roster = list(Children.objects.filter(class_id=self.class_id_id).order_by("id").values_list("id", flat=True))
         if not self.intake_time:
-            self.intake_time = datetime.now().time()  
+            self.intake_time = datetime.now().time()
         super().save(*args, **kwargs)
+        if moved:
+            # Overrides of children who are not on the new roster no longer apply.
+            self.overrides.exclude(child_id__in=self.roster).delete()
+        # Overrides copy the plan's date; keep them on it when the plan moves.
+        self.overrides.exclude(date=self.date).update(date=self.date, updated_at=timezone.now())
+
+    def __str__(self):
+        return f"{self.class_id.name} - {self.date} - {self.meal_title}"
+
+
+class MealOverride(ChildLog):
+    """How one child's meal differed from its class ``MenuPlan``; children who ate as planned have none."""
+    plan = models.ForeignKey(MenuPlan, on_delete=models.CASCADE, related_name="overrides")
+    child = models.ForeignKey(Children, on_delete=models.CASCADE, related_name="meal_overrides")
+    # Copied from the plan so per-child date queries stay on this table.
+    date = models.DateField(editable=False)
+    appetite_level = models.CharField(max_length=10, choices=Meal.AppetiteLevel.choices, null=True, blank=True)
+    skipped = models.BooleanField(default=False, help_text="The child did not eat this meal.")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["plan", "child"], name="unique_meal_override_plan_child"),
+        ]
+        indexes = [
+            models.Index(fields=["kindergarten", "date"], name="meal_override_kg_date"),
+            models.Index(fields=["kindergarten", "updated_at"], name="meal_override_kg_updated"),
+        ]
+
+    def set_derived_fields(self):
+        super().set_derived_fields()
+        self.date = self.plan.date
 
     def __str__(self):
-        return f"{self.child.name} - {self.date} - {self.meal_title} ({self.get_appetite_level_display()})"
\ No newline at end of file
+        return f"{self.child.name} - {self.plan}"
@@ -45,4 +45,26 @@ class CanManageMeals(BasePermission):
                 teacher_classes = user.teacher_profile.teacher_classes.all()
                 return any(tc.class_id == obj.child.class_id for tc in teacher_classes)
 
-        return False
\ No newline at end of file
+        return False
+
+
+class CanManageMenuPlans(CanManageMeals):
+    """Same rules as ``CanManageMeals``, applied to the plan's class instead of a child."""
+
+    def has_object_permission(self, request, view, obj):
+        user = request.user
+
+        if user.role == "superadmin":
+            return True
+
+        if user.role == "parent":
+            return request.method in SAFE_METHODS and user.children.filter(class_id=obj.class_id_id).exists()
+
+        if user.role == "admin":
+            return hasattr(user, "kindergarten_admin") and obj.kindergarten_id == user.kindergarten_admin.kindergarten_id
+
+        if user.role == "teacher":
+            if hasattr(user, "teacher_profile"):
+                return user.teacher_profile.teacher_classes.filter(class_id=obj.class_id_id).exists()
+
+        return False
@@ -0,0 +1,78 @@
+"""Per-child meals resolved from class menu plans.
+
+A ``MenuPlan`` is one row per class meal and a ``MealOverride`` exists only
+for a child whose meal differed. Reads merge the two into unsaved ``Meal``
+instances, so ``MealSerializer`` renders them exactly like stored meals.
+A plan applies to the children on its roster (the class when the plan was
+written); children with a skipped override did not eat and get no meal.
+
+Resolved meals have no row, so they get a negative id that encodes the plan
+and the child (see ``planned_meal_id``); ``/meals/{id}/`` resolves it back.
+"""
+from collections import Counter
+
+from .models import Meal, MealOverride
+
+# Child ids get the low bits of a planned meal's id; the plan id the rest.
+# Ids stay below 2**53, so JavaScript clients read them exactly.
+CHILD_ID_BITS = 24
+
+
+def planned_meal_id(plan_id, child_id):
+    return -((plan_id << CHILD_ID_BITS) | child_id)
+
+
+def split_planned_meal_id(meal_id):
+    """Return ``(plan_id, child_id)`` for a planned meal's id, or None for any other id."""
+    if meal_id >= 0:
+        return None
+    meal_id = -meal_id
+    return meal_id >> CHILD_ID_BITS, meal_id & ((1 << CHILD_ID_BITS) - 1)
+
+
+def resolve(plans, children=None):
+    """Yield ``(plan, child_id, appetite_level)`` per plan in ``plans`` and child who ate it.
+
+    ``children`` limits the meals to a list of already loaded children.
+    Costs two queries however many children and plans there are: the plans
+    and their overrides.
+    """
+    plans = list(plans.order_by("date", "intake_time", "id"))
+    if not plans:
+        return
+
+    overrides = MealOverride.objects.filter(plan__in=plans)
+    child_ids = None
+    if children is not None:
+        child_ids = {child.id for child in children}
+        overrides = overrides.filter(child_id__in=child_ids)
+    overrides = {
+        (plan_id, child_id): (appetite_level, skipped)
+        for plan_id, child_id, appetite_level, skipped in overrides.values_list("plan_id", "child_id", "appetite_level", "skipped")
+    }
+    for plan in plans:
+        for child_id in sorted(plan.roster if child_ids is None else child_ids.intersection(plan.roster)):
+            appetite_level, skipped = overrides.get((plan.id, child_id), (None, False))
+            if not skipped:
+                yield plan, child_id, appetite_level or Meal.AppetiteLevel.NORMAL
+
+
+def planned_meals(plans, children=None):
+    """Yield an unsaved ``Meal``, with its planned meal id, per plan in ``plans`` and child who ate it."""
+    for plan, child_id, appetite_level in resolve(plans, children):
+        yield Meal(
+            id=planned_meal_id(plan.id, child_id),
+            child_id=child_id,
+            kindergarten_id=plan.kindergarten_id,
+            class_id_id=plan.class_id_id,
+            date=plan.date,
+            meal_title=plan.meal_title,
+            meal_description=plan.meal_description,
+            intake_time=plan.intake_time,
+            appetite_level=appetite_level,
+        )
+
+
+def planned_meal_counts(plans, key, children=None):
+    """Count the meals ``plans`` resolve to, grouped by ``key(plan, child_id)``."""
+    return Counter(key(plan, child_id) for plan, child_id, _ in resolve(plans, children))
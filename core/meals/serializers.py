@@ -1,10 +1,10 @@
 from rest_framework import serializers
-from .models import Meal
+from .models import Meal, MealOverride, MenuPlan
 
 class MealSerializer(serializers.ModelSerializer):
     class Meta:
         model = Meal
-        fields = "__all__"
+        exclude = ["kindergarten", "class_id", "updated_at"]
 
     def validate(self, data):
         child = data.get("child")  # Use .get() to avoid KeyError
@@ -12,4 +12,22 @@ class MealSerializer(serializers.ModelSerializer):
         if not child:
             raise serializers.ValidationError({"child": "This field is required."})
 
-        return data
\ No newline at end of file
+        return data
+
+
+class MealOverrideSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MealOverride
+        exclude = ["kindergarten", "class_id", "updated_at"]
+        read_only_fields = ["plan", "date"]
+        # One override per plan and child; set_override replaces the existing one.
+        validators = []
+
+
+class MenuPlanSerializer(serializers.ModelSerializer):
+    overrides = MealOverrideSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = MenuPlan
+        exclude = ["kindergarten", "updated_at"]
+
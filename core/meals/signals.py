@@ -0,0 +1,20 @@
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from children.models import Children
+from kindergarten.models import Kindergarten
+from .models import MenuPlan
+
+
+@receiver(pre_delete, sender=Children)
+def drop_from_rosters(sender, instance, origin=None, **kwargs):
+    """Take a deleted child off its kindergarten's plan rosters, so no meal resolves for it.
+
+    A whole kindergarten being deleted takes its plans with it.
+    """
+    if isinstance(origin, Kindergarten):
+        return
+    for plan in MenuPlan.objects.filter(kindergarten_id=instance.kindergarten_id).select_related("class_id"):
+        if instance.id in plan.roster:
+            plan.roster.remove(instance.id)
+            plan.save(update_fields=["roster", "updated_at"])
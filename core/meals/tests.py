@@ -1,3 +1,122 @@
-from django.test import TestCase
+from datetime import date, time
 
-# Create your tests here.
+from auth_app.models import User
+from kindergarten.models import Kindergarten
+from analytics import counters, rollups
+from analytics.models import KindergartenCounter
+from analytics.views import progress_for_children
+from core.testing import KindergartenTestCase
+from .models import Meal, MealOverride, MenuPlan
+from .plans import planned_meal_id, split_planned_meal_id
+
+
+class MenuPlanTests(KindergartenTestCase):
+    def setUp(self):
+        super().setUp()
+        self.bees = self.add_class("Bees")
+        other_parent = User.objects.create_user("other@example.com", "pass")
+        self.children = [self.add_child(f"Child {i:02}", self.bees, self.parent if i == 0 else other_parent) for i in range(20)]
+        self.client.force_authenticate(self.add_teacher(self.bees))
+
+    def create_plan(self):
+        response = self.client.post("/meal-plans/", {
+            "class_id": self.bees.id, "date": "2025-03-03", "meal_title": "Soup",
+            "meal_description": "Tomato soup", "intake_time": "12:00",
+        })
+        self.assertEqual(response.status_code, 201)
+        return response.data["id"]
+
+    def test_plan_stores_one_row_and_lists_a_meal_per_child(self):
+        plan_id = self.create_plan()
+        Meal.objects.create(child=self.children[0], date=date(2025, 3, 3), meal_title="Snack", intake_time=time(10, 0))
+
+        with self.assertNumQueries(3):
+            response = self.client.get("/meals/", {"date": "2025-03-03"})
+
+        self.assertEqual(MenuPlan.objects.count(), 1)
+        self.assertEqual(len(response.data), 21)
+        self.assertEqual(response.data[0]["meal_title"], "Snack")
+        self.assertEqual(dict(response.data[1]), {
+            "id": planned_meal_id(plan_id, self.children[0].id), "date": "2025-03-03", "meal_description": "Tomato soup",
+            "meal_title": "Soup", "intake_time": "12:00:00", "appetite_level": "normal", "child": self.children[0].id,
+        })
+        self.assertEqual(len({row["id"] for row in response.data}), 21)
+        self.assertEqual(MenuPlan.objects.get(pk=plan_id).kindergarten_id, self.bees.kindergarten_id)
+
+    def test_planned_meal_is_retrieved_by_its_id(self):
+        plan_id = self.create_plan()
+        meal_id = planned_meal_id(plan_id, self.children[3].id)
+
+        response = self.client.get(f"/meals/{meal_id}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["id"], response.data["child"]), (meal_id, self.children[3].id))
+        self.assertEqual(split_planned_meal_id(meal_id), (plan_id, self.children[3].id))
+        self.assertEqual(self.client.get(f"/meals/{planned_meal_id(plan_id + 1, self.children[3].id)}/").status_code, 404)
+
+    def test_overrides_change_only_the_deviating_children(self):
+        plan_id = self.create_plan()
+        low, skipped = self.children[1], self.children[2]
+
+        self.assertEqual(self.client.post(f"/meal-plans/{plan_id}/overrides/", {"child": low.id, "appetite_level": "low"}).status_code, 201)
+        self.assertEqual(self.client.post(f"/meal-plans/{plan_id}/overrides/", {"child": skipped.id, "skipped": True}).status_code, 201)
+
+        meals = {row["child"]: row for row in self.client.get("/meals/").data}
+        self.assertEqual(MealOverride.objects.count(), 2)
+        self.assertEqual(len(meals), 19)
+        self.assertNotIn(skipped.id, meals)
+        self.assertEqual(meals[low.id]["appetite_level"], "low")
+
+        self.assertEqual(self.client.delete(f"/meal-plans/{plan_id}/overrides/{skipped.id}/").status_code, 204)
+        self.assertEqual(len(self.client.get("/meals/").data), 20)
+
+    def test_roster_is_fixed_when_the_plan_is_written(self):
+        self.create_plan()
+        ants = self.add_class("Ants")
+        joined = self.add_child("Joined", self.bees)
+        moved = self.children[1]
+        moved.class_id = ants
+        moved.save()
+
+        children = [row["child"] for row in self.client.get("/meals/").data]
+
+        self.assertEqual(len(children), 20)
+        self.assertIn(moved.id, children)
+        self.assertNotIn(joined.id, children)
+
+    def test_parent_sees_only_their_childs_planned_meal(self):
+        self.create_plan()
+        self.client.force_authenticate(self.parent)
+
+        response = self.client.get("/meals/")
+
+        self.assertEqual([row["child"] for row in response.data], [self.children[0].id])
+
+    def test_planned_meals_are_counted_like_logged_ones(self):
+        kindergarten_id = self.bees.kindergarten_id
+        plan = MenuPlan.objects.get(pk=self.create_plan())
+        MealOverride.objects.create(plan=plan, child=self.children[1], skipped=True)
+        MealOverride.objects.create(plan=plan, child=self.children[2], appetite_level="low")
+        Meal.objects.create(child=self.children[0], date=date(2025, 3, 3), meal_title="Snack")
+        self.children[3].delete()
+
+        self.assertEqual(counters.stored_counters(kindergarten_id)[kindergarten_id][KindergartenCounter.Entity.MEALS], 19)
+        self.assertEqual(counters.compute_counters(kindergarten_id), counters.stored_counters(kindergarten_id))
+        self.assertEqual(rollups.daily_counts("meals", date(2025, 3, 3), date(2025, 3, 3)), [(kindergarten_id, date(2025, 3, 3), 19)])
+        progress = {row["child_id"]: row["total_meals_logged"] for row in progress_for_children(self.children[:3])}
+        self.assertEqual(progress, {self.children[0].id: 2, self.children[1].id: 0, self.children[2].id: 1})
+
+        plan.delete()
+        self.assertEqual(counters.stored_counters(kindergarten_id)[kindergarten_id][KindergartenCounter.Entity.MEALS], 1)
+
+    def test_overrides_follow_a_child_who_moves(self):
+        plan = MenuPlan.objects.get(pk=self.create_plan())
+        child = self.children[1]
+        MealOverride.objects.create(plan=plan, child=child, skipped=True)
+        kindergarten = Kindergarten.objects.create(name="Moonlight", location="Side St")
+        child.kindergarten = kindergarten
+        child.class_id = self.add_class("Owls", kindergarten)
+        child.save()
+
+        override = MealOverride.objects.get(child=child)
+        self.assertEqual((override.kindergarten_id, override.class_id_id), (kindergarten.id, child.class_id_id))
@@ -1,9 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import MealViewSet
+from .views import MealViewSet, MenuPlanViewSet
 
 router = DefaultRouter()
 router.register(r"meals", MealViewSet)
+router.register(r"meal-plans", MenuPlanViewSet)
 
 urlpatterns = [
     path("", include(router.urls)),
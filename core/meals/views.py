@@ -3,16 +3,20 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework import serializers,status
 from django.shortcuts import get_object_or_404
 
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from meals.models import Meal
-from meals.serializers import MealSerializer
-from meals.permissions import CanManageMeals
+from meals.models import Meal, MealOverride, MenuPlan
+from meals.serializers import MealOverrideSerializer, MealSerializer, MenuPlanSerializer
+from meals.permissions import CanManageMeals, CanManageMenuPlans
+from meals.plans import planned_meals, split_planned_meal_id
 from children.models import Children
+from children.bulk import ClassBulkCreateMixin
+from children.idempotency import IdempotentCreateMixin
 
 
-class MealViewSet(ModelViewSet):
+class MealViewSet(IdempotentCreateMixin, ClassBulkCreateMixin, ModelViewSet):
     queryset = Meal.objects.all()
     serializer_class = MealSerializer
     permission_classes = [IsAuthenticated, CanManageMeals]
@@ -53,8 +57,24 @@ class MealViewSet(ModelViewSet):
         responses={200: MealSerializer(many=True)}
     )
     def list(self, request, *args, **kwargs):
-        """Filter meals by child and date if requested."""
-        return super().list(request, *args, **kwargs)
+        """Filter meals by child and date if requested; meals from class menu plans are listed after logged ones."""
+        meals = [*self.filter_queryset(self.get_queryset()), *self.get_planned_meals()]
+        return Response(self.get_serializer(meals, many=True).data)
+
+    def retrieve(self, request, *args, **kwargs):
+        """A logged meal, or a planned one by the negative id ``/meals/`` lists it with."""
+        try:
+            planned = split_planned_meal_id(int(kwargs["pk"]))
+        except ValueError:
+            planned = None
+        if planned is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        plan_id, child_id = planned
+        meal = next(self.get_planned_meals(plan_id=plan_id, child_id=child_id), None)
+        if meal is None:
+            return Response({"detail": "No Meal matches the given query."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(self.get_serializer(meal).data)
 
     def perform_create(self, serializer):
         """Ensure the requesting user has permission to add a meal for this child."""
@@ -75,11 +95,11 @@ class MealViewSet(ModelViewSet):
         queryset = Meal.objects.all()
 
         if user.role == "admin" and hasattr(user, "kindergarten_admin"):
-            queryset = queryset.filter(child__kindergarten=user.kindergarten_admin.kindergarten)
+            queryset = queryset.filter(kindergarten=user.kindergarten_admin.kindergarten)
 
         elif user.role == "teacher" and hasattr(user, "teacher_profile"):
             teacher_classes = user.teacher_profile.teacher_classes.values_list("class_id", flat=True)
-            queryset = queryset.filter(child__class_id__in=teacher_classes)
+            queryset = queryset.filter(class_id__in=teacher_classes)
 
         elif user.role == "parent":
             queryset = queryset.filter(child__parent=user)
@@ -93,4 +113,146 @@ class MealViewSet(ModelViewSet):
         if meal_date:
             queryset = queryset.filter(date=meal_date)
 
-        return queryset
\ No newline at end of file
+        return queryset
+
+    def get_planned_meals(self, plan_id=None, child_id=None):
+        """Meals resolved from the menu plans visible to the user, with the same filters as ``get_queryset``."""
+        user = self.request.user
+        plans = MenuPlan.objects.all()
+        children = None
+
+        if user.role == "admin" and hasattr(user, "kindergarten_admin"):
+            plans = plans.filter(kindergarten=user.kindergarten_admin.kindergarten)
+
+        elif user.role == "teacher" and hasattr(user, "teacher_profile"):
+            teacher_classes = user.teacher_profile.teacher_classes.values_list("class_id", flat=True)
+            plans = plans.filter(class_id__in=teacher_classes)
+
+        elif user.role == "parent":
+            children = Children.objects.filter(parent=user)
+
+        child_id = child_id or self.request.query_params.get("child_id")
+        meal_date = self.request.query_params.get("date")
+
+        if child_id:
+            children = (children if children is not None else Children.objects.all()).filter(id=child_id)
+        if children is not None:
+            # Rosters, not current classes, say whose plans they were; a child keeps them after moving class.
+            children = list(children.only("id", "kindergarten_id"))
+            plans = plans.filter(kindergarten_id__in={child.kindergarten_id for child in children})
+
+        if plan_id:
+            plans = plans.filter(pk=plan_id)
+        elif meal_date:
+            plans = plans.filter(date=meal_date)
+
+        return planned_meals(plans, children)
+
+
+class MenuPlanViewSet(ModelViewSet):
+    """A class's meal for a date, logged once, with per-child overrides only for children who ate differently."""
+    queryset = MenuPlan.objects.all()
+    serializer_class = MenuPlanSerializer
+    permission_classes = [IsAuthenticated, CanManageMenuPlans]
+
+    @swagger_auto_schema(
+        operation_description="Retrieve menu plans based on role and filters (class, date).",
+        manual_parameters=[
+            openapi.Parameter("class_id", openapi.IN_QUERY, description="Filter plans by class ID", type=openapi.TYPE_INTEGER),
+            openapi.Parameter(
+                "date", openapi.IN_QUERY,
+                description="Filter plans by date (YYYY-MM-DD)",
+                type=openapi.TYPE_STRING,
+                format=openapi.FORMAT_DATE
+            ),
+        ],
+        responses={200: MenuPlanSerializer(many=True)}
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        user = self.request.user
+        if not user.is_authenticated:
+            return MenuPlan.objects.none()
+        queryset = MenuPlan.objects.prefetch_related("overrides")
+
+        if user.role == "admin" and hasattr(user, "kindergarten_admin"):
+            queryset = queryset.filter(kindergarten=user.kindergarten_admin.kindergarten)
+
+        elif user.role == "teacher" and hasattr(user, "teacher_profile"):
+            teacher_classes = user.teacher_profile.teacher_classes.values_list("class_id", flat=True)
+            queryset = queryset.filter(class_id__in=teacher_classes)
+
+        elif user.role == "parent":
+            queryset = queryset.filter(class_id__in=user.children.values("class_id"))
+
+        class_id = self.request.query_params.get("class_id")
+        plan_date = self.request.query_params.get("date")
+
+        if class_id:
+            queryset = queryset.filter(class_id=class_id)
+
+        if plan_date:
+            queryset = queryset.filter(date=plan_date)
+
+        return queryset
+
+    def check_class_access(self, kindergarten_class):
+        user = self.request.user
+        if user.role == "superadmin" or user.is_superuser:
+            return
+        kindergarten_id = (
+            user.kindergarten_admin.kindergarten_id if hasattr(user, "kindergarten_admin")
+            else user.teacher_profile.kindergarten_id if hasattr(user, "teacher_profile")
+            else None
+        )
+        if user.role not in ["admin", "teacher"] or kindergarten_class.kindergarten_id != kindergarten_id:
+            raise serializers.ValidationError({"error": "You do not have access to this kindergarten."})
+
+    def perform_create(self, serializer):
+        self.check_class_access(serializer.validated_data["class_id"])
+        serializer.save()
+
+    def perform_update(self, serializer):
+        if "class_id" in serializer.validated_data:
+            self.check_class_access(serializer.validated_data["class_id"])
+        serializer.save()
+
+    @swagger_auto_schema(
+        method="post",
+        operation_description=(
+            "Record how one child's meal differed from the plan: an appetite level, or skipped when the child did not eat. "
+            "Replaces the child's previous override."
+        ),
+        request_body=MealOverrideSerializer,
+        responses={200: MealOverrideSerializer, 201: MealOverrideSerializer},
+    )
+    @action(detail=True, methods=["post"], url_path="overrides")
+    def set_override(self, request, pk=None):
+        plan = self.get_object()
+        serializer = MealOverrideSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        child = serializer.validated_data["child"]
+        if child.id not in plan.roster:
+            return Response({"error": "Child is not in this plan's class."}, status=status.HTTP_400_BAD_REQUEST)
+
+        override, created = MealOverride.objects.update_or_create(
+            plan=plan, child=child,
+            defaults={
+                "appetite_level": serializer.validated_data.get("appetite_level"),
+                "skipped": serializer.validated_data.get("skipped", False),
+            },
+        )
+        return Response(
+            MealOverrideSerializer(override).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    @swagger_auto_schema(method="delete", operation_description="Drop a child's override so the plan applies as is.")
+    @action(detail=True, methods=["delete"], url_path=r"overrides/(?P<child_id>\d+)")
+    def delete_override(self, request, pk=None, child_id=None):
+        plan = self.get_object()
+        override = get_object_or_404(MealOverride, plan=plan, child_id=child_id)
+        override.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Separate from the backfill: Postgres refuses ALTER TABLE in a transaction
+    # that still has deferred foreign-key checks pending from the UPDATE.
+
+    dependencies = [
+        ('mood', '0003_child_scope'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='childmood',
+            name='kindergarten',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='kindergarten.kindergarten'),
+        ),
+        migrations.AddIndex(
+            model_name='childmood',
+            index=models.Index(fields=['kindergarten', 'date'], name='mood_kg_date'),
+        ),
+        migrations.AddIndex(
+            model_name='childmood',
+            index=models.Index(fields=['class_id', 'date'], name='mood_class_date'),
+        ),
+    ]
@@ -1,10 +1,10 @@
 from django.db import models
-from children.models import Children
+from children.models import ChildLog, Children
 from django.utils import timezone
 
 
 
-class ChildMood(models.Model):
+class ChildMood(ChildLog):
     class MoodChoices(models.TextChoices):
         HAPPY = "happy", "Happy"
         CALM = "calm", "Calm"
@@ -22,5 +22,14 @@ class ChildMood(models.Model):
 
     date = models.DateField(default=timezone.now)  # ✅ Correct way
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["child", "date"], name="mood_child_date"),
+            models.Index(fields=["date", "child"], name="mood_date_child"),
+            models.Index(fields=["kindergarten", "date"], name="mood_kg_date"),
+            models.Index(fields=["class_id", "date"], name="mood_class_date"),
+            models.Index(fields=["kindergarten", "updated_at"], name="mood_kg_updated"),
+        ]
+
     def __str__(self):
         return f"{self.child.name} - {self.mood} ({self.date})"
\ No newline at end of file
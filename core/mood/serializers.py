@@ -4,4 +4,4 @@ from .models import ChildMood
 class ChildMoodSerializer(serializers.ModelSerializer):
     class Meta:
         model = ChildMood
-        fields = "__all__"
\ No newline at end of file
+        exclude = ["kindergarten", "class_id", "updated_at"]
\ No newline at end of file
@@ -10,8 +10,10 @@ from .models import ChildMood
 from .serializers import ChildMoodSerializer
 from .permissions import CanManageChildMood
 from children.models import Children
+from children.bulk import ClassBulkCreateMixin
+from children.idempotency import IdempotentCreateMixin
 
-class ChildMoodViewSet(ModelViewSet):
+class ChildMoodViewSet(IdempotentCreateMixin, ClassBulkCreateMixin, ModelViewSet):
     queryset = ChildMood.objects.all()
     serializer_class = ChildMoodSerializer
     permission_classes = [IsAuthenticated, CanManageChildMood]
@@ -76,11 +78,11 @@ class ChildMoodViewSet(ModelViewSet):
         queryset = ChildMood.objects.all()
 
         if user.role == "admin" and hasattr(user, "kindergarten_admin"):
-            queryset = queryset.filter(child__kindergarten=user.kindergarten_admin.kindergarten)
+            queryset = queryset.filter(kindergarten=user.kindergarten_admin.kindergarten)
 
         elif user.role == "teacher" and hasattr(user, "teacher_profile"):
             teacher_classes = user.teacher_profile.teacher_classes.values_list("class_id", flat=True)
-            queryset = queryset.filter(child__class_id__in=teacher_classes)
+            queryset = queryset.filter(class_id__in=teacher_classes)
 
         elif user.role == "parent":
             queryset = queryset.filter(child__parent=user)
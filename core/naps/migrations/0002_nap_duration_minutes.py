@@ -0,0 +1,35 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:32
+
+from django.db import migrations, models
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def backfill_durations(apps, schema_editor):
+    Nap = apps.get_model("naps", "Nap")
+    batch = []
+    for nap in Nap.objects.only("id", "sleep_from", "sleep_to").iterator(chunk_size=2000):
+        start = nap.sleep_from.hour * 60 + nap.sleep_from.minute
+        end = nap.sleep_to.hour * 60 + nap.sleep_to.minute
+        nap.duration_minutes = (end - start) % MINUTES_PER_DAY
+        batch.append(nap)
+        if len(batch) == 2000:
+            Nap.objects.bulk_update(batch, ["duration_minutes"])
+            batch = []
+    Nap.objects.bulk_update(batch, ["duration_minutes"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('naps', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='nap',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_durations, migrations.RunPython.noop),
+    ]
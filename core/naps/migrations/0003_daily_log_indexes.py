@@ -0,0 +1,22 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('children', '0004_children_created_at'),
+        ('naps', '0002_nap_duration_minutes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='nap',
+            index=models.Index(fields=['child', 'date'], name='nap_child_date'),
+        ),
+        migrations.AddIndex(
+            model_name='nap',
+            index=models.Index(fields=['date', 'child'], name='nap_date_child'),
+        ),
+    ]
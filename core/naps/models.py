@@ -1,12 +1,44 @@
 from django.db import models
-from children.models import Children
+from children.models import ChildLog, Children
 from datetime import date, datetime
 
-class Nap(models.Model):
+MINUTES_PER_DAY = 24 * 60
+
+
+def nap_duration_minutes(sleep_from, sleep_to):
+    """Minutes between two times of day; a ``sleep_to`` earlier than ``sleep_from`` is on the next day."""
+    start = sleep_from.hour * 60 + sleep_from.minute
+    end = sleep_to.hour * 60 + sleep_to.minute
+    return (end - start) % MINUTES_PER_DAY
+
+
+class Nap(ChildLog):
     child = models.ForeignKey(Children, on_delete=models.CASCADE, related_name="naps")
     date = models.DateField(default=date.today)
     sleep_from = models.TimeField()
     sleep_to = models.TimeField()
+    # Derived from sleep_from/sleep_to on save; stored so durations can be ranked and aggregated in SQL.
+    duration_minutes = models.PositiveIntegerField(null=True, blank=True, editable=False, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["child", "date"], name="nap_child_date"),
+            models.Index(fields=["date", "child"], name="nap_date_child"),
+            models.Index(fields=["kindergarten", "date"], name="nap_kg_date"),
+            models.Index(fields=["class_id", "date"], name="nap_class_date"),
+            models.Index(fields=["kindergarten", "updated_at"], name="nap_kg_updated"),
+        ]
+
+    def set_derived_fields(self):
+        super().set_derived_fields()
+        self.duration_minutes = nap_duration_minutes(self.sleep_from, self.sleep_to)
+
+    def save(self, *args, **kwargs):
+        self.duration_minutes = nap_duration_minutes(self.sleep_from, self.sleep_to)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"sleep_from", "sleep_to"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "duration_minutes"}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.child.name} - {self.date} ({self.sleep_from} - {self.sleep_to})"
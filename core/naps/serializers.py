@@ -4,7 +4,8 @@ from .models import Nap
 class NapSerializer(serializers.ModelSerializer):
     class Meta:
         model = Nap
-        fields = "__all__"
+        exclude = ["kindergarten", "class_id", "updated_at"]
+        read_only_fields = ["duration_minutes"]
 
     def validate(self, data):
         child = data.get("child")  # Use .get() to avoid KeyError
@@ -12,8 +13,8 @@ class NapSerializer(serializers.ModelSerializer):
         if not child:
             raise serializers.ValidationError({"child": "This field is required."})
 
-        """Ensure sleep_from is before sleep_to"""
-        if data["sleep_from"] >= data["sleep_to"]:
-            raise serializers.ValidationError({"error": "Sleep start time must be before sleep end time."})
+        """Ensure the nap has a length; a sleep_to before sleep_from ends after midnight."""
+        if data["sleep_from"] == data["sleep_to"]:
+            raise serializers.ValidationError({"error": "Sleep start and end time must differ."})
 
         return data
\ No newline at end of file
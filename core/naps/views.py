@@ -10,8 +10,10 @@ from drf_yasg import openapi
 from .models import Nap
 from .serializers import NapSerializer
 from children.models import Children
+from children.bulk import ClassBulkCreateMixin
+from children.idempotency import IdempotentCreateMixin
 
-class NapViewSet(ModelViewSet):
+class NapViewSet(IdempotentCreateMixin, ClassBulkCreateMixin, ModelViewSet):
     queryset = Nap.objects.all()
     serializer_class = NapSerializer
     permission_classes = [IsAuthenticated]
@@ -79,11 +81,11 @@ class NapViewSet(ModelViewSet):
         queryset = Nap.objects.all()
 
         if user.role == "admin" and hasattr(user, "kindergarten_admin"):
-            queryset = queryset.filter(child__kindergarten=user.kindergarten_admin.kindergarten)
+            queryset = queryset.filter(kindergarten=user.kindergarten_admin.kindergarten)
 
         elif user.role == "teacher" and hasattr(user, "teacher_profile"):
             teacher_classes = user.teacher_profile.teacher_classes.values_list("class_id", flat=True)
-            queryset = queryset.filter(child__class_id__in=teacher_classes)
+            queryset = queryset.filter(class_id__in=teacher_classes)
 
         elif user.role == "parent":
             queryset = queryset.filter(child__parent=user)
@@ -11,7 +11,13 @@ class Post(models.Model):
     description = models.TextField()
     images = models.TextField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     likes = models.ManyToManyField(User, related_name="liked_posts", blank=True)  # Many-to-Many without extra fields
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["kindergarten", "updated_at"], name="post_kg_updated"),
+        ]
+
     def __str__(self):
         return self.title
\ No newline at end of file
@@ -4,4 +4,4 @@ from .models import Post
 class PostSerializer(serializers.ModelSerializer):
     class Meta:
         model = Post
-        fields = '__all__'  # Include all fields in the response
\ No newline at end of file
+        exclude = ['updated_at']
\ No newline at end of file
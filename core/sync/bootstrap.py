@@ -0,0 +1,100 @@
+"""Everything the mobile apps load on launch, in one response.
+
+``GET /bootstrap/`` returns the profile, the caller's scope (kindergartens,
+classes, children), the unread notification count and the first page of
+the post feed, replacing the profile, children, classes, notifications and
+posts calls the apps made one after another at cold start.
+
+The payload costs a fixed number of queries whatever the role or the size
+of the scope (see ``BootstrapViewTests``), and carries an ``ETag`` over its
+content: a client sending it back in ``If-None-Match`` gets ``304 Not
+Modified`` without a body.
+"""
+import hashlib
+
+from django.db.models import Q
+from rest_framework.renderers import JSONRenderer
+
+from auth_app.serializers import UserProfileSerializer
+from children.models import Children
+from kindergarten.models import KindergartenAdmin, KindergartenClass, Teacher
+from notifications.models import Notification
+from posts.models import Post
+from posts.serializers import PostSerializer
+
+FEED_PAGE_SIZE = 20
+
+
+def _kindergarten(kindergarten):
+    return {"id": kindergarten.id, "name": kindergarten.name}
+
+
+def _class(kindergarten_class):
+    return {"id": kindergarten_class.id, "name": kindergarten_class.name, "kindergarten": kindergarten_class.kindergarten_id}
+
+
+def _child(child):
+    return {
+        "id": child.id, "name": child.name, "profile_picture": child.profile_picture,
+        "kindergarten": child.kindergarten_id, "class_id": child.class_id_id,
+    }
+
+
+def scope(user):
+    """``(kindergartens, classes, children, posts)`` visible to ``user``; ``posts`` is an unevaluated queryset.
+
+    Also fills the user's teacher or admin profile cache, so the profile
+    serializer reads its kindergarten without another query.
+    """
+    if user.role == "superadmin" or user.is_superuser:
+        return [], [], [], Post.objects.all()
+
+    if user.role in ("admin", "teacher"):
+        model, attribute = (KindergartenAdmin, "kindergarten_admin") if user.role == "admin" else (Teacher, "teacher_profile")
+        profile = model.objects.select_related("kindergarten").filter(user=user).first()
+        if profile is None:
+            return [], [], [], Post.objects.none()
+        setattr(user, attribute, profile)
+
+        classes = list(KindergartenClass.objects.visible_to(user).order_by("name", "id"))
+        children = list(Children.objects.visible_to(user).order_by("name", "id"))
+        posts = Post.objects.filter(kindergarten=profile.kindergarten)
+        if user.role == "teacher":
+            posts = posts.filter(Q(class_id__isnull=True) | Q(class_id__in=[c.id for c in classes]))
+        return [profile.kindergarten], classes, children, posts
+
+    if user.role == "parent":
+        children = list(user.children.select_related("kindergarten", "class_id").order_by("name", "id"))
+        kindergartens = list({child.kindergarten_id: child.kindergarten for child in children}.values())
+        classes = list({child.class_id_id: child.class_id for child in children if child.class_id_id}.values())
+        posts = Post.objects.filter(
+            Q(class_id__isnull=True) | Q(class_id__in=[c.id for c in classes]),
+            kindergarten_id__in=[k.id for k in kindergartens],
+        )
+        return kindergartens, classes, children, posts
+
+    return [], [], [], Post.objects.none()
+
+
+def payload(user, context=None):
+    """The bootstrap payload of ``user``."""
+    kindergartens, classes, children, posts = scope(user)
+    page = list(posts.prefetch_related("likes").order_by("-created_at", "-id")[:FEED_PAGE_SIZE + 1])
+    return {
+        "profile": UserProfileSerializer(user).data,
+        "scope": {
+            "kindergartens": [_kindergarten(kindergarten) for kindergarten in kindergartens],
+            "classes": [_class(kindergarten_class) for kindergarten_class in classes],
+            "children": [_child(child) for child in children],
+        },
+        "unread_notifications": Notification.objects.filter(user=user, is_read=False).count(),
+        "feed": {
+            "results": PostSerializer(page[:FEED_PAGE_SIZE], many=True, context=context).data,
+            "has_more": len(page) > FEED_PAGE_SIZE,
+        },
+    }
+
+
+def etag(data):
+    """A strong ETag over the rendered payload."""
+    return '"{}"'.format(hashlib.sha1(JSONRenderer().render(data)).hexdigest())
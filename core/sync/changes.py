@@ -0,0 +1,205 @@
+"""Delta sync of daily logs, activities and posts for the mobile apps.
+
+Every synced row carries ``updated_at`` and every delete, or move out of
+someone's scope, leaves a ``SyncTombstone``. A cursor records, per entity,
+the last ``(updated_at, id)`` the client has seen; the next sync returns
+the rows after it, oldest first, in pages of ``PAGE_SIZE``; all pages of
+one run stop at the same ``until``.
+
+Timestamps are taken when a row is written, not when its transaction
+commits, so a row can commit behind a cursor that already passed its
+timestamp. Each new run therefore starts ``SYNC_RESCAN_SECONDS`` (longer
+than any write transaction) before the previous run's ``until`` and sends
+the rows it finds there again; clients apply them idempotently.
+
+The cursor is signed, which makes it opaque to clients and lets old ones
+expire once their tombstones may have been purged.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+
+from attendance.models import Attendance
+from attendance.serializers import AttendanceSerializer
+from meals.models import Meal, MealOverride, MenuPlan
+from meals.serializers import MealOverrideSerializer, MealSerializer, MenuPlanSerializer
+from naps.models import Nap
+from naps.serializers import NapSerializer
+from hygiene.models import Hygiene
+from hygiene.serializers import HygieneSerializer
+from mood.models import ChildMood
+from mood.serializers import ChildMoodSerializer
+from activities.models import Activity
+from activities.serializers import ActivitySerializer
+from posts.models import Post
+from posts.serializers import PostSerializer
+from .models import SyncTombstone
+
+PAGE_SIZE = 500
+DELETED = "deleted"
+CURSOR_SALT = "sync.cursor"
+
+LOG_ENTITIES = {
+    "attendance": Attendance,
+    "meals": Meal,
+    "naps": Nap,
+    "hygiene": Hygiene,
+    "moods": ChildMood,
+    "meal_overrides": MealOverride,
+}
+
+# Entity -> (model, serializer, select_related, prefetch_related).
+ENTITIES = {
+    "attendance": (Attendance, AttendanceSerializer, ("child",), ()),
+    "meals": (Meal, MealSerializer, (), ()),
+    # Planned meals sync as plans (with their roster) plus overrides; the app resolves them
+    # against attendance like meals.plans.
+    "meal_plans": (MenuPlan, MenuPlanSerializer, (), ("overrides",)),
+    "meal_overrides": (MealOverride, MealOverrideSerializer, (), ()),
+    "naps": (Nap, NapSerializer, (), ()),
+    "hygiene": (Hygiene, HygieneSerializer, (), ()),
+    "moods": (ChildMood, ChildMoodSerializer, (), ()),
+    "activities": (Activity, ActivitySerializer, (), ("children",)),
+    "posts": (Post, PostSerializer, (), ("likes",)),
+}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def to_micros(moment):
+    return (moment - _EPOCH) // timedelta(microseconds=1)
+
+
+def from_micros(micros):
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+def encode_cursor(until, positions):
+    """Sign ``until`` plus the positions of entities that stopped short of it."""
+    behind = {entity: position for entity, position in positions.items() if position != [until, None]}
+    return signing.dumps({"t": until, "p": behind} if behind else {"t": until}, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(cursor):
+    """Return ``(until, behind)``, ``behind`` being ``{entity: [micros, last_id]}`` of a run with more pages.
+
+    Raises ``signing.SignatureExpired`` for cursors older than the tombstone
+    retention and ``signing.BadSignature`` for anything not issued here.
+    """
+    data = signing.loads(cursor, salt=CURSOR_SALT, max_age=timedelta(days=settings.SYNC_TOMBSTONE_DAYS))
+    return data["t"], data.get("p", {})
+
+
+def visible_querysets(user):
+    """``{entity: queryset}`` of what ``user`` may sync, with tombstones under ``DELETED``; None for no access."""
+    querysets = {entity: model.objects.all() for entity, (model, *_) in ENTITIES.items()}
+    querysets[DELETED] = SyncTombstone.objects.all()
+
+    if user.role == "superadmin" or user.is_superuser:
+        return querysets
+
+    if user.role == "admin" and hasattr(user, "kindergarten_admin"):
+        kindergarten_id = user.kindergarten_admin.kindergarten_id
+        scope = {entity: Q(kindergarten_id=kindergarten_id) for entity in querysets}
+        scope["activities"] = Q(class_id__kindergarten_id=kindergarten_id)
+
+    elif user.role == "teacher" and hasattr(user, "teacher_profile"):
+        kindergarten_id = user.teacher_profile.kindergarten_id
+        class_ids = list(user.teacher_profile.teacher_classes.values_list("class_id", flat=True))
+        in_classes = Q(kindergarten_id=kindergarten_id, class_id__in=class_ids)
+        scope = {entity: in_classes for entity in querysets}
+        scope["activities"] = Q(class_id__in=class_ids)
+
+    elif user.role == "parent":
+        children = list(user.children.values_list("id", "class_id", "kindergarten_id"))
+        child_ids = [child_id for child_id, _, _ in children]
+        kindergarten_ids = {kindergarten_id for _, _, kindergarten_id in children}
+        scope = {entity: Q(kindergarten_id__in=kindergarten_ids, child_id__in=child_ids) for entity in LOG_ENTITIES}
+        scope["posts"] = Q(kindergarten_id__in=kindergarten_ids)
+        scope["meal_plans"] = Q(kindergarten_id__in=kindergarten_ids, class_id__in={class_id for _, class_id, _ in children})
+        scope["activities"] = Q(class_id__in={class_id for _, class_id, _ in children}, children__in=child_ids)
+        # Deleted activities and posts are not tied to a child; ids the app does not hold are ignored.
+        # A child's own tombstones reach its parent even after it moved to another kindergarten.
+        scope[DELETED] = Q(child_id__in=child_ids) | Q(kindergarten_id__in=kindergarten_ids, child_id__isnull=True)
+
+    else:
+        return None
+
+    querysets = {entity: queryset.filter(scope[entity]) for entity, queryset in querysets.items()}
+    querysets["activities"] = querysets["activities"].distinct()
+    return querysets
+
+
+def after(queryset, field, position, until):
+    """Rows of ``queryset`` after ``position`` and at or before ``until``, in ``(field, id)`` order."""
+    queryset = queryset.filter(**{f"{field}__lte": until})
+    if position:
+        moment, last_id = from_micros(position[0]), position[1]
+        if last_id is None:
+            queryset = queryset.filter(**{f"{field}__gt": moment})
+        else:
+            queryset = queryset.filter(Q(**{f"{field}__gt": moment}) | Q(**{field: moment, "id__gt": last_id}))
+    return queryset.order_by(field, "id")
+
+
+def changes_since(querysets, cursor=None, page_size=PAGE_SIZE, context=None):
+    """Build the ``/sync/`` payload from ``visible_querysets()``; ``cursor`` None starts a full sync."""
+    positions = {}
+    until = to_micros(timezone.now())
+    if cursor:
+        previous, behind = decode_cursor(cursor)
+        if behind:
+            # The next page of a run: finish it up to the same ``until``.
+            until = previous
+            positions = {entity: [previous, None] for entity in [*ENTITIES, DELETED]}
+            positions.update(behind)
+        else:
+            # A new run: go back over rows that may have committed after the last one read past them.
+            rescan = [previous - settings.SYNC_RESCAN_SECONDS * 1_000_000, None]
+            positions = {entity: rescan for entity in [*ENTITIES, DELETED]}
+            until = max(until, previous)
+    until_moment = from_micros(until)
+
+    payload = {"changes": {}, "deleted": {}}
+    next_positions = {}
+    has_more = False
+
+    for entity, (model, serializer_class, related, prefetch) in ENTITIES.items():
+        rows = list(
+            after(querysets[entity], "updated_at", positions.get(entity), until_moment)
+            .select_related(*related).prefetch_related(*prefetch)[:page_size]
+        )
+        if rows:
+            payload["changes"][entity] = serializer_class(rows, many=True, context=context).data
+        if len(rows) == page_size:
+            has_more = True
+            next_positions[entity] = [to_micros(rows[-1].updated_at), rows[-1].id]
+        else:
+            next_positions[entity] = [until, None]
+
+    if cursor:
+        tombstones = list(
+            after(querysets[DELETED], "deleted_at", positions.get(DELETED), until_moment)
+            .values_list("id", "entity", "object_id", "deleted_at")[:page_size]
+        )
+        deleted = {}
+        for _, entity, object_id, _ in tombstones:
+            deleted.setdefault(entity, set()).add(object_id)
+        for entity, object_ids in deleted.items():
+            # Tombstones also mark rows leaving one audience's scope; callers still seeing them keep them.
+            object_ids -= set(querysets[entity].filter(pk__in=object_ids).values_list("pk", flat=True))
+            if object_ids:
+                payload["deleted"][entity] = sorted(object_ids)
+        if len(tombstones) == page_size:
+            has_more = True
+            next_positions[DELETED] = [to_micros(tombstones[-1][3]), tombstones[-1][0]]
+        else:
+            next_positions[DELETED] = [until, None]
+    else:
+        # A full sync has nothing to delete on the client.
+        next_positions[DELETED] = [until, None]
+
+    return {"cursor": encode_cursor(until, next_positions), "has_more": has_more, **payload}
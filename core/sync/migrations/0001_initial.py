@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('kindergarten_id', models.BigIntegerField()),
+                ('class_id', models.BigIntegerField(null=True)),
+                ('child_id', models.BigIntegerField(null=True)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kindergarten_id', 'deleted_at'], name='sync_tombstone_kg_deleted')],
+            },
+        ),
+    ]
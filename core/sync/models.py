@@ -0,0 +1,21 @@
+from django.db import models
+
+
+class SyncTombstone(models.Model):
+    """A deleted row, or one that left the scope below, kept so ``/sync/`` can tell clients to drop their copy."""
+    entity = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    # Plain ids rather than foreign keys: the kindergarten, class or child is
+    # often being deleted in the same transaction.
+    kindergarten_id = models.BigIntegerField()
+    class_id = models.BigIntegerField(null=True)
+    child_id = models.BigIntegerField(null=True)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["kindergarten_id", "deleted_at"], name="sync_tombstone_kg_deleted"),
+        ]
+
+    def __str__(self):
+        return f"{self.entity}:{self.object_id} deleted {self.deleted_at}"
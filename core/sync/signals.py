@@ -0,0 +1,145 @@
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from activities.models import Activity
+from children.models import Children
+from kindergarten.models import KindergartenClass
+from meals.models import MenuPlan
+from posts.models import Post
+from .changes import ENTITIES, LOG_ENTITIES
+from .models import SyncTombstone
+
+SENDER_ENTITIES = {model: entity for entity, (model, *_) in ENTITIES.items()}
+# Fields whose change can move a row out of someone's scope.
+SCOPE_FIELDS = {"kindergarten", "kindergarten_id", "class_id", "class_id_id", "child", "child_id"}
+
+
+def tombstone_scope(entity, instance):
+    if entity in LOG_ENTITIES:
+        return {"kindergarten_id": instance.kindergarten_id, "class_id": instance.class_id_id, "child_id": instance.child_id}
+    if entity in ("posts", "meal_plans"):
+        return {"kindergarten_id": instance.kindergarten_id, "class_id": instance.class_id_id}
+    kindergarten_id = KindergartenClass.objects.filter(pk=instance.class_id_id).values_list("kindergarten_id", flat=True).first()
+    return {"kindergarten_id": kindergarten_id, "class_id": instance.class_id_id}
+
+
+def stored_scope(entity, pk):
+    """``tombstone_scope`` of the stored row ``pk`` of ``entity``; None if there is no such row."""
+    rows = ENTITIES[entity][0].objects.filter(pk=pk)
+    if entity == "activities":
+        return rows.values("class_id", kindergarten_id=F("class_id__kindergarten_id")).first()
+    if entity in LOG_ENTITIES:
+        return rows.values("kindergarten_id", "class_id", "child_id").first()
+    return rows.values("kindergarten_id", "class_id").first()
+
+
+def remember_scope(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Snapshot the stored scope, so a save that moves the row out of it leaves a tombstone there."""
+    instance._sync_previous = None
+    if not raw and instance.pk and (update_fields is None or SCOPE_FIELDS & set(update_fields)):
+        instance._sync_previous = stored_scope(SENDER_ENTITIES[sender], instance.pk)
+
+
+def record_move(sender, instance, created, raw=False, **kwargs):
+    previous = getattr(instance, "_sync_previous", None)
+    if created or raw or not previous or previous["kindergarten_id"] is None:
+        return
+    entity = SENDER_ENTITIES[sender]
+    # An activity's kindergarten is its class's; comparing the class saves looking it up.
+    current = {"class_id": instance.class_id_id} if entity == "activities" else tombstone_scope(entity, instance)
+    if any(previous[field] != value for field, value in current.items()):
+        SyncTombstone.objects.create(entity=entity, object_id=instance.pk, **previous)
+
+
+def record_deletion(sender, instance, **kwargs):
+    entity = SENDER_ENTITIES[sender]
+    scope = tombstone_scope(entity, instance)
+    if scope["kindergarten_id"] is not None:
+        SyncTombstone.objects.create(entity=entity, object_id=instance.pk, **scope)
+
+for model, entity in SENDER_ENTITIES.items():
+    pre_save.connect(remember_scope, sender=model, dispatch_uid=f"sync_presave_{entity}")
+    post_save.connect(record_move, sender=model, dispatch_uid=f"sync_moved_{entity}")
+    post_delete.connect(record_deletion, sender=model, dispatch_uid=f"sync_tombstone_{entity}")
+
+
+@receiver(pre_save, sender=Children)
+def remember_child_scope(sender, instance, raw=False, **kwargs):
+    instance._sync_previous = None
+    if not raw and instance.pk:
+        instance._sync_previous = Children.objects.filter(pk=instance.pk).values_list("kindergarten_id", "class_id").first()
+
+
+@receiver(post_save, sender=Children)
+def record_child_move(sender, instance, created, raw=False, **kwargs):
+    """Tombstone what a child changing class or kindergarten takes out of the old scope.
+
+    Its logs follow it (see ``analytics.signals``), so the old class's
+    teachers and the old kindergarten's admins lose them; its parent loses
+    the old class's menu plans and the activities the child had there.
+    """
+    previous = getattr(instance, "_sync_previous", None)
+    if created or raw or not previous or previous == (instance.kindergarten_id, instance.class_id_id):
+        return
+    kindergarten_id, class_id = previous
+    left = [(entity, model.objects.filter(child=instance)) for entity, model in LOG_ENTITIES.items()]
+    if class_id is not None:
+        left += [
+            ("meal_plans", MenuPlan.objects.filter(class_id=class_id)),
+            ("activities", Activity.objects.filter(class_id=class_id, children=instance)),
+        ]
+    SyncTombstone.objects.bulk_create(
+        (
+            SyncTombstone(entity=entity, object_id=object_id, kindergarten_id=kindergarten_id, class_id=class_id, child_id=instance.pk)
+            for entity, rows in left
+            for object_id in rows.values_list("pk", flat=True)
+        ),
+        batch_size=1000,
+    )
+
+
+@receiver(m2m_changed, sender=Post.likes.through)
+def touch_liked_posts(sender, instance, action, reverse, pk_set, **kwargs):
+    """Likes sync with their post, but ``likes.add``/``remove`` never save it; bump ``updated_at`` instead."""
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        posts = Post.objects.filter(pk=instance.pk)
+    elif action == "pre_clear":
+        posts = Post.objects.filter(likes=instance)
+    else:
+        posts = Post.objects.filter(pk__in=pk_set)
+    posts.update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Activity.children.through)
+def touch_activities(sender, instance, action, reverse, pk_set, **kwargs):
+    """Bump ``updated_at`` of activities whose children change, and tombstone them for children taken off.
+
+    Parents sync an activity only while one of their children is on it, so a
+    removed child's parent has to be told to drop it.
+    """
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        activities = Activity.objects.filter(pk=instance.pk)
+    elif action == "pre_clear":
+        activities = Activity.objects.filter(children=instance)
+    else:
+        activities = Activity.objects.filter(pk__in=pk_set)
+
+    if action != "post_add":
+        if reverse:
+            child_ids = [instance.pk]
+        elif action == "pre_clear":
+            child_ids = list(instance.children.values_list("pk", flat=True))
+        else:
+            child_ids = pk_set
+        SyncTombstone.objects.bulk_create(
+            SyncTombstone(entity="activities", object_id=activity_id, kindergarten_id=kindergarten_id, class_id=class_id, child_id=child_id)
+            for activity_id, class_id, kindergarten_id in activities.values_list("id", "class_id", "class_id__kindergarten_id")
+            for child_id in child_ids
+        )
+    activities.update(updated_at=timezone.now())
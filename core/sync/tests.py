@@ -0,0 +1,236 @@
+from datetime import date, time, timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+
+from kindergarten.models import Kindergarten
+from activities.models import Activity
+from attendance.models import Attendance
+from meals.models import Meal, MenuPlan
+from posts.models import Post
+from core.testing import KindergartenTestCase
+from . import changes
+
+
+# Without a re-scan window each sync only returns what changed since the last one.
+@override_settings(SYNC_RESCAN_SECONDS=0)
+class SyncViewTests(KindergartenTestCase):
+    url = "/sync/"
+
+    def setUp(self):
+        super().setUp()
+        self.bees, self.ants = self.add_class("Bees"), self.add_class("Ants")
+        self.teacher = self.add_teacher(self.bees)
+        self.bee = self.add_child("Bee", self.bees)
+        self.ant = self.add_child("Ant", self.ants)
+        self.client.force_authenticate(self.teacher)
+
+    def sync(self, cursor=None):
+        response = self.client.get(self.url, {"cursor": cursor} if cursor else {})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_full_sync_is_scoped_to_the_callers_classes(self):
+        Meal.objects.create(child=self.bee, meal_title="Soup")
+        Meal.objects.create(child=self.ant, meal_title="Soup")
+        Post.objects.create(kindergarten=self.kindergarten, class_id=self.bees, title="Trip", description="...")
+
+        data = self.sync()
+
+        self.assertEqual([row["child"] for row in data["changes"]["meals"]], [self.bee.id])
+        self.assertEqual(len(data["changes"]["posts"]), 1)
+        self.assertFalse(data["has_more"])
+
+    def test_returns_only_changes_and_deletions_since_cursor(self):
+        kept = Meal.objects.create(child=self.bee, meal_title="Soup")
+        removed = Meal.objects.create(child=self.bee, meal_title="Bread")
+        cursor = self.sync()["cursor"]
+
+        kept.meal_title = "Stew"
+        kept.save()
+        removed_id = removed.id
+        removed.delete()
+        attendance = Attendance.objects.create(child=self.bee, date=date(2025, 3, 3), check_in_time=time(8, 0))
+        data = self.sync(cursor)
+
+        self.assertEqual([row["meal_title"] for row in data["changes"]["meals"]], ["Stew"])
+        self.assertEqual([row["id"] for row in data["changes"]["attendance"]], [attendance.id])
+        self.assertEqual(data["deleted"], {"meals": [removed_id]})
+
+    def test_likes_sync_with_their_post(self):
+        post = Post.objects.create(kindergarten=self.kindergarten, class_id=self.bees, title="Trip", description="...")
+        cursor = self.sync()["cursor"]
+
+        post.likes.add(self.teacher)
+        data = self.sync(cursor)
+
+        self.assertEqual([row["likes"] for row in data["changes"]["posts"]], [[self.teacher.id]])
+
+    def test_children_added_to_an_activity_sync_it_to_their_parent(self):
+        activity = Activity.objects.create(name="Painting", class_id=self.bees)
+        self.client.force_authenticate(self.parent)
+        cursor = self.sync()["cursor"]
+
+        activity.children.add(self.bee)
+        data = self.sync(cursor)
+
+        self.assertEqual([row["id"] for row in data["changes"]["activities"]], [activity.id])
+
+    def test_children_taken_off_an_activity_drop_it_for_their_parent_only(self):
+        activity = Activity.objects.create(name="Painting", class_id=self.bees)
+        activity.children.add(self.bee)
+        teacher_cursor = self.sync()["cursor"]
+        self.client.force_authenticate(self.parent)
+        parent_cursor = self.sync()["cursor"]
+
+        self.bee.children_activities.remove(activity)
+        parent_data = self.sync(parent_cursor)
+        self.client.force_authenticate(self.teacher)
+        teacher_data = self.sync(teacher_cursor)
+
+        self.assertEqual(parent_data["deleted"], {"activities": [activity.id]})
+        self.assertEqual([row["children"] for row in teacher_data["changes"]["activities"]], [[]])
+        self.assertEqual(teacher_data["deleted"], {})
+
+    def test_child_changing_class_drops_its_rows_from_the_old_scope_only(self):
+        meal = Meal.objects.create(child=self.bee, meal_title="Soup")
+        plan = MenuPlan.objects.create(class_id=self.bees, date=date(2025, 3, 3), meal_title="Stew")
+        teacher_cursor = self.sync()["cursor"]
+        self.client.force_authenticate(self.parent)
+        parent_cursor = self.sync()["cursor"]
+
+        self.bee.class_id = self.ants
+        self.bee.save()
+        parent_data = self.sync(parent_cursor)
+        self.client.force_authenticate(self.teacher)
+        teacher_data = self.sync(teacher_cursor)
+
+        self.assertEqual(teacher_data["deleted"], {"meals": [meal.id]})
+        # The meal followed the child; the Bees' plan did not.
+        self.assertEqual([row["id"] for row in parent_data["changes"]["meals"]], [meal.id])
+        self.assertEqual(parent_data["deleted"], {"meal_plans": [plan.id]})
+
+    def test_post_moving_class_is_dropped_by_the_old_class(self):
+        post = Post.objects.create(kindergarten=self.kindergarten, class_id=self.bees, title="Trip", description="...")
+        cursor = self.sync()["cursor"]
+
+        post.class_id = self.ants
+        post.save()
+        data = self.sync(cursor)
+
+        self.assertNotIn("posts", data["changes"])
+        self.assertEqual(data["deleted"], {"posts": [post.id]})
+
+    def test_refresh_without_changes_is_small_and_cheap(self):
+        Meal.objects.create(child=self.bee, meal_title="Soup")
+        cursor = self.sync()["cursor"]
+
+        # Teacher's classes, then one indexed range per entity and one for deletions.
+        with self.assertNumQueries(11):
+            response = self.client.get(self.url, {"cursor": cursor})
+
+        self.assertEqual(response.data["changes"], {})
+        self.assertEqual(response.data["deleted"], {})
+        self.assertLess(len(response.content), 300)
+
+    def test_pages_resume_where_they_stopped(self):
+        for title in ("A", "B", "C"):
+            Meal.objects.create(child=self.bee, meal_title=title)
+
+        seen, cursor, has_more = [], None, True
+        while has_more:
+            data = changes.changes_since(changes.visible_querysets(self.teacher), cursor, page_size=2)
+            seen += [row["meal_title"] for row in data["changes"].get("meals", [])]
+            cursor, has_more = data["cursor"], data["has_more"]
+
+        self.assertEqual(seen, ["A", "B", "C"])
+
+    @override_settings(SYNC_RESCAN_SECONDS=60)
+    def test_rows_committed_behind_the_cursor_reach_the_next_sync(self):
+        seen = Meal.objects.create(child=self.bee, meal_title="Soup")
+        cursor = self.sync()["cursor"]
+
+        # Timestamped before the sync above read past it, committed after.
+        late = Meal.objects.create(child=self.bee, meal_title="Bread")
+        Meal.objects.filter(pk=late.pk).update(updated_at=timezone.now() - timedelta(seconds=30))
+        data = self.sync(cursor)
+
+        # The re-scan sends the rows of the last minute again, ``seen`` included.
+        self.assertEqual({row["id"] for row in data["changes"]["meals"]}, {seen.id, late.id})
+
+    def test_pages_of_a_run_share_its_until(self):
+        for title in ("A", "B", "C"):
+            Meal.objects.create(child=self.bee, meal_title=title)
+        first = changes.changes_since(changes.visible_querysets(self.teacher), page_size=2)
+
+        Meal.objects.create(child=self.bee, meal_title="D")
+        second = changes.changes_since(changes.visible_querysets(self.teacher), first["cursor"], page_size=2)
+        third = changes.changes_since(changes.visible_querysets(self.teacher), second["cursor"], page_size=2)
+
+        self.assertEqual([row["meal_title"] for row in second["changes"]["meals"]], ["C"])
+        self.assertFalse(second["has_more"])
+        self.assertEqual([row["meal_title"] for row in third["changes"]["meals"]], ["D"])
+
+    def test_tampered_cursor_is_rejected(self):
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class BootstrapViewTests(KindergartenTestCase):
+    url = "/bootstrap/"
+
+    def setUp(self):
+        super().setUp()
+        other = Kindergarten.objects.create(name="Rainbow", location="High St")
+        self.bees, self.ants = self.add_class("Bees"), self.add_class("Ants")
+        self.teacher = self.add_teacher(self.bees)
+        self.child = self.add_child("Amy", self.bees)
+        self.add_child("Ben", self.ants)
+        for i in range(25):
+            post = Post.objects.create(kindergarten=self.kindergarten, class_id=self.bees if i % 2 else None, title=f"Post {i}", description="...")
+            post.likes.add(self.parent)
+        Post.objects.create(kindergarten=self.kindergarten, class_id=self.ants, title="Ants only", description="...")
+        Post.objects.create(kindergarten=other, title="Elsewhere", description="...")
+        self.parent.notifications.create(title="Hi", message="...")
+        self.parent.notifications.create(title="Read", message="...", is_read=True)
+
+    def test_teacher_gets_scope_and_first_feed_page_in_fixed_queries(self):
+        self.client.force_authenticate(self.teacher)
+
+        with self.assertNumQueries(6):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["profile"]["kindergarten_name"], "Sunshine")
+        self.assertEqual(response.data["scope"]["kindergartens"], [{"id": self.kindergarten.id, "name": "Sunshine"}])
+        self.assertEqual([c["name"] for c in response.data["scope"]["classes"]], ["Bees"])
+        self.assertEqual([c["name"] for c in response.data["scope"]["children"]], ["Amy"])
+        self.assertEqual(len(response.data["feed"]["results"]), 20)
+        self.assertTrue(response.data["feed"]["has_more"])
+        self.assertNotIn("Ants only", [post["title"] for post in response.data["feed"]["results"]])
+
+    def test_parent_sees_their_children_and_unread_count(self):
+        self.client.force_authenticate(self.parent)
+
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+
+        self.assertEqual([c["name"] for c in response.data["scope"]["children"]], ["Amy", "Ben"])
+        self.assertEqual({c["name"] for c in response.data["scope"]["classes"]}, {"Bees", "Ants"})
+        self.assertEqual(response.data["unread_notifications"], 1)
+        self.assertEqual(response.data["feed"]["results"][0]["title"], "Ants only")
+        self.assertEqual(response.data["feed"]["results"][1]["likes"], [self.parent.id])
+
+    def test_matching_etag_returns_not_modified(self):
+        self.client.force_authenticate(self.parent)
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+        self.parent.notifications.create(title="New", message="...")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
@@ -0,0 +1,78 @@
+from django.core import signing
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import bootstrap
+from .changes import changes_since, visible_querysets
+
+
+class SyncView(APIView):
+    """GET /sync/?cursor=
+    Rows of every daily-log type, activities and posts the caller can see
+    that changed or were deleted since ``cursor``; no cursor returns
+    everything. Keep calling with the returned cursor while ``has_more``.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description='Cursor from the previous response; omit for a full sync'),
+        ],
+        responses={
+            200: openapi.Response('Changes', openapi.Schema(type=openapi.TYPE_OBJECT, properties={
+                'cursor': openapi.Schema(type=openapi.TYPE_STRING),
+                'has_more': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                'changes': openapi.Schema(type=openapi.TYPE_OBJECT, description='Entity -> changed rows'),
+                'deleted': openapi.Schema(type=openapi.TYPE_OBJECT, description='Entity -> deleted ids'),
+            })),
+            410: 'Cursor expired; sync again without a cursor',
+        },
+    )
+    def get(self, request):
+        querysets = visible_querysets(request.user)
+        if querysets is None:
+            return Response({"error": "Access Denied"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            data = changes_since(querysets, request.GET.get('cursor') or None, context={'request': request})
+        except signing.SignatureExpired:
+            return Response({"error": "Cursor expired; sync again without a cursor."}, status=status.HTTP_410_GONE)
+        except signing.BadSignature:
+            return Response({"error": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(data)
+
+
+class BootstrapView(APIView):
+    """GET /bootstrap/
+    Profile, scope (kindergartens, classes, children), unread notification
+    count and the first page of the post feed, for the apps' cold start.
+    Send the returned ``ETag`` as ``If-None-Match`` to get ``304`` when
+    nothing changed.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('If-None-Match', openapi.IN_HEADER, type=openapi.TYPE_STRING,
+                              description='ETag of the payload the app already holds'),
+        ],
+        responses={
+            200: openapi.Response('Bootstrap payload', openapi.Schema(type=openapi.TYPE_OBJECT, properties={
+                'profile': openapi.Schema(type=openapi.TYPE_OBJECT),
+                'scope': openapi.Schema(type=openapi.TYPE_OBJECT, description='kindergartens, classes and children'),
+                'unread_notifications': openapi.Schema(type=openapi.TYPE_INTEGER),
+                'feed': openapi.Schema(type=openapi.TYPE_OBJECT, description=f'First {bootstrap.FEED_PAGE_SIZE} posts and has_more'),
+            })),
+            304: 'Not modified since the ETag in If-None-Match',
+        },
+    )
+    def get(self, request):
+        data = bootstrap.payload(request.user, context={'request': request})
+        etag = bootstrap.etag(data)
+        if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response(data, headers={'ETag': etag})
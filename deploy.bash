@@ -13,6 +13,7 @@ SSH_KEY="${DEPLOY_SSH_KEY:-$HOME/Desktop/kindergarten-ssh.pem}"
 SSH_HOST="ubuntu@16.171.16.72"
 REMOTE_APP_DIR="/home/ubuntu/kindergarten-app-BE"
 SERVICE_NAME="kindergarten-backend"
+WORKER_SERVICE_NAME="kindergarten-report-worker"
 
 ssh_run() {
   ssh -i "$SSH_KEY" -o StrictHostKeyChecking=accept-new "$SSH_HOST" "$@"
@@ -27,15 +28,21 @@ ssh_run "cd '$REMOTE_APP_DIR/core' && venv/bin/pip install -r requirements.txt"
 echo "==> Running migrations"
 ssh_run "cd '$REMOTE_APP_DIR/core' && venv/bin/python manage.py migrate --noinput"
 
+echo "==> Creating cache table"
+ssh_run "cd '$REMOTE_APP_DIR/core' && venv/bin/python manage.py createcachetable"
+
+echo "==> Rebuilding live occupancy"
+ssh_run "cd '$REMOTE_APP_DIR/core' && venv/bin/python manage.py rebuild_occupancy"
+
 echo "==> Collecting static files"
 ssh_run "cd '$REMOTE_APP_DIR/core' && venv/bin/python manage.py collectstatic --noinput"
 
-echo "==> Restarting $SERVICE_NAME"
-ssh_run "sudo systemctl restart $SERVICE_NAME"
+echo "==> Restarting $SERVICE_NAME and $WORKER_SERVICE_NAME"
+ssh_run "sudo systemctl restart $SERVICE_NAME $WORKER_SERVICE_NAME"
 
 sleep 2
 echo "==> Service status"
-ssh_run "sudo systemctl is-active $SERVICE_NAME"
+ssh_run "sudo systemctl is-active $SERVICE_NAME $WORKER_SERVICE_NAME"
 
 echo "==> Verifying"
 curl -s -o /dev/null -w "HTTP %{http_code} from /swagger/\n" "http://16.171.16.72:8000/swagger/"